@@ -0,0 +1,167 @@
+from collections import namedtuple
+
+from django.contrib.auth.hashers import check_password
+from django.db import connection
+from django.db.models import Q
+
+from .models import PracticumCoordinator, PracticumInstructor, Student
+
+AccountEntry = namedtuple(
+    "AccountEntry",
+    "role id password active_status is_password_temp activation_code recovery_code",
+)
+
+ROLE_MODELS = {
+    "student": Student,
+    "coordinator": PracticumCoordinator,
+    "instructor": PracticumInstructor,
+}
+
+# Order used by activation and recovery when one email exists in several tables.
+LOOKUP_ORDER = ("student", "coordinator", "instructor")
+
+# Login prefers non-temporary passwords, then this role order.
+LOGIN_ROLE_PRIORITY = {"coordinator": 0, "instructor": 1, "student": 2}
+
+# Columns shown in the manage_accounts tables, per listed account type.
+LISTING_FIELDS = {
+    "student": (
+        "id",
+        "student_no",
+        "last_name",
+        "first_name",
+        "second_name",
+        "middle_initial",
+        "section",
+        "program",
+        "school_year",
+        "cca_email",
+        "active_status",
+    ),
+    "instructor": ("id", "last_name", "first_name", "second_name", "middle_initial", "cca_email", "active_status"),
+}
+
+LISTING_SORTS = {
+    "student": {
+        "name": ("last_name", "first_name"),
+        "student_no": ("student_no",),
+        "section": ("section", "last_name", "first_name"),
+        "email": ("cca_email",),
+    },
+    "instructor": {
+        "name": ("last_name", "first_name"),
+        "email": ("cca_email",),
+    },
+}
+
+LISTING_PAGE_SIZE = 50
+LISTING_MAX_PAGE_SIZE = 200
+
+
+def find_accounts(email):
+    """Return every account row for ``email`` across all roles in one query."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            select role, id, password, active_status, is_password_temp, activation_code, recovery_code
+            from account_directory
+            where cca_email = %s
+            """,
+            [email],
+        )
+        entries = [AccountEntry(*row) for row in cursor.fetchall()]
+    entries.sort(key=lambda entry: LOOKUP_ORDER.index(entry.role))
+    return entries
+
+
+def first_account(entries, activation_code=None):
+    for entry in entries:
+        if activation_code is None or entry.activation_code == activation_code:
+            return entry
+    return None
+
+
+def authenticate(email, password):
+    """Resolve a login attempt to ``(status, entry)``.
+
+    ``status`` is "invalid", "inactive" or "ok". Candidates are tried in the
+    order login would pick them (active first, then non-temporary password,
+    then role priority) and hashing stops at the first match, so a normal
+    login costs one PBKDF2 run.
+    """
+    entries = [entry for entry in find_accounts(email) if entry.password]
+    entries.sort(
+        key=lambda entry: (
+            not entry.active_status,
+            entry.is_password_temp,
+            LOGIN_ROLE_PRIORITY.get(entry.role, 99),
+        )
+    )
+    for entry in entries:
+        if check_password(password, entry.password):
+            return ("ok" if entry.active_status else "inactive"), entry
+    return "invalid", None
+
+
+def update_account(entry, **fields):
+    ROLE_MODELS[entry.role].objects.filter(id=entry.id).update(**fields)
+
+
+def list_accounts(
+    account_type,
+    school_year="",
+    section="",
+    search="",
+    sort="name",
+    descending=False,
+    page=1,
+    page_size=LISTING_PAGE_SIZE,
+):
+    """Return ``(rows, has_more)`` for one page of the manage_accounts listing.
+
+    Only the displayed columns are selected; ``account_type`` is ``"student"``
+    or ``"instructor"``.
+    """
+    model = ROLE_MODELS[account_type]
+    page = max(int(page or 1), 1)
+    page_size = max(1, min(int(page_size or LISTING_PAGE_SIZE), LISTING_MAX_PAGE_SIZE))
+
+    queryset = model.objects.all()
+    if account_type == "student":
+        if school_year:
+            queryset = queryset.filter(school_year=school_year)
+        if section:
+            queryset = queryset.filter(section=section)
+    if search:
+        condition = (
+            Q(last_name__icontains=search) | Q(first_name__icontains=search) | Q(cca_email__icontains=search)
+        )
+        if account_type == "student":
+            condition |= Q(student_no__icontains=search)
+        queryset = queryset.filter(condition)
+
+    sort_fields = LISTING_SORTS[account_type].get(sort, LISTING_SORTS[account_type]["name"]) + ("id",)
+    ordering = [f"-{field}" if descending else field for field in sort_fields]
+    offset = (page - 1) * page_size
+    rows = list(queryset.order_by(*ordering).values(*LISTING_FIELDS[account_type])[offset : offset + page_size + 1])
+    return rows[:page_size], len(rows) > page_size
+
+
+def student_sections(school_year):
+    return list(
+        Student.objects.filter(school_year=school_year)
+        .exclude(section="")
+        .order_by("section")
+        .values_list("section", flat=True)
+        .distinct()
+    )
+
+
+def student_school_years():
+    return list(
+        Student.objects.exclude(school_year__isnull=True)
+        .exclude(school_year="")
+        .order_by("-school_year")
+        .values_list("school_year", flat=True)
+        .distinct()
+    )
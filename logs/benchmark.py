@@ -0,0 +1,392 @@
+import csv
+import io
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .instrumentation import QueryStats
+from .ratelimit import reset_rate_limit
+from .records import DTR_MONTH_FIELDS, REQUIREMENT_FIELDS
+from .tokens import mint_ui_token
+
+# Everything generated here is tagged so it can be found and removed again
+# without touching real records.
+BENCH_EMAIL_DOMAIN = "bench.ojt.invalid"
+BENCH_SECTION_PREFIX = "BENCH-"
+BENCH_COMPANY_PREFIX = "Bench Co "
+BENCH_PASSWORD = "bench-password"
+
+PROGRAMS = ("BSIT", "BSCS", "BSIS", "BLIS")
+FIRST_NAMES = ("Ana", "Ben", "Carla", "Dan", "Ella", "Felix", "Gia", "Hugo", "Ivy", "Jose", "Kat", "Leo")
+LAST_NAMES = ("Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Rivera")
+
+
+def school_years(count):
+    start = timezone.now().year - count + 1
+    return [f"{year - 1} - {year}" for year in range(start, start + count)]
+
+
+def clear_benchmark_data(cursor):
+    like_email = f"%@{BENCH_EMAIL_DOMAIN}"
+    cursor.execute("delete from students where cca_email like %s", [like_email])
+    cursor.execute("delete from practicum_instructors where cca_email like %s", [like_email])
+    cursor.execute("delete from practicum_coordinators where cca_email like %s", [like_email])
+    cursor.execute("delete from section_list where section like %s", [f"{BENCH_SECTION_PREFIX}%"])
+    cursor.execute("delete from submission_schedules where section like %s", [f"{BENCH_SECTION_PREFIX}%"])
+    cursor.execute("delete from company_checklist where company_name like %s", [f"{BENCH_COMPANY_PREFIX}%"])
+
+
+def generate_benchmark_data(students=1000, sections=20, years=2, companies=100, seed=0.42):
+    """Insert a tagged synthetic dataset; returns a dict of row counts.
+
+    Students are spread evenly over ``sections`` sections and ``years`` school
+    years, each section gets one instructor and a submission day, and weekly
+    journal rows are synced for the current year.
+    """
+    password = make_password(BENCH_PASSWORD)
+    year_labels = school_years(years)
+    section_names = [f"{BENCH_SECTION_PREFIX}{n:03d}" for n in range(1, sections + 1)]
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            clear_benchmark_data(cursor)
+            cursor.execute("select setseed(%s)", [seed])
+            cursor.execute("set local ojt.bulk_import = 'on'")
+
+            cursor.execute(
+                """
+                insert into students (
+                  student_no, cca_email, last_name, first_name, second_name, middle_initial,
+                  program, section, school_year,
+                  password, activation_code, recovery_code, active_status, is_password_temp
+                )
+                select
+                  'BENCH-' || lpad(n::text, 7, '0'),
+                  'student' || n || '@' || %s,
+                  (%s::text[])[1 + n %% array_length(%s::text[], 1)],
+                  (%s::text[])[1 + (n / 7) %% array_length(%s::text[], 1)],
+                  null,
+                  chr(65 + n %% 26),
+                  (%s::text[])[1 + n %% array_length(%s::text[], 1)],
+                  (%s::text[])[1 + n %% array_length(%s::text[], 1)],
+                  (%s::text[])[1 + (n / %s) %% array_length(%s::text[], 1)],
+                  %s, '', null, true, false
+                from generate_series(1, %s) as n
+                """,
+                [
+                    BENCH_EMAIL_DOMAIN,
+                    list(LAST_NAMES), list(LAST_NAMES),
+                    list(FIRST_NAMES), list(FIRST_NAMES),
+                    list(PROGRAMS), list(PROGRAMS),
+                    section_names, section_names,
+                    year_labels, max(students // max(years, 1), 1), year_labels,
+                    password,
+                    students,
+                ],
+            )
+            cursor.execute("select sync_student_requirements();")
+            cursor.execute("select sync_attendance_sheet_dtr();")
+
+            flag_sets = ", ".join(f"{field} = random() < 0.7" for field in REQUIREMENT_FIELDS)
+            cursor.execute(
+                f"""
+                update student_requirements sr
+                set {flag_sets},
+                    start_of_ojt = make_date(extract(year from now())::int, 1, 1) + (random() * 60)::int
+                from students s
+                where s.id = sr.student_id and s.cca_email like %s
+                """,
+                [f"%@{BENCH_EMAIL_DOMAIN}"],
+            )
+            hour_sets = ", ".join(f"{field} = (random() * 120)::int" for field in DTR_MONTH_FIELDS)
+            cursor.execute(
+                f"""
+                update attendance_sheet_dtr dtr
+                set {hour_sets}
+                from students s
+                where s.id = dtr.student_id and s.cca_email like %s
+                """,
+                [f"%@{BENCH_EMAIL_DOMAIN}"],
+            )
+
+            cursor.execute(
+                """
+                insert into practicum_instructors (
+                  cca_email, last_name, first_name, password, activation_code,
+                  active_status, is_password_temp
+                )
+                select 'instructor' || n || '@' || %s, 'Instructor', 'Bench ' || n, %s, '', true, false
+                from generate_series(1, %s) as n
+                """,
+                [BENCH_EMAIL_DOMAIN, password, sections],
+            )
+            cursor.execute(
+                """
+                insert into practicum_coordinators (
+                  cca_email, last_name, first_name, password, activation_code,
+                  active_status, is_password_temp
+                )
+                values (%s, 'Coordinator', 'Bench', %s, '', true, false)
+                """,
+                [f"coordinator@{BENCH_EMAIL_DOMAIN}", password],
+            )
+            cursor.execute(
+                """
+                insert into section_list (section, school_year)
+                select section, school_year
+                from unnest(%s::text[]) as section
+                cross join unnest(%s::text[]) as school_year
+                """,
+                [section_names, year_labels],
+            )
+            cursor.execute(
+                """
+                insert into section_instructors (section_id, instructor_id)
+                select sl.id, pi.id
+                from section_list sl
+                join practicum_instructors pi
+                  on pi.cca_email = 'instructor' || (substring(sl.section from '[0-9]+$')::int) || '@' || %s
+                where sl.section like %s
+                  and sl.school_year = %s
+                """,
+                [BENCH_EMAIL_DOMAIN, f"{BENCH_SECTION_PREFIX}%", year_labels[-1]],
+            )
+            cursor.execute(
+                """
+                insert into submission_schedules (section, submission_day)
+                select t.section, 1 + (t.ord %% 5)
+                from unnest(%s::text[]) with ordinality as t(section, ord)
+                """,
+                [section_names],
+            )
+
+            cursor.execute(
+                """
+                insert into company_checklist (
+                  company_name,
+                  city_resolution_checked, city_resolution_passed_at, city_resolution_status,
+                  company_signing_checked, company_signing_passed_at,
+                  office_president_checked, office_president_passed_at,
+                  processed_notarized_checked, processed_notarized_passed_at
+                )
+                select
+                  %s || n,
+                  true, now() - interval '60 days', case when n %% 3 = 0 then 'pending' else 'approved' end,
+                  n %% 2 = 0, case when n %% 2 = 0 then now() - interval '40 days' end,
+                  n %% 4 = 0, case when n %% 4 = 0 then now() - interval '20 days' end,
+                  false, null
+                from generate_series(1, %s) as n
+                """,
+                [BENCH_COMPANY_PREFIX, companies],
+            )
+            cursor.execute(
+                """
+                insert into company_partnered (checklist_row_id, company_name, moa_start_date, moa_expiration_date)
+                select id, company_name, current_date - 200, current_date + (random() * 700)::int - 100
+                from company_checklist
+                where company_name like %s and random() < 0.5
+                """,
+                [f"{BENCH_COMPANY_PREFIX}%"],
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute("select sync_weekly_journal(%s);", [timezone.now().year])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            select
+              (select count(*) from students where cca_email like %s),
+              (select count(*) from weekly_journal w join students s on s.id = w.student_id where s.cca_email like %s),
+              (select count(*) from section_list where section like %s),
+              (select count(*) from company_checklist where company_name like %s),
+              (select count(*) from company_partnered where company_name like %s)
+            """,
+            [f"%@{BENCH_EMAIL_DOMAIN}"] * 2 + [f"{BENCH_SECTION_PREFIX}%"] + [f"{BENCH_COMPANY_PREFIX}%"] * 2,
+        )
+        counts = cursor.fetchone()
+    return dict(
+        zip(("students", "weekly_journal", "section_list", "company_checklist", "company_partnered"), counts)
+    )
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _login(client, account_type, account_id):
+    session = client.session
+    session["account_id"] = str(account_id)
+    session["account_type"] = account_type
+    session.save()
+    return SimpleNamespace(session={"account_id": str(account_id)})
+
+
+def _fetch_fixture():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            select pi.id, sl.id, sl.section, sl.school_year
+            from section_instructors si
+            join section_list sl on sl.id = si.section_id
+            join practicum_instructors pi on pi.id = si.instructor_id
+            where pi.cca_email like %s
+            order by sl.section
+            limit 1
+            """,
+            [f"%@{BENCH_EMAIL_DOMAIN}"],
+        )
+        assignment = cursor.fetchone()
+        if not assignment:
+            return None
+        cursor.execute(
+            """
+            select id, cca_email, section, student_no, last_name, first_name, program, school_year
+            from students
+            where cca_email like %s and section = %s
+            order by student_no
+            """,
+            [f"%@{BENCH_EMAIL_DOMAIN}", assignment[2]],
+        )
+        section_students = cursor.fetchall()
+    return {
+        "instructor_id": assignment[0],
+        "section_id": assignment[1],
+        "section": assignment[2],
+        "school_year": assignment[3],
+        "students": section_students,
+    }
+
+
+def _students_csv(students):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["student_no", "cca_email", "last_name", "first_name", "program", "section", "school_year"])
+    for _, email, section, student_no, last_name, first_name, program, school_year in students:
+        writer.writerow([student_no, email, last_name, first_name, program, section, school_year or ""])
+    return out.getvalue().encode("utf-8")
+
+
+def build_scenarios(client):
+    """Return ``{name: callable}``; each callable performs one request and returns the response."""
+    fixture = _fetch_fixture()
+    if fixture is None or not fixture["students"]:
+        raise RuntimeError("No benchmark data found. Run `manage.py generate_benchmark_data` first.")
+
+    token_request = _login(client, "instructor", fixture["instructor_id"])
+    section_key = mint_ui_token(token_request, "instructor_sections", str(fixture["section_id"]))
+    student_key = mint_ui_token(token_request, "manage_records_students", str(fixture["students"][0][0]))
+    login_email = fixture["students"][0][1]
+    csv_bytes = _students_csv(fixture["students"])
+
+    def front_page():
+        # A fresh client so the instructor session above is not replaced; the
+        # per-IP login limit would otherwise turn later iterations into 429s.
+        reset_rate_limit("login_ip", "127.0.0.1")
+        return Client().post("/", {"cca_email": login_email, "password": BENCH_PASSWORD})
+
+    def csv_import():
+        upload = io.BytesIO(csv_bytes)
+        upload.name = "bench_students.csv"
+        return client.post("/staff/manage-accounts/", {"action": "import_student_csv", "student_csv": upload})
+
+    # name -> (callable, check that a response is a real success)
+    return {
+        "front_page_login": (front_page, _redirects_to("student_home", "change_temp_password")),
+        "manage_records": (lambda: client.get("/staff/manage-records/"), _is_2xx),
+        "manage_records_data": (
+            lambda: client.get("/staff/manage-records/data/", {"school_year": fixture["school_year"]}),
+            _is_2xx,
+        ),
+        "instructor_section_details_by_key": (
+            lambda: client.get("/staff/handled-sections/details/", {"section_key": section_key}),
+            _is_2xx,
+        ),
+        "company_checklist_data": (lambda: client.get("/staff/company-checklist/data/"), _is_2xx),
+        "weekly_journal_weeks": (
+            lambda: client.get(
+                "/staff/weekly-journal/weeks/",
+                {
+                    "section": fixture["section"],
+                    "student_key": student_key,
+                    "month": 2,
+                    "year": timezone.now().year,
+                },
+            ),
+            _is_2xx,
+        ),
+        "csv_import": (csv_import, _redirects_to("manage_accounts")),
+    }
+
+
+def _is_2xx(response):
+    return 200 <= response.status_code < 300
+
+
+def _redirects_to(*url_names):
+    """Accept only a redirect to one of ``url_names`` (not e.g. back to the login page)."""
+    targets = {reverse(name) for name in url_names}
+
+    def check(response):
+        return response.status_code == 302 and response.url in targets
+
+    return check
+
+
+def run_scenario(func, check=_is_2xx, iterations=20, warmup=2):
+    """Time ``func``; the result is marked ``valid: False`` if any response fails ``check``."""
+    failures = []
+
+    def call():
+        response = func()
+        if not check(response):
+            failures.append(response.status_code)
+        return response
+
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    query_counts = []
+    db_times = []
+    statuses = set()
+    for _ in range(iterations):
+        stats = QueryStats()
+        with connections["default"].execute_wrapper(stats):
+            started = time.perf_counter()
+            response = call()
+            latencies.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+        query_counts.append(stats.count)
+        db_times.append(stats.total_ms)
+
+    # Measured separately: tracemalloc slows allocation-heavy code paths.
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "valid": not failures,
+        "unexpected_responses": len(failures),
+        "iterations": iterations,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "db_p50_ms": round(_percentile(db_times, 50), 2),
+        "queries_p50": _percentile(query_counts, 50),
+        "queries_max": max(query_counts),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "status_codes": sorted(statuses | set(failures)),
+    }
@@ -0,0 +1,263 @@
+import logging
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.mail import get_connection
+from django.db import connection, transaction
+
+from .mail_queue import enqueue_emails, send_pending
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+# Passwords handed to a pool worker at a time; each hash takes a good fraction
+# of a second, so small batches keep every core busy until the chunk ends.
+HASH_BATCH = 8
+# A job still "running" without progress for this long is taken over by
+# another worker; re-running is safe because only inactive students are picked.
+STALE_JOB_SECONDS = 10 * 60
+
+_JOB_FIELDS = ("id", "school_year", "section", "status", "total", "activated", "last_error", "created_at", "finished_at")
+_JOB_COLUMNS = ", ".join(_JOB_FIELDS)
+
+
+def _init_hasher():
+    # Spawned/forkserver workers start without Django configured.
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def hash_pool(workers=None):
+    """Process pool for make_password; PBKDF2 is CPU-bound, so one process per core."""
+    workers = workers or settings.BULK_ACTIVATION_WORKERS or os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_hasher)
+
+
+def _inactive_students_sql(section):
+    where_sql = "school_year = %s and not active_status"
+    if section:
+        where_sql += " and section = %s"
+    return where_sql
+
+
+def count_candidates(school_year, section=None):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"select count(*) from students where {_inactive_students_sql(section)}",
+            [school_year] + ([section] if section else []),
+        )
+        return cursor.fetchone()[0]
+
+
+def create_job(school_year, section=None, requested_by=None):
+    """Queue a bulk activation, or return the open job already queued for the same scope."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("select pg_advisory_xact_lock(hashtext('activation_jobs'))")
+            cursor.execute(
+                f"""
+                select {_JOB_COLUMNS}
+                from activation_jobs
+                where school_year = %s and section is not distinct from %s
+                  and status in ('pending', 'running')
+                order by id
+                limit 1
+                """,
+                [school_year, section],
+            )
+            row = cursor.fetchone()
+            if row:
+                return _job_dict(cursor, row), False
+            cursor.execute(
+                f"""
+                insert into activation_jobs (school_year, section, requested_by, total)
+                values (%s, %s, %s, %s)
+                returning {_JOB_COLUMNS}
+                """,
+                [school_year, section, requested_by, count_candidates(school_year, section)],
+            )
+            return _job_dict(cursor, cursor.fetchone()), True
+
+
+def _job_dict(cursor, row):
+    job = dict(zip(_JOB_FIELDS, row))
+    cursor.execute(
+        """
+        select
+          count(*) filter (where status = 'sent'),
+          count(*) filter (where status = 'failed'),
+          count(*) filter (where status in ('pending', 'sending'))
+        from email_outbox
+        where activation_job_id = %s
+        """,
+        [job["id"]],
+    )
+    job["emails_sent"], job["emails_failed"], job["emails_pending"] = cursor.fetchone()
+    return job
+
+
+def job_progress(job_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"select {_JOB_COLUMNS} from activation_jobs where id = %s", [job_id])
+        row = cursor.fetchone()
+        return _job_dict(cursor, row) if row else None
+
+
+def claim_job():
+    """Mark the oldest pending (or stale running) job as running and return it, or None."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                update activation_jobs
+                set status = 'running', started_at = coalesce(started_at, now()), updated_at = now()
+                where id = (
+                  select id from activation_jobs
+                  where status = 'pending'
+                     or (status = 'running' and updated_at < now() - make_interval(secs => %s))
+                  order by created_at, id
+                  limit 1
+                  for update skip locked
+                )
+                returning {_JOB_COLUMNS}
+                """,
+                [STALE_JOB_SECONDS],
+            )
+            row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip(_JOB_FIELDS, row))
+
+
+def _activate_chunk(job_id, students, hashes, passwords):
+    """Write one chunk with a single set-based update and queue its emails.
+
+    Students activated elsewhere since they were read are skipped by the
+    ``not active_status`` guard and get no email.
+    """
+    password_by_id = {str(student_id): password for (student_id, _), password in zip(students, passwords)}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                update students s
+                set password = v.password, active_status = true, is_password_temp = true
+                from unnest(%s::uuid[], %s::text[]) as v(id, password)
+                where s.id = v.id and not s.active_status
+                returning s.id, s.cca_email
+                """,
+                [[str(student_id) for student_id, _ in students], hashes],
+            )
+            activated = cursor.fetchall()
+            enqueue_emails(
+                [
+                    (
+                        email,
+                        "ICSLIS OJT System Temporary Password",
+                        (
+                            "Your account is now active.\n"
+                            f"Temporary password: {password_by_id[str(student_id)]}\n"
+                            "Please log in and change your password immediately."
+                        ),
+                        "emails/temp_password.html",
+                        {"temp_password": password_by_id[str(student_id)], "email": email},
+                    )
+                    for student_id, email in activated
+                ],
+                activation_job_id=job_id,
+            )
+            cursor.execute(
+                "update activation_jobs set activated = activated + %s, updated_at = now() where id = %s",
+                [len(activated), job_id],
+            )
+    return len(activated)
+
+
+def run_job(job, pool, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Activate every inactive student in the job's scope, chunk by chunk.
+
+    Temporary passwords are hashed in ``pool`` (see ``hash_pool``). ``progress``
+    is called with ``(activated, total)`` after each chunk.
+    """
+    school_year, section = job["school_year"], job["section"]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            select id, cca_email from students
+            where {_inactive_students_sql(section)}
+            order by section, last_name, first_name, id
+            """,
+            [school_year] + ([section] if section else []),
+        )
+        students = cursor.fetchall()
+        cursor.execute(
+            "update activation_jobs set total = activated + %s, updated_at = now() where id = %s returning total",
+            [len(students), job["id"]],
+        )
+        total = cursor.fetchone()[0]
+
+    activated = total - len(students)
+    try:
+        for start in range(0, len(students), chunk_size):
+            chunk = students[start : start + chunk_size]
+            passwords = [secrets.token_urlsafe(6) for _ in chunk]
+            hashes = list(pool.map(make_password, passwords, chunksize=HASH_BATCH))
+            activated += _activate_chunk(job["id"], chunk, hashes, passwords)
+            if progress:
+                progress(activated, total)
+    except Exception as exc:
+        logger.exception("Activation job %s failed", job["id"])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                update activation_jobs
+                set status = 'failed', last_error = %s, updated_at = now(), finished_at = now()
+                where id = %s
+                """,
+                [str(exc)[:1000], job["id"]],
+            )
+        raise
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            update activation_jobs
+            set status = 'done', updated_at = now(), finished_at = now()
+            where id = %s
+            """,
+            [job["id"]],
+        )
+    return activated, total
+
+
+def send_job_mail(job_id, batch_size=50):
+    """Send the job's queued emails over one SMTP connection; returns ``(sent, failed)``.
+
+    Anything left pending (e.g. after a dropped connection) is retried by
+    process_email_outbox like any other queued message.
+    """
+    smtp_connection = get_connection()
+    try:
+        smtp_connection.open()
+    except Exception:
+        logger.exception("Unable to open SMTP connection for activation job %s", job_id)
+        return 0, 0
+
+    sent = failed = 0
+    try:
+        while True:
+            batch_sent, batch_failed = send_pending(
+                batch_size=batch_size, activation_job_id=job_id, smtp_connection=smtp_connection
+            )
+            sent += batch_sent
+            failed += batch_failed
+            if batch_sent + batch_failed < batch_size:
+                return sent, failed
+    finally:
+        smtp_connection.close()
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.db import connection
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+
+from .schema import SCHEMA_VERSION, get_applied_version
+
+
+def _is_test_database():
+    # The test runner checks freshly created test databases, which only get
+    # the schema steps each test applies for itself.
+    name = connection.settings_dict.get("NAME") or ""
+    test_name = (connection.settings_dict.get("TEST") or {}).get("NAME")
+    return name == test_name or name.startswith(TEST_DATABASE_PREFIX)
+
+
+@register(Tags.database)
+def check_schema_version(app_configs=None, databases=None, **kwargs):
+    if not databases or "default" not in databases or connection.vendor != "postgresql":
+        return []
+    if _is_test_database():
+        return []
+    try:
+        applied_version = get_applied_version()
+    except Exception as exc:
+        return [Error(f"Unable to read the OJT schema version: {exc}", id="logs.E001")]
+    if applied_version < SCHEMA_VERSION:
+        return [
+            Error(
+                f"OJT schema is at version {applied_version}, expected {SCHEMA_VERSION}.",
+                hint="Run `python manage.py bootstrap_schema` before starting the server.",
+                id="logs.E002",
+            )
+        ]
+    return []
+
+
+SESSION_STORE_BACKENDS = ("db", "cached_db", "cache")
+
+
+@register()
+def check_session_store(app_configs=None, **kwargs):
+    backend = getattr(settings, "SESSION_STORE_BACKEND", "db")
+    if backend not in SESSION_STORE_BACKENDS:
+        return [
+            Error(
+                f"SESSION_STORE_BACKEND must be one of {', '.join(SESSION_STORE_BACKENDS)}, not {backend!r}.",
+                id="logs.E003",
+            )
+        ]
+    cache_backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]["BACKEND"]
+    if backend != "db" and cache_backend.endswith("LocMemCache"):
+        return [
+            Warning(
+                f"Sessions use the {backend!r} store on a per-process local memory cache.",
+                hint="Each worker sees its own copy, so logouts can go unnoticed by other workers. "
+                "Use a shared cache (CACHE_BACKEND) or SESSION_STORE_BACKEND=db with several workers.",
+                id="logs.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,13 @@
+from django.db import connections
+
+
+def pool_stats(alias="default"):
+    """Return psycopg_pool counters for this process, or ``None`` when pooling is off."""
+    pool = connections[alias].pool if connections[alias].vendor == "postgresql" else None
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    stats["name"] = pool.name
+    stats["min_size"] = pool.min_size
+    stats["max_size"] = pool.max_size
+    return stats
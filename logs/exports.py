@@ -0,0 +1,393 @@
+import csv
+import datetime
+import itertools
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from .records import DTR_MONTH_FIELDS, REQUIREMENT_FIELDS, full_name
+
+EXPORT_KINDS = ("requirements", "dtr", "journal")
+EXPORT_FORMATS = ("csv", "xlsx")
+
+SHEET_NAMES = {
+    "requirements": "Requirements",
+    "dtr": "DTR Hours",
+    "journal": "Weekly Journal",
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Rows pulled from the server-side cursor per round trip.
+FETCH_SIZE = 2000
+# Rows written between flushes of the response stream.
+FLUSH_ROWS = 500
+
+_XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_RELATIONSHIP_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def _label(field):
+    return field.replace("_", " ").title()
+
+
+def journal_year(school_year):
+    """Return the calendar year weekly_journal rows use for ``school_year``.
+
+    Matches _build_instructor_section_detail: the second year of "2025 - 2026".
+    """
+    parts = [p.strip() for p in str(school_year or "").split("-")]
+    for part in reversed(parts):
+        if part.isdigit():
+            return int(part)
+    return None
+
+
+def _iter_query(sql, params):
+    """Yield rows of ``sql`` through a named (server-side) cursor.
+
+    Only FETCH_SIZE rows are held in worker memory at a time.
+    """
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+
+def _scope_sql(school_year, section):
+    where_sql = "sr.school_year = %s"
+    params = [school_year]
+    if section:
+        where_sql += " and sr.section = %s"
+        params.append(section)
+    return where_sql, params
+
+
+def _requirements_rows(school_year, section):
+    header = ["Student No.", "Name", "Section", "Program", "School Year", "Start of OJT"]
+    header += [_label(field) for field in REQUIREMENT_FIELDS]
+    header += ["Total Hours", "OJT Status"]
+    where_sql, params = _scope_sql(school_year, section)
+    rows = _iter_query(
+        f"""
+        select
+          sr.student_no,
+          sr.first_name,
+          sr.second_name,
+          sr.middle_initial,
+          sr.last_name,
+          sr.section,
+          sr.program,
+          sr.school_year,
+          sr.start_of_ojt,
+          {', '.join(f'sr.{field}' for field in REQUIREMENT_FIELDS)},
+          coalesce(sp.total_hours, 0),
+          coalesce(sp.ojt_status, 'not_started')
+        from student_requirements sr
+        left join student_progress sp on sp.student_id = sr.student_id
+        where {where_sql}
+        order by sr.section, sr.last_name, sr.first_name, sr.id
+        """,
+        params,
+    )
+    body = (
+        [row[0], full_name(row[1], row[2], row[3], row[4]), *row[5:9]]
+        + [bool(value) for value in row[9 : 9 + len(REQUIREMENT_FIELDS)]]
+        + [int(row[-2] or 0), _label(row[-1])]
+        for row in rows
+    )
+    return header, body
+
+
+def _dtr_rows(school_year, section):
+    header = ["Student No.", "Name", "Section", "School Year"]
+    header += [_label(field) for field in DTR_MONTH_FIELDS]
+    header += ["Total Hours"]
+    where_sql, params = _scope_sql(school_year, section)
+    rows = _iter_query(
+        f"""
+        select
+          sr.student_no,
+          sr.first_name,
+          sr.second_name,
+          sr.middle_initial,
+          sr.last_name,
+          sr.section,
+          sr.school_year,
+          {', '.join(f'coalesce(dtr.{field}, 0)' for field in DTR_MONTH_FIELDS)},
+          coalesce(sp.total_hours, 0)
+        from student_requirements sr
+        left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
+        left join student_progress sp on sp.student_id = sr.student_id
+        where {where_sql}
+        order by sr.section, sr.last_name, sr.first_name, sr.id
+        """,
+        params,
+    )
+    body = (
+        [row[0], full_name(row[1], row[2], row[3], row[4]), row[5], row[6]]
+        + [int(value or 0) for value in row[7:]]
+        for row in rows
+    )
+    return header, body
+
+
+def _journal_rows(school_year, section):
+    """Weekly-journal matrix: one row per student, one column per due week.
+
+    Cells hold the status shown in the section detail view ("passed",
+    "pending", ...). The week columns are read first with a small query so
+    the student rows can then be streamed.
+    """
+    header = ["Student No.", "Name", "Section"]
+    year = journal_year(school_year)
+    if year is None:
+        return header, iter(())
+
+    where_sql, params = _scope_sql(school_year, section)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            select distinct wj.due_date, wj.week_no
+            from weekly_journal wj
+            join student_requirements sr on sr.student_id = wj.student_id and sr.section = wj.section
+            where wj.year = %s and {where_sql}
+            order by wj.due_date, wj.week_no
+            """,
+            [year] + params,
+        )
+        weeks = cursor.fetchall()
+    columns = {week: index for index, week in enumerate(weeks)}
+    header += [f"Week {week_no} ({due_date:%b %d})" for due_date, week_no in weeks]
+
+    rows = _iter_query(
+        f"""
+        select
+          sr.student_id,
+          sr.student_no,
+          sr.first_name,
+          sr.second_name,
+          sr.middle_initial,
+          sr.last_name,
+          sr.section,
+          wj.due_date,
+          wj.week_no,
+          wj.submitted_at,
+          wj.status
+        from student_requirements sr
+        left join weekly_journal wj
+          on wj.student_id = sr.student_id and wj.section = sr.section and wj.year = %s
+        where {where_sql}
+        order by sr.section, sr.last_name, sr.first_name, sr.student_id, wj.due_date, wj.week_no
+        """,
+        [year] + params,
+    )
+
+    def body():
+        for _, entries in itertools.groupby(rows, key=lambda row: row[0]):
+            entries = list(entries)
+            first = entries[0]
+            cells = [""] * len(columns)
+            for entry in entries:
+                index = columns.get((entry[7], entry[8]))
+                if index is not None:
+                    cells[index] = entry[10] or ("passed" if entry[9] else "pending")
+            yield [first[1], full_name(first[2], first[3], first[4], first[5]), first[6]] + cells
+
+    return header, body()
+
+
+_BUILDERS = {
+    "requirements": _requirements_rows,
+    "dtr": _dtr_rows,
+    "journal": _journal_rows,
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if value is None:
+        return ""
+    return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    chunk = [writer.writerow(header)]
+    for row in rows:
+        chunk.append(writer.writerow([_csv_value(value) for value in row]))
+        if len(chunk) >= FLUSH_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+class _ZipStream:
+    """Write-only sink for ZipFile that hands out what has been written so far.
+
+    It has no ``tell``/``seek``, so ZipFile writes entries with trailing data
+    descriptors instead of seeking back, which is what makes streaming possible.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref, value):
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if value is None or value == "":
+        return ""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    text = escape(_XML_INVALID_RE.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row_no, values):
+    cells = "".join(_xlsx_cell(f"{_column_letter(i)}{row_no}", value) for i, value in enumerate(values))
+    return f'<row r="{row_no}">{cells}</row>'
+
+
+def _xlsx_package_parts(sheet_name):
+    xml_decl = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    return [
+        (
+            "[Content_Types].xml",
+            xml_decl
+            + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            + '<Default Extension="xml" ContentType="application/xml"/>'
+            + '<Override PartName="/xl/workbook.xml" '
+            + 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + '<Override PartName="/xl/worksheets/sheet1.xml" '
+            + 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            + "</Types>",
+        ),
+        (
+            "_rels/.rels",
+            xml_decl
+            + f'<Relationships xmlns="{_PACKAGE_RELS_NS}">'
+            + f'<Relationship Id="rId1" Type="{_RELATIONSHIP_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            + "</Relationships>",
+        ),
+        (
+            "xl/workbook.xml",
+            xml_decl
+            + f'<workbook xmlns="{_SPREADSHEET_NS}" xmlns:r="{_RELATIONSHIP_NS}">'
+            + f'<sheets><sheet name={quoteattr(sheet_name[:31])} sheetId="1" r:id="rId1"/></sheets>'
+            + "</workbook>",
+        ),
+        (
+            "xl/_rels/workbook.xml.rels",
+            xml_decl
+            + f'<Relationships xmlns="{_PACKAGE_RELS_NS}">'
+            + f'<Relationship Id="rId1" Type="{_RELATIONSHIP_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            + "</Relationships>",
+        ),
+    ]
+
+
+def stream_xlsx(sheet_name, header, rows):
+    """Yield a single-sheet XLSX workbook as it is written.
+
+    Cells are inline strings, so there is no shared-string table to build up;
+    memory use stays flat however many rows are exported.
+    """
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _xlsx_package_parts(sheet_name):
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                (
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<worksheet xmlns="{_SPREADSHEET_NS}"><sheetData>'
+                    + _xlsx_row(1, header)
+                ).encode("utf-8")
+            )
+            for row_no, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(row_no, row).encode("utf-8"))
+                if row_no % FLUSH_ROWS == 0:
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def export_filename(kind, school_year, section, file_format):
+    parts = [kind, school_year] + ([section] if section else [])
+    stem = re.sub(r"[^A-Za-z0-9]+", "_", "_".join(parts)).strip("_")
+    return f"{stem}.{file_format}"
+
+
+def stream_export(kind, file_format, school_year, section=""):
+    """Return an iterator over the encoded export, for StreamingHttpResponse."""
+    header, rows = _BUILDERS[kind](school_year, section)
+    if file_format == "xlsx":
+        return stream_xlsx(SHEET_NAMES[kind], header, rows)
+    return stream_csv(header, rows)
+
+
+_EXHAUSTED = object()
+
+
+async def aiter_export(chunks):
+    """Async view of a ``stream_export`` iterator for StreamingHttpResponse under ASGI.
+
+    Given a sync iterator, Django's ASGI handler would read it to the end with
+    ``sync_to_async(list)`` before sending anything. Here each chunk is pulled
+    on its own, on the request's thread-sensitive thread that owns the
+    server-side cursor, so memory stays at one chunk as under WSGI.
+    """
+    try:
+        while True:
+            chunk = await sync_to_async(next)(chunks, _EXHAUSTED)
+            if chunk is _EXHAUSTED:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
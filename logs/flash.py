@@ -0,0 +1,27 @@
+from django.contrib import messages
+
+_LEVELS = {
+    "success": messages.SUCCESS,
+    "error": messages.ERROR,
+    "warning": messages.WARNING,
+    "info": messages.INFO,
+}
+
+
+def flash(request, text, message_type="info"):
+    """Queue a one-time message for the next page that shows ``message``.
+
+    Messages ride in a signed cookie (messages framework), so setting or
+    reading one does not write the session.
+    """
+    messages.add_message(request, _LEVELS.get(message_type, messages.INFO), text)
+
+
+def pop_flash(request):
+    """Return ``(text, message_type)`` of the latest queued message, or ``(None, None)``."""
+    latest = None
+    for latest in messages.get_messages(request):
+        pass
+    if latest is None:
+        return None, None
+    return latest.message, latest.level_tag
@@ -0,0 +1,55 @@
+import tempfile
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+WEBP_QUALITY = 82
+THUMB_SUFFIX = "_thumb"
+
+# Encoded images stay in memory up to this size, then spill to a temp file.
+_SPOOL_BYTES = 1024 * 1024
+
+
+def _encode_webp(image, max_px):
+    resized = image.copy()
+    resized.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+    output = tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES)
+    resized.save(output, format="WEBP", quality=WEBP_QUALITY, method=4)
+    output.seek(0)
+    return output
+
+
+def prepare_profile_image(upload):
+    """Downscale an uploaded image and re-encode it as WebP.
+
+    Returns ``(image_file, thumbnail_file)``, both bounded by the
+    PROFILE_IMAGE_MAX_PX / PROFILE_THUMB_PX settings. Raises ``ValueError``
+    with a user-facing message when the upload is not a usable image.
+    """
+    if upload.size and upload.size > settings.PROFILE_IMAGE_MAX_BYTES:
+        raise ValueError("Image is too large.")
+    max_px = settings.PROFILE_IMAGE_MAX_PX
+    try:
+        upload.seek(0)
+        with Image.open(upload) as source:
+            # Lets the JPEG decoder skip straight to a reduced scale.
+            source.draft("RGB", (max_px, max_px))
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ValueError("Please upload a valid image file.") from exc
+    return _encode_webp(image, max_px), _encode_webp(image, settings.PROFILE_THUMB_PX)
+
+
+def thumbnail_path(object_path):
+    stem, dot, ext = object_path.rpartition(".")
+    if not dot:
+        return f"{object_path}{THUMB_SUFFIX}"
+    return f"{stem}{THUMB_SUFFIX}.{ext}"
+
+
+def profile_thumbnail_url(profile_url):
+    """Thumbnail URL for a profile image stored by this pipeline (WebP), else the URL itself."""
+    if not profile_url or not profile_url.endswith(".webp"):
+        return profile_url
+    return thumbnail_path(profile_url)
@@ -0,0 +1,137 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DDL_RE = re.compile(r"^\s*(create|alter|drop|truncate|comment)\b", re.IGNORECASE)
+
+
+class QueryStats:
+    """Collects every statement run on the database connections during one request."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append((sql, (time.perf_counter() - started) * 1000))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.statements)
+
+    @property
+    def duplicates(self):
+        counts = Counter(sql for sql, _ in self.statements)
+        return sum(n - 1 for n in counts.values() if n > 1)
+
+    @property
+    def ddl(self):
+        return sum(1 for sql, _ in self.statements if DDL_RE.match(sql))
+
+    def slowest(self, limit):
+        totals = {}
+        for sql, duration in self.statements:
+            calls, total = totals.get(sql, (0, 0.0))
+            totals[sql] = (calls + 1, total + duration)
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"sql": " ".join(sql.split())[:500], "calls": calls, "ms": round(total, 2)}
+            for sql, (calls, total) in ranked
+        ]
+
+
+class RequestMetricsMiddleware:
+    """Count queries and DB time per request.
+
+    Adds a ``Server-Timing`` header, writes one JSON log line per request and,
+    above ``SLOW_REQUEST_MS``, the ``SLOW_REQUEST_TOP_N`` most expensive statements.
+    Works in both the WSGI and ASGI handlers without forcing async views into
+    a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _watch_connections(stack, stats):
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(stats))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            self._watch_connections(stack, stats)
+            response = self.get_response(request)
+        return self._record(request, response, stats, (time.perf_counter() - started) * 1000)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+
+        stats = QueryStats()
+        started = time.perf_counter()
+        # Async views reach the ORM through sync_to_async, which runs on this
+        # request's thread-sensitive executor thread; database connections are
+        # per thread, so the wrappers are installed (and removed) there.
+        with ExitStack() as stack:
+            await sync_to_async(self._watch_connections)(stack, stats)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        return self._record(request, response, stats, (time.perf_counter() - started) * 1000)
+
+    def _record(self, request, response, stats, total_ms):
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"',
+                f"app;dur={max(total_ms - stats.total_ms, 0):.1f}",
+                f"total;dur={total_ms:.1f}",
+            ]
+        )
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": getattr(getattr(request, "resolver_match", None), "view_name", None),
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(stats.total_ms, 2),
+            "queries": stats.count,
+            "duplicates": stats.duplicates,
+            "ddl": stats.ddl,
+        }
+        slow = total_ms >= settings.SLOW_REQUEST_MS
+        if slow:
+            record["top_statements"] = stats.slowest(settings.SLOW_REQUEST_TOP_N)
+            logger.warning("slow_request %s", json.dumps(record, default=str))
+        else:
+            logger.info("request %s", json.dumps(record, default=str))
+        return response
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+
+import psycopg
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "section_changed"
+
+# Seconds between keepalive comments on an idle event stream.
+KEEPALIVE_SECONDS = 25
+# Browser reconnect delay sent with each stream.
+RETRY_MS = 5000
+# How long a listener waits on LISTEN between checks for remaining subscribers.
+_NOTIFY_POLL_SECONDS = 30
+_RECONNECT_MAX_SECONDS = 30
+
+
+def _listen_params():
+    params = connection.get_connection_params()
+    # Sync-connection specifics Django adds for its own cursors.
+    for key in ("cursor_factory", "context", "prepare_threshold"):
+        params.pop(key, None)
+    return params
+
+
+class SectionChangeHub:
+    """Fans out section_changed notifications to event streams in this process.
+
+    One LISTEN connection per process serves every open stream; it is opened
+    for the first subscriber and closed once none are left. Subscribers get
+    the new section version, or None after a reconnect (when notifications
+    may have been missed) so they re-read it.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._task = None
+        self._listening = None
+
+    def subscribe(self, section):
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(section, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._listening = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, section, queue):
+        queues = self._subscribers.get(section)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[section]
+
+    async def wait_listening(self, timeout):
+        try:
+            await asyncio.wait_for(self._listening.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _dispatch(self, payload):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        for queue in self._subscribers.get(data.get("section"), ()):
+            queue.put_nowait(data.get("version"))
+
+    def _resync_all(self):
+        for queues in self._subscribers.values():
+            for queue in queues:
+                queue.put_nowait(None)
+
+    async def _run(self):
+        delay = 1
+        connected_before = False
+        while self._subscribers:
+            try:
+                conn = await psycopg.AsyncConnection.connect(**_listen_params(), autocommit=True)
+                async with conn:
+                    await conn.execute(f"listen {CHANNEL}")
+                    self._listening.set()
+                    if connected_before:
+                        self._resync_all()
+                    connected_before = True
+                    delay = 1
+                    while self._subscribers:
+                        async for notify in conn.notifies(timeout=_NOTIFY_POLL_SECONDS):
+                            self._dispatch(notify.payload)
+            except (psycopg.Error, OSError):
+                logger.warning("Section change listener disconnected; retrying in %ss", delay, exc_info=True)
+                self._listening.clear()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RECONNECT_MAX_SECONDS)
+        self._listening.clear()
+
+
+hub = SectionChangeHub()
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def section_event_stream(section, read_version):
+    """Server-sent events for one section: a ``version`` event whenever it changes.
+
+    ``read_version`` is an async callable returning the section's current
+    version; it is used for the first event and after listener reconnects.
+    """
+    queue = hub.subscribe(section)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        await hub.wait_listening(timeout=5)
+        last_sent = await read_version()
+        yield _sse("version", {"version": last_sent})
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            # Coalesce a burst of bumps into one event.
+            items = [item]
+            while not queue.empty():
+                items.append(queue.get_nowait())
+            version = await read_version() if None in items else max(items)
+            if version != last_sent:
+                last_sent = version
+                yield _sse("version", {"version": version})
+    finally:
+        hub.unsubscribe(section, queue)
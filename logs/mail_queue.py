@@ -0,0 +1,205 @@
+import logging
+from email.mime.image import MIMEImage
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection
+from django.template.loader import render_to_string
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60 * 60
+# How long a claimed ("sending") message stays with the worker that claimed it
+# before another worker may pick it up again.
+CLAIM_LEASE_SECONDS = 10 * 60
+
+
+@lru_cache(maxsize=1)
+def _logo_part():
+    logo_path = Path(settings.BASE_DIR) / "ICSLIS LOGO.png"
+    if not logo_path.exists():
+        return None
+    img = MIMEImage(logo_path.read_bytes())
+    img.add_header("Content-ID", "<icslis-logo>")
+    img.add_header("Content-Disposition", "inline", filename="icslis-logo.png")
+    return img
+
+
+def enqueue_email(recipient, subject, text_body, template_name=None, context=None):
+    """Render the HTML part now and store the message in email_outbox for the worker."""
+    html_body = render_to_string(template_name, context or {}) if template_name else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            insert into email_outbox (recipient, subject, text_body, html_body)
+            values (%s, %s, %s, %s)
+            returning id
+            """,
+            [recipient, subject, text_body, html_body],
+        )
+        return cursor.fetchone()[0]
+
+
+def enqueue_emails(messages, activation_job_id=None):
+    """Queue several ``(recipient, subject, text_body, template_name, context)`` messages with one insert."""
+    if not messages:
+        return 0
+    columns = ([], [], [], [])
+    for recipient, subject, text_body, template_name, context in messages:
+        columns[0].append(recipient)
+        columns[1].append(subject)
+        columns[2].append(text_body)
+        columns[3].append(render_to_string(template_name, context or {}) if template_name else "")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            insert into email_outbox (recipient, subject, text_body, html_body, activation_job_id)
+            select m.recipient, m.subject, m.text_body, m.html_body, %s
+            from unnest(%s::text[], %s::text[], %s::text[], %s::text[])
+              as m(recipient, subject, text_body, html_body)
+            """,
+            [activation_job_id, *columns],
+        )
+        return cursor.rowcount
+
+
+def _build_message(row, smtp_connection):
+    _, recipient, subject, text_body, html_body, _ = row
+    msg = EmailMultiAlternatives(subject, text_body, None, [recipient], connection=smtp_connection)
+    if html_body:
+        msg.attach_alternative(html_body, "text/html")
+    logo = _logo_part()
+    if logo is not None:
+        msg.attach(logo)
+    return msg
+
+
+def _backoff_seconds(attempts):
+    return min(BASE_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)), MAX_BACKOFF_SECONDS)
+
+
+def _claim_batch(batch_size, activation_job_id=None):
+    """Mark up to ``batch_size`` due messages as 'sending' and return them.
+
+    The claim is a single short statement, so no transaction or row lock is
+    held while the messages are handed to SMTP. Claimed rows carry a lease in
+    next_attempt_at; if the worker dies before recording a result they become
+    due again once it runs out. The attempt is counted when it is claimed, so
+    a message that keeps killing its worker still runs out of attempts.
+    """
+    job_sql = "and activation_job_id = %s" if activation_job_id is not None else ""
+    job_params = [activation_job_id] if activation_job_id is not None else []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            update email_outbox
+            set status = 'failed', last_error = 'Claim expired without a recorded result.',
+                text_body = '', html_body = ''
+            where status = 'sending' and next_attempt_at <= now() and attempts >= %s
+            """,
+            [MAX_ATTEMPTS],
+        )
+        cursor.execute(
+            f"""
+            update email_outbox
+            set status = 'sending',
+                attempts = attempts + 1,
+                next_attempt_at = now() + make_interval(secs => %s)
+            where id in (
+              select id
+              from email_outbox
+              where status in ('pending', 'sending') and next_attempt_at <= now()
+                and attempts < %s {job_sql}
+              order by next_attempt_at, id
+              limit %s
+              for update skip locked
+            )
+            returning id, recipient, subject, text_body, html_body, attempts
+            """,
+            [CLAIM_LEASE_SECONDS, MAX_ATTEMPTS] + job_params + [batch_size],
+        )
+        return sorted(cursor.fetchall())
+
+
+def send_pending(batch_size=50, activation_job_id=None, smtp_connection=None):
+    """Send one batch of due outbox messages over a single SMTP connection.
+
+    Returns ``(sent_count, failed_count)``. The batch is claimed first (see
+    ``_claim_batch``) so several workers can drain the outbox without sending
+    a message twice, and each result is recorded as soon as it is known.
+    ``activation_job_id`` limits the batch to one bulk activation's mail, and
+    an already open ``smtp_connection`` can be passed to reuse it across
+    batches; it is left open for the caller.
+    """
+    rows = _claim_batch(batch_size, activation_job_id)
+    if not rows:
+        return 0, 0
+
+    sent = 0
+    failed = 0
+    with connection.cursor() as cursor:
+        owns_connection = smtp_connection is None
+        if owns_connection:
+            smtp_connection = get_connection()
+            try:
+                smtp_connection.open()
+            except Exception as exc:
+                logger.exception("Unable to open SMTP connection for email outbox")
+                for row in rows:
+                    _mark_failed(cursor, row, exc)
+                return 0, len(rows)
+
+        try:
+            for row in rows:
+                try:
+                    _build_message(row, smtp_connection).send()
+                except Exception as exc:
+                    logger.exception("Failed to send queued email %s to %s", row[0], row[1])
+                    _mark_failed(cursor, row, exc)
+                    failed += 1
+                    continue
+                # Bodies can carry activation codes and temporary passwords;
+                # do not keep them once delivered.
+                cursor.execute(
+                    """
+                    update email_outbox
+                    set status = 'sent', sent_at = now(),
+                        text_body = '', html_body = '', last_error = null
+                    where id = %s
+                    """,
+                    [row[0]],
+                )
+                sent += 1
+        finally:
+            if owns_connection:
+                smtp_connection.close()
+    return sent, failed
+
+
+def _mark_failed(cursor, row, exc):
+    # row[5] already counts this attempt (see _claim_batch).
+    attempts = row[5]
+    if attempts >= MAX_ATTEMPTS:
+        cursor.execute(
+            """
+            update email_outbox
+            set status = 'failed', last_error = %s, text_body = '', html_body = ''
+            where id = %s
+            """,
+            [str(exc)[:1000], row[0]],
+        )
+        return
+    cursor.execute(
+        """
+        update email_outbox
+        set status = 'pending',
+            last_error = %s,
+            next_attempt_at = now() + make_interval(secs => %s)
+        where id = %s
+        """,
+        [str(exc)[:1000], _backoff_seconds(attempts), row[0]],
+    )
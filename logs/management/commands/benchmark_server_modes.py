@@ -0,0 +1,112 @@
+import json
+import platform
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from logs.benchmark import BENCH_EMAIL_DOMAIN
+from logs.models import PracticumInstructor
+from logs.server_benchmark import (
+    BENCH_BUCKET,
+    SERVER_MODES,
+    app_server,
+    profile_upload_body,
+    run_upload_load,
+    slow_storage_server,
+    summarize,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI (gunicorn) and ASGI (uvicorn) throughput of the profile image upload "
+        "against a slow local storage stand-in, and report the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=40)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--delay", type=float, default=0.5, help="Seconds the storage stand-in takes per request.")
+        parser.add_argument("--workers", type=int, default=1, help="Server worker processes in both modes.")
+        parser.add_argument("--wsgi-threads", type=int, default=1, help="gunicorn threads per worker.")
+        parser.add_argument(
+            "--mode",
+            action="append",
+            dest="modes",
+            choices=SERVER_MODES,
+            help="Run only this server mode (repeatable).",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("benchmark_server_modes requires a PostgreSQL DATABASE_URL.")
+        account = (
+            PracticumInstructor.objects.filter(cca_email__endswith=f"@{BENCH_EMAIL_DOMAIN}", active_status=True)
+            .order_by("cca_email")
+            .first()
+        )
+        if account is None:
+            raise CommandError("No benchmark data found. Run `manage.py generate_benchmark_data` first.")
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session["account_id"] = str(account.id)
+        session["account_type"] = "instructor"
+        session.save()
+        csrf_token = get_random_string(32)
+        headers = {
+            "Cookie": f"{settings.SESSION_COOKIE_NAME}={session.session_key}; {settings.CSRF_COOKIE_NAME}={csrf_token}",
+            "X-CSRFToken": csrf_token,
+        }
+        body, content_type = profile_upload_body()
+        headers["Content-Type"] = content_type
+        path = reverse("upload_staff_profile_image")
+
+        original_profile_path = account.profile_path
+        results = {}
+        try:
+            for mode in options["modes"] or SERVER_MODES:
+                self.stderr.write(f"Running {mode}...")
+                with slow_storage_server(options["delay"]) as storage:
+                    try:
+                        with app_server(
+                            mode, storage.url, workers=options["workers"], threads=options["wsgi_threads"]
+                        ) as base_url:
+                            latencies, statuses, elapsed = run_upload_load(
+                                base_url,
+                                path,
+                                headers,
+                                body,
+                                requests=max(options["requests"], 1),
+                                concurrency=max(options["concurrency"], 1),
+                            )
+                    except RuntimeError as exc:
+                        raise CommandError(str(exc)) from exc
+                    results[mode] = summarize(latencies, statuses, elapsed, storage.handled)
+        finally:
+            PracticumInstructor.objects.filter(id=account.id).update(profile_path=original_profile_path)
+            session.delete()
+            with connection.cursor() as cursor:
+                cursor.execute("delete from storage_deletions where bucket = %s", [BENCH_BUCKET])
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "storage_delay_s": options["delay"],
+            "workers": options["workers"],
+            "wsgi_threads": options["wsgi_threads"],
+            "concurrency": options["concurrency"],
+            "modes": results,
+        }
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(payload)
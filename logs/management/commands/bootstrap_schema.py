@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from logs.schema import SCHEMA_VERSION, apply_schema, get_applied_version, pending_steps
+
+
+class Command(BaseCommand):
+    help = "Apply pending OJT schema steps (tables, columns, triggers) and record the schema version."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report pending steps; exit with an error if the schema is out of date.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("bootstrap_schema requires a PostgreSQL DATABASE_URL.")
+
+        applied_version = get_applied_version()
+        pending = pending_steps(applied_version)
+
+        if options["check"]:
+            if pending:
+                names = ", ".join(f"{version}:{name}" for version, name, _ in pending)
+                raise CommandError(
+                    f"Schema is at version {applied_version}, expected {SCHEMA_VERSION}. Pending: {names}"
+                )
+            self.stdout.write(self.style.SUCCESS(f"Schema is current (version {applied_version})."))
+            return
+
+        if not pending:
+            self.stdout.write(self.style.SUCCESS(f"Schema is current (version {applied_version})."))
+            return
+
+        applied = apply_schema(stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f"Applied {len(applied)} step(s). Schema is now at version {SCHEMA_VERSION}.")
+        )
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from logs.db_pool import pool_stats
+
+
+class Command(BaseCommand):
+    help = "Run a few round trips through the configured connection mode and print timings and pool counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=20, help="Number of request-like round trips to run.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("db_pool_stats requires a PostgreSQL DATABASE_URL.")
+
+        db = settings.DATABASES["default"]
+        mode = "pool" if db["OPTIONS"].get("pool") else f"persistent (CONN_MAX_AGE={db.get('CONN_MAX_AGE', 0)})"
+        self.stdout.write(f"Connection mode: {mode}")
+
+        timings = []
+        for _ in range(max(options["queries"], 1)):
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute("select 1")
+                cursor.fetchone()
+            # Mirror the request_finished handler so each round trip returns or
+            # keeps its connection the way a web request would.
+            close_old_connections()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"Round trips: {len(timings)}  median={timings[len(timings) // 2]:.1f}ms  slowest={timings[-1]:.1f}ms"
+        )
+
+        stats = pool_stats()
+        if stats is None:
+            self.stdout.write("Pooling is off; set DB_POOL=true to enable it.")
+            return
+        for key in sorted(stats):
+            self.stdout.write(f"  {key}: {stats[key]}")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from logs.benchmark import clear_benchmark_data, generate_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a tagged synthetic dataset (students, requirements, DTR, schedules, weekly journal, "
+        "sections, instructors and companies) for benchmarking. Re-running replaces the previous set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--sections", type=int, default=20)
+        parser.add_argument("--years", type=int, default=2, help="Number of school years to spread students over.")
+        parser.add_argument("--companies", type=int, default=100)
+        parser.add_argument("--seed", type=float, default=0.42, help="Postgres setseed() value, between -1 and 1.")
+        parser.add_argument("--clear", action="store_true", help="Only remove previously generated data.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("generate_benchmark_data requires a PostgreSQL DATABASE_URL.")
+        if options["sections"] < 1 or options["years"] < 1:
+            raise CommandError("--sections and --years must be at least 1.")
+
+        if options["clear"]:
+            with connection.cursor() as cursor:
+                clear_benchmark_data(cursor)
+            self.stdout.write(self.style.SUCCESS("Removed benchmark data."))
+            return
+
+        counts = generate_benchmark_data(
+            students=options["students"],
+            sections=options["sections"],
+            years=options["years"],
+            companies=options["companies"],
+            seed=options["seed"],
+        )
+        summary = ", ".join(f"{name}={count}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated benchmark data: {summary}"))
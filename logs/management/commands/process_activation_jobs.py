@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from logs.bulk_activation import DEFAULT_CHUNK_SIZE, claim_job, hash_pool, run_job, send_job_mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Run bulk student activations queued from Manage Records. Temporary passwords are hashed "
+        "in a process pool, each chunk is written with one update, and the job's emails are sent "
+        "over a single SMTP connection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, default=0, help="Hashing processes (default: BULK_ACTIVATION_WORKERS).")
+        parser.add_argument("--mail-batch-size", type=int, default=50)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep waiting for jobs, sleeping --interval seconds when there are none.",
+        )
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        with hash_pool(options["workers"] or None) as pool:
+            while True:
+                close_old_connections()
+                job = claim_job()
+                if job is None:
+                    if not options["loop"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+
+                scope = f"{job['school_year']}" + (f" / {job['section']}" if job["section"] else "")
+                self.stdout.write(f"Job {job['id']} ({scope}): started.")
+
+                def progress(activated, total, job_id=job["id"]):
+                    self.stdout.write(f"Job {job_id}: activated {activated}/{total}.")
+
+                try:
+                    activated, total = run_job(job, pool, chunk_size=max(options["chunk_size"], 1), progress=progress)
+                except Exception as exc:
+                    self.stderr.write(f"Job {job['id']} failed: {exc}")
+                    continue
+                sent, failed = send_job_mail(job["id"], batch_size=max(options["mail_batch_size"], 1))
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Job {job['id']}: activated {activated}/{total}, emails sent {sent}, failed {failed}."
+                    )
+                )
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from logs.mail_queue import send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued activation, recovery and temporary-password emails from email_outbox. "
+        "Each batch reuses one SMTP connection; failed messages are retried with backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep draining the outbox, sleeping --interval seconds when it is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            close_old_connections()
+            sent, failed = send_pending(batch_size=batch_size)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+            if not options["loop"]:
+                if sent + failed < batch_size:
+                    break
+                continue
+            if sent + failed < batch_size:
+                time.sleep(options["interval"])
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from logs.storage import delete_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete replaced or removed profile images queued in storage_deletions. "
+        "Each batch is one bulk delete request; failures are retried with backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep draining the queue, sleeping --interval seconds when it is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            close_old_connections()
+            deleted, failed = delete_pending(batch_size=batch_size)
+            if deleted or failed:
+                self.stdout.write(f"Deleted {deleted}, failed {failed}.")
+            if not options["loop"]:
+                if deleted + failed < batch_size:
+                    break
+                continue
+            if deleted + failed < batch_size:
+                time.sleep(options["interval"])
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete company checklist delete tombstones older than the retention window and record "
+        "the newest pruned revision, so older sync tokens fall back to a full reload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.COMPANY_CHECKLIST_DELETION_RETENTION_DAYS,
+            help="Keep tombstones from the last this many days.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    with pruned as (
+                      delete from company_checklist_deletions
+                      where deleted_at < now() - make_interval(days => %s)
+                      returning revision
+                    )
+                    select count(*), max(revision) from pruned
+                    """,
+                    [max(options["days"], 0)],
+                )
+                count, newest = cursor.fetchone()
+                if newest is not None:
+                    cursor.execute(
+                        """
+                        update company_checklist_revision
+                        set pruned_revision = greatest(pruned_revision, %s)
+                        where id
+                        """,
+                        [newest],
+                    )
+        self.stdout.write(f"Pruned {count} company checklist tombstone(s).")
@@ -0,0 +1,69 @@
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from logs.benchmark import build_scenarios, run_scenario
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main OJT views through the Django test client against the benchmark dataset and "
+        "report p50/p95 latency, query counts and peak memory per scenario as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Run only this scenario (repeatable).",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("run_benchmarks requires a PostgreSQL DATABASE_URL.")
+
+        try:
+            scenarios = build_scenarios(Client())
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        selected = options["scenarios"] or list(scenarios)
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(scenarios)}")
+
+        results = {}
+        for name in selected:
+            self.stderr.write(f"Running {name}...")
+            func, check = scenarios[name]
+            results[name] = run_scenario(
+                func, check, iterations=max(options["iterations"], 1), warmup=max(options["warmup"], 0)
+            )
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "database": connection.settings_dict.get("HOST"),
+            "scenarios": results,
+        }
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+        invalid = [name for name, result in results.items() if not result["valid"]]
+        if invalid:
+            raise CommandError(
+                f"Scenario(s) returned unexpected responses, so their timings are not valid: {', '.join(invalid)}"
+            )
@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "ratelimit"
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _digest(value):
+    return hashlib.sha1(str(value).encode("utf-8")).hexdigest()
+
+
+def client_ip(request):
+    """The client address, taking RATE_LIMIT_TRUSTED_PROXIES X-Forwarded-For hops into account."""
+    proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if proxies:
+        forwarded = [part.strip() for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if part.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _count_stat(scope, outcome):
+    key = f"ratelimit:stats:{scope}:{outcome}"
+    cache = _cache()
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+class RateLimited(Exception):
+    """Raised by ``check_rate_limit`` when a scope is over its limit; ``retry_after`` is in seconds."""
+
+    def __init__(self, scope, retry_after):
+        super().__init__(scope)
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_minutes(self):
+        return max(1, math.ceil(self.retry_after / 60))
+
+
+def _window(scope, ident, now):
+    limit, window = settings.RATE_LIMITS[scope]
+    slot = int(now // window)
+    prefix = f"ratelimit:{scope}:{_digest(ident)}"
+    return limit, window, f"{prefix}:{slot}", f"{prefix}:{slot - 1}", (now % window) / window
+
+
+def check_rate_limit(*checks):
+    """Count one attempt against each ``(scope, ident)`` pair, or raise ``RateLimited``.
+
+    Each scope is a sliding window of RATE_LIMITS[scope] = ``(limit, seconds)``,
+    estimated from the current and previous fixed windows. All pairs are
+    checked before any is counted, and rejected attempts are not counted.
+    """
+    now = time.time()
+    cache = _cache()
+    windows = [(scope, *_window(scope, ident, now)) for scope, ident in checks if ident]
+    counts = cache.get_many([key for window in windows for key in window[3:5]])
+    for scope, limit, window, current_key, previous_key, elapsed in windows:
+        estimate = counts.get(previous_key, 0) * (1 - elapsed) + counts.get(current_key, 0)
+        if estimate + 1 > limit:
+            _count_stat(scope, "blocked")
+            logger.warning("rate_limited scope=%s", scope)
+            raise RateLimited(scope, math.ceil(window * (1 - elapsed)))
+    for scope, limit, window, current_key, previous_key, elapsed in windows:
+        cache.add(current_key, 0, window * 2)
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, window * 2)
+        _count_stat(scope, "allowed")
+
+
+def reset_rate_limit(scope, ident):
+    """Forget the attempts of ``ident`` in ``scope`` (e.g. after a successful login)."""
+    _, _, current_key, previous_key, _ = _window(scope, ident, time.time())
+    _cache().delete_many([current_key, previous_key])
+
+
+def cooldown_remaining(scope, ident):
+    """Seconds left on a cooldown started with ``start_cooldown``, or 0."""
+    until = _cache().get(f"ratelimit:cooldown:{scope}:{_digest(ident)}")
+    return max(0, math.ceil(until - time.time())) if until else 0
+
+
+def start_cooldown(scope, ident, seconds):
+    _cache().set(f"ratelimit:cooldown:{scope}:{_digest(ident)}", time.time() + seconds, seconds)
+
+
+def rate_limit_stats():
+    """Allowed/blocked counters per scope since this cache was last cleared."""
+    cache = _cache()
+    keys = {
+        (scope, outcome): f"ratelimit:stats:{scope}:{outcome}"
+        for scope in settings.RATE_LIMITS
+        for outcome in ("allowed", "blocked")
+    }
+    values = cache.get_many(list(keys.values()))
+    report = {}
+    for (scope, outcome), key in keys.items():
+        limit, window = settings.RATE_LIMITS[scope]
+        entry = report.setdefault(scope, {"limit": limit, "window_seconds": window})
+        entry[outcome] = values.get(key, 0)
+    return report
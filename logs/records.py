@@ -0,0 +1,371 @@
+import datetime
+
+from django.db import connection, transaction
+
+REQUIREMENT_FIELDS = (
+    "practicum_application",
+    "letter_of_intent",
+    "endorsement_letter",
+    "practicum_parental_consent",
+    "acceptance_form",
+    "reply_form",
+    "practicum_training_agreement",
+    "attendance_sheet",
+    "weekly_journal",
+    "transmittal_form",
+    "evaluation_form",
+    "outreach_program_design",
+    "outreach_post_activity_report",
+    "ojt_log_sheet",
+    "requirements_checklist",
+    "cca_hymn",
+)
+
+# Requirements that move a student from "not started" to "ongoing".
+ONGOING_PREREQ_FIELDS = (
+    "practicum_application",
+    "letter_of_intent",
+    "endorsement_letter",
+    "practicum_parental_consent",
+    "acceptance_form",
+    "reply_form",
+    "practicum_training_agreement",
+    "ojt_log_sheet",
+    "requirements_checklist",
+)
+
+DTR_MONTH_FIELDS = (
+    "january_hours",
+    "february_hours",
+    "march_hours",
+    "april_hours",
+    "may_hours",
+    "june_hours",
+)
+
+# Grid column name -> attendance_sheet_dtr column.
+DTR_HOUR_FIELDS = {f"dtr_{f}": f for f in DTR_MONTH_FIELDS}
+
+DATE_FIELDS = ("start_of_ojt",)
+
+# attendance_sheet_dtr hour columns are Postgres integers.
+MAX_DTR_HOURS = 2_147_483_647
+
+MAX_BATCH_CHANGES = 2000
+
+COMPLETED_HOURS = 500
+
+# Total hours and OJT status are maintained per student in student_progress
+# (schema step 12) from the same fields and threshold as above.
+OJT_STATUSES = ("not_started", "ongoing", "completed")
+
+# Keyset sort orders; sr.id is appended as the unique tiebreaker.
+SORT_KEYS = {
+    "name": ("last_name", "first_name"),
+    "student_no": ("student_no",),
+    "section": ("section", "last_name", "first_name"),
+    "total_hours": ("total_hours",),
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Must match the expression of student_requirements_search_name_trgm_idx
+# (schema step 13) for the trigram index to be used.
+SEARCH_NAME_SQL = "lower(sr.first_name || ' ' || coalesce(sr.second_name, '') || ' ' || sr.last_name)"
+
+SEARCH_MIN_LENGTH = 2
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 25
+
+_RECORD_COLUMNS = ",\n".join(
+    [
+        "sr.id",
+        "sr.student_id",
+        "sr.student_no",
+        "sr.last_name",
+        "sr.first_name",
+        "sr.second_name",
+        "sr.middle_initial",
+        "sr.section",
+        "sr.program",
+        "sr.school_year",
+        "sr.start_of_ojt",
+    ]
+    + [f"coalesce(dtr.{f}, 0) as dtr_{f}" for f in DTR_MONTH_FIELDS]
+    + [f"sr.{f}" for f in REQUIREMENT_FIELDS]
+    + [
+        "coalesce(sp.total_hours, 0) as total_hours",
+        "coalesce(sp.ojt_status, 'not_started') as ojt_status",
+    ]
+)
+
+
+def full_name(first_name, second_name, middle_initial, last_name):
+    parts = [first_name]
+    if second_name and str(second_name).lower() not in {"none", "null"}:
+        parts.append(second_name)
+    if middle_initial and str(middle_initial).lower() not in {"none", "null"}:
+        parts.append(f"{middle_initial}.")
+    parts.append(last_name)
+    return " ".join(part for part in parts if part)
+
+
+def fetch_requirements_page(
+    school_year,
+    search="",
+    section="",
+    ojt_status="",
+    sort="name",
+    descending=False,
+    page_size=DEFAULT_PAGE_SIZE,
+    after=None,
+):
+    """Return ``(rows, last_key, has_more)`` for one keyset page of student requirements.
+
+    ``after`` is the ``last_key`` of the previous page. OJT status and the
+    hour total come from student_progress, so filtering happens before paging.
+    """
+    sort_columns = SORT_KEYS.get(sort, SORT_KEYS["name"]) + ("id",)
+    page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+    where_clauses = ["school_year = %s"]
+    params = [school_year]
+    if search:
+        where_clauses.append("(search_name like %s or lower(student_no) like %s)")
+        like = f"%{_escape_like(search.lower())}%"
+        params.extend([like, like])
+    if section:
+        where_clauses.append("section = %s")
+        params.append(section)
+    if ojt_status in OJT_STATUSES:
+        where_clauses.append("ojt_status = %s")
+        params.append(ojt_status)
+    if after and len(after) == len(sort_columns):
+        comparison = "<" if descending else ">"
+        where_clauses.append(
+            f"({', '.join(sort_columns)}) {comparison} ({', '.join(['%s'] * len(sort_columns))})"
+        )
+        params.extend(after)
+
+    direction = "desc" if descending else "asc"
+    order_sql = ", ".join(f"{column} {direction}" for column in sort_columns)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            select * from (
+              select
+                {_RECORD_COLUMNS},
+                {SEARCH_NAME_SQL} as search_name
+              from student_requirements sr
+              left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
+              left join student_progress sp on sp.student_id = sr.student_id
+            ) records
+            where {' and '.join(where_clauses)}
+            order by {order_sql}
+            limit %s
+            """,
+            params + [page_size + 1],
+        )
+        columns = [col[0] for col in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    last_key = None
+    if has_more and rows:
+        last_key = [str(rows[-1][column]) if column == "id" else rows[-1][column] for column in sort_columns]
+    return rows, last_key, has_more
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_rows(term, school_year, section, limit, offset):
+    like = f"%{_escape_like(term)}%"
+    filters = []
+    params = [term, like, like, like, term, term, term, term]
+    if school_year:
+        filters.append("sr.school_year = %s")
+        params.append(school_year)
+    if section:
+        filters.append("sr.section = %s")
+        params.append(section)
+    where_sql = f"where {' and '.join(filters)}" if filters else ""
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            with candidates as (
+              select sr.student_id from student_requirements sr
+              where %s <%% {SEARCH_NAME_SQL} or {SEARCH_NAME_SQL} like %s
+              union
+              select sr.student_id from student_requirements sr
+              where lower(sr.student_no) like %s
+              union
+              select s.id from students s
+              where s.cca_email like %s
+            )
+            select
+              {_RECORD_COLUMNS},
+              s.cca_email,
+              s.active_status,
+              greatest(
+                word_similarity(%s, {SEARCH_NAME_SQL}),
+                similarity(%s, lower(sr.student_no)),
+                similarity(%s, s.cca_email),
+                case when lower(sr.student_no) = %s then 1 else 0 end
+              ) as score
+            from candidates c
+            join student_requirements sr on sr.student_id = c.student_id
+            join students s on s.id = sr.student_id
+            left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
+            left join student_progress sp on sp.student_id = sr.student_id
+            {where_sql}
+            order by score desc, sr.last_name, sr.first_name, sr.id
+            limit %s offset %s
+            """,
+            params + [limit, offset],
+        )
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _normalize_search_term(term):
+    return " ".join((term or "").lower().split())
+
+
+def search_students(term, school_year="", section="", limit=SEARCH_DEFAULT_LIMIT):
+    """Return up to ``limit`` requirement rows ranked by trigram similarity to ``term``.
+
+    Candidates come from separate index-backed branches (name word similarity
+    or substring, student number, email) so each can use its own trigram
+    index; only the candidates are joined, filtered and ranked.
+    """
+    term = _normalize_search_term(term)
+    if len(term) < SEARCH_MIN_LENGTH:
+        return []
+    limit = max(1, min(int(limit or SEARCH_DEFAULT_LIMIT), SEARCH_MAX_LIMIT))
+    return _search_rows(term, school_year, section, limit, 0)
+
+
+def search_students_page(term, school_year="", section="", page=1, page_size=SEARCH_MAX_LIMIT):
+    """Return ``(rows, has_more)`` for one page of ``search_students`` ranking, without its cap."""
+    term = _normalize_search_term(term)
+    if len(term) < SEARCH_MIN_LENGTH:
+        return [], False
+    page = max(int(page or 1), 1)
+    page_size = max(1, int(page_size or SEARCH_MAX_LIMIT))
+    rows = _search_rows(term, school_year, section, page_size + 1, (page - 1) * page_size)
+    return rows[:page_size], len(rows) > page_size
+
+
+def serialize_requirement_row(row):
+    reqs = {"start_of_ojt": row["start_of_ojt"].isoformat() if row["start_of_ojt"] else ""}
+    for field in DTR_MONTH_FIELDS:
+        reqs[f"dtr_{field}"] = int(row[f"dtr_{field}"] or 0)
+    for field in REQUIREMENT_FIELDS:
+        reqs[field] = bool(row[field])
+    return {
+        "name": full_name(row["first_name"], row["second_name"], row["middle_initial"], row["last_name"]),
+        "student_no": row["student_no"],
+        "section": row["section"],
+        "program": row["program"],
+        "school_year": row["school_year"],
+        "total_hours": int(row["total_hours"] or 0),
+        "ojt_status": row["ojt_status"],
+        "reqs": reqs,
+    }
+
+
+def parse_requirement_value(field, value):
+    """Validate one grid cell; returns ``(parsed_value, error_message)``."""
+    if field in REQUIREMENT_FIELDS:
+        # Exact matches only: 1 == True, so a plain ``in`` test would accept 1/0.
+        if isinstance(value, bool):
+            return value, None
+        if value == "true":
+            return True, None
+        if value == "false":
+            return False, None
+        return None, "Invalid update request."
+    if field in DATE_FIELDS:
+        if not value:
+            return None, None
+        try:
+            return datetime.datetime.strptime(str(value), "%Y-%m-%d").date(), None
+        except ValueError:
+            return None, "Invalid date format."
+    if field in DTR_HOUR_FIELDS:
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            return None, "Hours must be a valid number."
+        try:
+            hours = int(value)
+        except (TypeError, ValueError):
+            return None, "Hours must be a valid number."
+        if hours < 0:
+            return None, "Hours cannot be negative."
+        if hours > MAX_DTR_HOURS:
+            return None, "Hours must be a valid number."
+        return hours, None
+    return None, "Invalid update request."
+
+
+def apply_requirement_changes(changes):
+    """Apply validated ``(student_id, field, value)`` changes in one transaction.
+
+    Changes are grouped per column and written with one ``unnest`` update per
+    column, so the statement count depends on how many distinct fields were
+    touched, not on how many cells. A later change to the same cell wins.
+    Returns the set of ``(student_id, field)`` pairs that matched a row.
+    """
+    by_field = {}
+    for student_id, field, value in changes:
+        by_field.setdefault(field, {})[str(student_id)] = value
+
+    applied = set()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for field, values in by_field.items():
+                if field in DTR_HOUR_FIELDS:
+                    continue
+                column_type = "date" if field in DATE_FIELDS else "boolean"
+                cursor.execute(
+                    f"""
+                    update student_requirements sr
+                    set {field} = v.value
+                    from unnest(%s::uuid[], %s::{column_type}[]) as v(student_id, value)
+                    where sr.student_id = v.student_id
+                    returning sr.student_id
+                    """,
+                    [list(values), list(values.values())],
+                )
+                applied.update((str(row[0]), field) for row in cursor.fetchall())
+
+            dtr_students = sorted({sid for f, values in by_field.items() if f in DTR_HOUR_FIELDS for sid in values})
+            if dtr_students:
+                cursor.execute(
+                    """
+                    insert into attendance_sheet_dtr (student_id)
+                    select s.id from students s where s.id = any(%s::uuid[])
+                    on conflict (student_id) do nothing
+                    """,
+                    [dtr_students],
+                )
+            for field, values in by_field.items():
+                if field not in DTR_HOUR_FIELDS:
+                    continue
+                cursor.execute(
+                    f"""
+                    update attendance_sheet_dtr dtr
+                    set {DTR_HOUR_FIELDS[field]} = v.value
+                    from unnest(%s::uuid[], %s::int[]) as v(student_id, value)
+                    where dtr.student_id = v.student_id
+                    returning dtr.student_id
+                    """,
+                    [list(values), list(values.values())],
+                )
+                applied.update((str(row[0]), field) for row in cursor.fetchall())
+    return applied
@@ -0,0 +1,1219 @@
+import logging
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = "ojt_schema_version"
+
+# Each step is (version, name, [statements]). Steps are applied in order by
+# `manage.py bootstrap_schema` and recorded in ojt_schema_version, so the
+# request path never has to issue DDL. Append new steps; never edit old ones.
+SCHEMA_STEPS = [
+    (
+        1,
+        "section_list_and_instructors",
+        [
+            """
+            create table if not exists section_list (
+              id uuid primary key default gen_random_uuid(),
+              section text not null,
+              school_year text not null,
+              created_at timestamptz not null default now(),
+              unique (section, school_year)
+            )
+            """,
+            """
+            create table if not exists section_instructors (
+              id uuid primary key default gen_random_uuid(),
+              section_id uuid not null references section_list(id) on delete cascade,
+              instructor_id uuid references practicum_instructors(id) on delete cascade,
+              coordinator_id uuid references practicum_coordinators(id) on delete cascade,
+              assigned_at timestamptz not null default now(),
+              unique (section_id)
+            )
+            """,
+            "alter table section_instructors add column if not exists coordinator_id uuid references practicum_coordinators(id) on delete cascade",
+            # Also make instructor_id nullable in case only coordinator is assigned
+            "alter table section_instructors alter column instructor_id drop not null",
+        ],
+    ),
+    (
+        2,
+        "student_requirements_columns_and_dtr",
+        [
+            "alter table student_requirements add column if not exists start_of_ojt date",
+            "alter table student_requirements add column if not exists attendance_sheet boolean not null default false",
+            """
+            create table if not exists attendance_sheet_dtr (
+              id uuid primary key default gen_random_uuid(),
+              student_id uuid not null unique references students(id) on delete cascade,
+              january_hours int not null default 0 check (january_hours >= 0),
+              february_hours int not null default 0 check (february_hours >= 0),
+              march_hours int not null default 0 check (march_hours >= 0),
+              april_hours int not null default 0 check (april_hours >= 0),
+              may_hours int not null default 0 check (may_hours >= 0),
+              june_hours int not null default 0 check (june_hours >= 0),
+              created_at timestamptz not null default now(),
+              updated_at timestamptz not null default now()
+            )
+            """,
+        ],
+    ),
+    (
+        3,
+        "company_checklist",
+        [
+            """
+            create table if not exists company_checklist (
+              id uuid primary key default gen_random_uuid(),
+              company_name text not null default '',
+              city_resolution_checked boolean not null default false,
+              city_resolution_passed_at timestamptz,
+              city_resolution_status text
+                check (city_resolution_status in ('pending', 'approved') or city_resolution_status is null),
+              city_resolution_returned_at timestamptz,
+              company_signing_checked boolean not null default false,
+              company_signing_passed_at timestamptz,
+              office_president_checked boolean not null default false,
+              office_president_passed_at timestamptz,
+              processed_notarized_checked boolean not null default false,
+              processed_notarized_passed_at timestamptz,
+              created_at timestamptz not null default now(),
+              updated_at timestamptz not null default now()
+            )
+            """,
+            """
+            create index if not exists company_checklist_created_at_idx
+              on company_checklist (created_at)
+            """,
+            """
+            create table if not exists company_partnered (
+              id uuid primary key default gen_random_uuid(),
+              checklist_row_id uuid not null unique references company_checklist(id) on delete cascade,
+              company_name text not null default '',
+              moa_start_date date not null,
+              moa_expiration_date date,
+              created_at timestamptz not null default now(),
+              updated_at timestamptz not null default now()
+            )
+            """,
+            """
+            create index if not exists company_partnered_moa_start_date_idx
+              on company_partnered (moa_start_date)
+            """,
+            """
+            create or replace function set_company_checklist_updated_at()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              new.updated_at := now();
+              return new;
+            end;
+            $$;
+            """,
+            """
+            create or replace function set_company_partnered_updated_at()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              new.updated_at := now();
+              return new;
+            end;
+            $$;
+            """,
+            "drop trigger if exists company_checklist_updated_at_trg on company_checklist",
+            """
+            create trigger company_checklist_updated_at_trg
+            before update on company_checklist
+            for each row
+            execute function set_company_checklist_updated_at()
+            """,
+            "drop trigger if exists company_partnered_updated_at_trg on company_partnered",
+            """
+            create trigger company_partnered_updated_at_trg
+            before update on company_partnered
+            for each row
+            execute function set_company_partnered_updated_at()
+            """,
+        ],
+    ),
+    (
+        4,
+        "students_sync_triggers_bulk_import_guard",
+        [
+            # Bulk CSV imports set ojt.bulk_import and reconcile requirements/DTR
+            # rows set-based, so the per-row sync triggers can skip that work.
+            """
+            create or replace function sync_student_requirements_row()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if current_setting('ojt.bulk_import', true) = 'on' then
+                return new;
+              end if;
+
+              insert into student_requirements (
+                student_id,
+                last_name,
+                first_name,
+                second_name,
+                middle_initial,
+                student_no,
+                section,
+                program,
+                school_year
+              )
+              values (
+                new.id,
+                new.last_name,
+                new.first_name,
+                new.second_name,
+                new.middle_initial,
+                new.student_no,
+                new.section,
+                new.program,
+                new.school_year
+              )
+              on conflict (student_id) do update
+              set
+                last_name = excluded.last_name,
+                first_name = excluded.first_name,
+                second_name = excluded.second_name,
+                middle_initial = excluded.middle_initial,
+                student_no = excluded.student_no,
+                section = excluded.section,
+                program = excluded.program,
+                school_year = excluded.school_year;
+              return new;
+            end;
+            $$;
+            """,
+            """
+            create or replace function sync_attendance_sheet_dtr_row()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if current_setting('ojt.bulk_import', true) = 'on' then
+                return new;
+              end if;
+
+              insert into attendance_sheet_dtr (student_id)
+              values (new.id)
+              on conflict (student_id) do nothing;
+              return new;
+            end;
+            $$;
+            """,
+        ],
+    ),
+    (
+        5,
+        "email_outbox",
+        [
+            """
+            create table if not exists email_outbox (
+              id bigserial primary key,
+              recipient text not null,
+              subject text not null,
+              text_body text not null,
+              html_body text not null default '',
+              status text not null default 'pending' check (status in ('pending', 'sent', 'failed')),
+              attempts int not null default 0,
+              last_error text,
+              next_attempt_at timestamptz not null default now(),
+              created_at timestamptz not null default now(),
+              sent_at timestamptz
+            )
+            """,
+            """
+            create index if not exists email_outbox_pending_idx
+              on email_outbox (next_attempt_at)
+              where status = 'pending'
+            """,
+        ],
+    ),
+    (
+        6,
+        "account_directory_view",
+        [
+            # One lookup across all three account tables; each branch is served
+            # by that table's unique cca_email index.
+            """
+            create or replace view account_directory as
+            select 'student'::text as role, id, cca_email, password, active_status,
+                   is_password_temp, activation_code, recovery_code
+            from students
+            union all
+            select 'coordinator'::text, id, cca_email, password, active_status,
+                   is_password_temp, activation_code, recovery_code
+            from practicum_coordinators
+            union all
+            select 'instructor'::text, id, cca_email, password, active_status,
+                   is_password_temp, activation_code, recovery_code
+            from practicum_instructors
+            """,
+        ],
+    ),
+    (
+        7,
+        "student_requirements_keyset_indexes",
+        [
+            """
+            create index if not exists student_requirements_year_name_idx
+              on student_requirements (school_year, last_name, first_name, id)
+            """,
+            """
+            create index if not exists student_requirements_year_section_idx
+              on student_requirements (school_year, section, last_name, first_name, id)
+            """,
+        ],
+    ),
+    (
+        8,
+        "section_versions",
+        [
+            # Bumped by statement-level triggers whenever requirements, DTR hours
+            # or weekly journal rows of a section change; cached section detail
+            # payloads are keyed by this counter.
+            """
+            create table if not exists section_versions (
+              section text primary key,
+              version bigint not null default 0,
+              updated_at timestamptz not null default now()
+            )
+            """,
+            """
+            create or replace function bump_section_versions_from_requirements()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if tg_op in ('INSERT', 'UPDATE') then
+                insert into section_versions as sv (section, version)
+                select distinct n.section, 1 from new_rows n where n.section is not null
+                on conflict (section) do update
+                set version = sv.version + 1, updated_at = now();
+              end if;
+              if tg_op in ('UPDATE', 'DELETE') then
+                insert into section_versions as sv (section, version)
+                select distinct o.section, 1 from old_rows o where o.section is not null
+                on conflict (section) do update
+                set version = sv.version + 1, updated_at = now();
+              end if;
+              return null;
+            end;
+            $$;
+            """,
+            """
+            create or replace function bump_section_versions_from_dtr()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if tg_op in ('INSERT', 'UPDATE') then
+                insert into section_versions as sv (section, version)
+                select distinct sr.section, 1
+                from new_rows n
+                join student_requirements sr on sr.student_id = n.student_id
+                on conflict (section) do update
+                set version = sv.version + 1, updated_at = now();
+              end if;
+              if tg_op = 'DELETE' then
+                insert into section_versions as sv (section, version)
+                select distinct sr.section, 1
+                from old_rows o
+                join student_requirements sr on sr.student_id = o.student_id
+                on conflict (section) do update
+                set version = sv.version + 1, updated_at = now();
+              end if;
+              return null;
+            end;
+            $$;
+            """,
+            """
+            create or replace function bump_section_versions_from_weekly_journal()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if tg_op in ('INSERT', 'UPDATE') then
+                insert into section_versions as sv (section, version)
+                select distinct n.section, 1 from new_rows n
+                on conflict (section) do update
+                set version = sv.version + 1, updated_at = now();
+              end if;
+              if tg_op in ('UPDATE', 'DELETE') then
+                insert into section_versions as sv (section, version)
+                select distinct o.section, 1 from old_rows o
+                on conflict (section) do update
+                set version = sv.version + 1, updated_at = now();
+              end if;
+              return null;
+            end;
+            $$;
+            """,
+        ]
+        + [
+            statement
+            for table, function in (
+                ("student_requirements", "bump_section_versions_from_requirements"),
+                ("attendance_sheet_dtr", "bump_section_versions_from_dtr"),
+                ("weekly_journal", "bump_section_versions_from_weekly_journal"),
+            )
+            for event, referencing in (
+                ("insert", "new table as new_rows"),
+                ("update", "old table as old_rows new table as new_rows"),
+                ("delete", "old table as old_rows"),
+            )
+            for statement in (
+                f"drop trigger if exists {table}_section_version_{event}_trg on {table}",
+                f"""
+                create trigger {table}_section_version_{event}_trg
+                after {event} on {table}
+                referencing {referencing}
+                for each statement
+                execute function {function}()
+                """,
+            )
+        ],
+    ),
+    (
+        9,
+        "journal_calendar",
+        [
+            # Precomputed weekday occurrences per month, generated once per year,
+            # so journal syncs join against it instead of calling
+            # get_due_date_for_week (a generate_series scan) per candidate row.
+            """
+            create table if not exists journal_calendar (
+              year int not null,
+              month smallint not null check (month between 1 and 12),
+              submission_day smallint not null check (submission_day between 1 and 5),
+              week_no smallint not null check (week_no between 1 and 5),
+              due_date date not null,
+              primary key (year, month, submission_day, week_no)
+            )
+            """,
+            """
+            create or replace function ensure_journal_calendar(p_year int)
+            returns void
+            language plpgsql
+            as $$
+            begin
+              if exists (select 1 from journal_calendar where year = p_year) then
+                return;
+              end if;
+
+              insert into journal_calendar (year, month, submission_day, week_no, due_date)
+              select
+                p_year,
+                extract(month from d)::smallint,
+                extract(isodow from d)::smallint,
+                row_number() over (
+                  partition by extract(month from d), extract(isodow from d)
+                  order by d
+                )::smallint,
+                d::date
+              from generate_series(make_date(p_year, 1, 1), make_date(p_year, 12, 31), interval '1 day') as d
+              where extract(isodow from d) between 1 and 5
+              on conflict do nothing;
+            end;
+            $$;
+            """,
+            """
+            create or replace function get_due_date_for_week(
+              p_year int,
+              p_month int,
+              p_submission_day int,
+              p_week_no int
+            )
+            returns date
+            language plpgsql
+            as $$
+            declare
+              result date;
+            begin
+              select due_date into result
+              from journal_calendar
+              where year = p_year
+                and month = p_month
+                and submission_day = p_submission_day
+                and week_no = p_week_no;
+
+              if not found and not exists (select 1 from journal_calendar where year = p_year) then
+                perform ensure_journal_calendar(p_year);
+                select due_date into result
+                from journal_calendar
+                where year = p_year
+                  and month = p_month
+                  and submission_day = p_submission_day
+                  and week_no = p_week_no;
+              end if;
+
+              return result;
+            end;
+            $$;
+            """,
+            """
+            create or replace function sync_weekly_journal(p_year int)
+            returns void
+            language plpgsql
+            as $$
+            begin
+              perform ensure_journal_calendar(p_year);
+
+              insert into weekly_journal (
+                student_id,
+                section,
+                year,
+                month,
+                week_no,
+                submission_day,
+                due_date
+              )
+              select
+                s.id,
+                s.section,
+                p_year,
+                jc.month,
+                jc.week_no,
+                sch.submission_day,
+                jc.due_date
+              from students s
+              join submission_schedules sch on sch.section = s.section
+              join journal_calendar jc
+                on jc.year = p_year
+               and jc.submission_day = sch.submission_day
+               and jc.month between 1 and 6
+              on conflict do nothing;
+            end;
+            $$;
+            """,
+            """
+            create or replace function sync_weekly_journal_for_section(p_year int, p_section text)
+            returns void
+            language plpgsql
+            as $$
+            declare
+              v_day int;
+            begin
+              select submission_day into v_day
+              from submission_schedules
+              where section = p_section;
+
+              if v_day is null then
+                return;
+              end if;
+
+              perform ensure_journal_calendar(p_year);
+
+              update weekly_journal w
+              set submission_day = v_day,
+                  due_date = jc.due_date
+              from journal_calendar jc
+              where w.section = p_section
+                and w.year = p_year
+                and jc.year = w.year
+                and jc.month = w.month
+                and jc.submission_day = v_day
+                and jc.week_no = w.week_no
+                and (w.submission_day <> v_day or w.due_date <> jc.due_date);
+
+              delete from weekly_journal w
+              where w.section = p_section
+                and w.year = p_year
+                and not exists (
+                  select 1 from journal_calendar jc
+                  where jc.year = w.year
+                    and jc.month = w.month
+                    and jc.submission_day = v_day
+                    and jc.week_no = w.week_no
+                );
+
+              insert into weekly_journal (
+                student_id,
+                section,
+                year,
+                month,
+                week_no,
+                submission_day,
+                due_date
+              )
+              select
+                s.id,
+                s.section,
+                p_year,
+                jc.month,
+                jc.week_no,
+                v_day,
+                jc.due_date
+              from students s
+              join journal_calendar jc
+                on jc.year = p_year
+               and jc.submission_day = v_day
+               and jc.month between 1 and 6
+              where s.section = p_section
+              on conflict do nothing;
+            end;
+            $$;
+            """,
+            "create index if not exists weekly_journal_section_year_idx on weekly_journal (section, year)",
+        ],
+    ),
+    (
+        10,
+        "weekly_journal_sync_watermark",
+        [
+            # A section's journal rows only need reconciling after its submission
+            # schedule or membership changes. Those changes bump change_version;
+            # a sync records the version it reconciled up to.
+            """
+            create table if not exists weekly_journal_section_changes (
+              section text primary key,
+              change_version bigint not null default 1,
+              changed_at timestamptz not null default now()
+            )
+            """,
+            """
+            create table if not exists weekly_journal_sync (
+              section text not null,
+              year int not null,
+              synced_version bigint not null,
+              synced_at timestamptz not null default now(),
+              primary key (section, year)
+            )
+            """,
+            """
+            create or replace function mark_weekly_journal_sections_changed(p_sections text[])
+            returns void
+            language sql
+            as $$
+              insert into weekly_journal_section_changes as c (section)
+              select distinct s from unnest(p_sections) as s where s is not null
+              on conflict (section) do update
+              set change_version = c.change_version + 1, changed_at = now();
+            $$;
+            """,
+            """
+            create or replace function weekly_journal_schedule_changed()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if tg_op in ('UPDATE', 'DELETE') then
+                perform mark_weekly_journal_sections_changed(array[old.section]);
+              end if;
+              if tg_op in ('INSERT', 'UPDATE') then
+                perform mark_weekly_journal_sections_changed(array[new.section]);
+              end if;
+              return null;
+            end;
+            $$;
+            """,
+            "drop trigger if exists submission_schedules_journal_sync_trg on submission_schedules",
+            """
+            create trigger submission_schedules_journal_sync_trg
+            after insert or update or delete on submission_schedules
+            for each row
+            execute function weekly_journal_schedule_changed()
+            """,
+            """
+            create or replace function weekly_journal_membership_changed()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if tg_op = 'INSERT' then
+                perform mark_weekly_journal_sections_changed(array(select n.section from new_rows n));
+              elsif tg_op = 'DELETE' then
+                perform mark_weekly_journal_sections_changed(array(select o.section from old_rows o));
+              else
+                perform mark_weekly_journal_sections_changed(array(
+                  select unnest(array[o.section, n.section])
+                  from old_rows o
+                  join new_rows n on n.id = o.id
+                  where o.section is distinct from n.section
+                ));
+              end if;
+              return null;
+            end;
+            $$;
+            """,
+        ]
+        + [
+            statement
+            for event, referencing in (
+                ("insert", "new table as new_rows"),
+                ("update", "old table as old_rows new table as new_rows"),
+                ("delete", "old table as old_rows"),
+            )
+            for statement in (
+                f"drop trigger if exists students_journal_sync_{event}_trg on students",
+                f"""
+                create trigger students_journal_sync_{event}_trg
+                after {event} on students
+                referencing {referencing}
+                for each statement
+                execute function weekly_journal_membership_changed()
+                """,
+            )
+        ]
+        + [
+            """
+            create or replace function sync_weekly_journal_for_section_if_stale(p_year int, p_section text)
+            returns boolean
+            language plpgsql
+            as $$
+            declare
+              v_change bigint;
+            begin
+              select coalesce(
+                (select change_version from weekly_journal_section_changes where section = p_section),
+                0
+              ) into v_change;
+
+              if exists (
+                select 1 from weekly_journal_sync
+                where section = p_section and year = p_year and synced_version >= v_change
+              ) then
+                return false;
+              end if;
+
+              perform pg_advisory_xact_lock(hashtext('weekly_journal_sync:' || p_section));
+
+              -- Another session may have finished the same sync while we waited.
+              select coalesce(
+                (select change_version from weekly_journal_section_changes where section = p_section),
+                0
+              ) into v_change;
+              if exists (
+                select 1 from weekly_journal_sync
+                where section = p_section and year = p_year and synced_version >= v_change
+              ) then
+                return false;
+              end if;
+
+              perform sync_weekly_journal_for_section(p_year, p_section);
+
+              insert into weekly_journal_sync as ws (section, year, synced_version)
+              values (p_section, p_year, v_change)
+              on conflict (section, year) do update
+              set synced_version = excluded.synced_version, synced_at = now();
+
+              return true;
+            end;
+            $$;
+            """,
+        ],
+    ),
+    (
+        11,
+        "company_checklist_revisions",
+        [
+            # One counter row for checklist and partnered changes. Writers take its
+            # row lock, so revisions become visible in commit order and a client
+            # holding revision N can ask for exactly the changes after it.
+            """
+            create table if not exists company_checklist_revision (
+              id boolean primary key default true check (id),
+              revision bigint not null default 0
+            )
+            """,
+            "insert into company_checklist_revision (id, revision) values (true, 0) on conflict (id) do nothing",
+            "alter table company_checklist add column if not exists revision bigint not null default 0",
+            "alter table company_partnered add column if not exists revision bigint not null default 0",
+            "create index if not exists company_checklist_revision_idx on company_checklist (revision)",
+            "create index if not exists company_partnered_revision_idx on company_partnered (revision)",
+            """
+            create table if not exists company_checklist_deletions (
+              kind text not null check (kind in ('checklist', 'partnered')),
+              checklist_row_id uuid not null,
+              revision bigint not null,
+              deleted_at timestamptz not null default now()
+            )
+            """,
+            """
+            create index if not exists company_checklist_deletions_revision_idx
+              on company_checklist_deletions (revision)
+            """,
+            """
+            create or replace function next_company_checklist_revision()
+            returns bigint
+            language sql
+            as $$
+              update company_checklist_revision
+              set revision = revision + 1
+              where id
+              returning revision;
+            $$;
+            """,
+            """
+            create or replace function stamp_company_checklist_revision()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              new.revision := next_company_checklist_revision();
+              return new;
+            end;
+            $$;
+            """,
+            """
+            create or replace function record_company_checklist_deletion()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              insert into company_checklist_deletions (kind, checklist_row_id, revision)
+              values ('checklist', old.id, next_company_checklist_revision());
+              return null;
+            end;
+            $$;
+            """,
+            """
+            create or replace function record_company_partnered_deletion()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              insert into company_checklist_deletions (kind, checklist_row_id, revision)
+              values ('partnered', old.checklist_row_id, next_company_checklist_revision());
+              return null;
+            end;
+            $$;
+            """,
+            "drop trigger if exists company_checklist_revision_trg on company_checklist",
+            """
+            create trigger company_checklist_revision_trg
+            before insert or update on company_checklist
+            for each row
+            execute function stamp_company_checklist_revision()
+            """,
+            "drop trigger if exists company_partnered_revision_trg on company_partnered",
+            """
+            create trigger company_partnered_revision_trg
+            before insert or update on company_partnered
+            for each row
+            execute function stamp_company_checklist_revision()
+            """,
+            "drop trigger if exists company_checklist_deletion_trg on company_checklist",
+            """
+            create trigger company_checklist_deletion_trg
+            after delete on company_checklist
+            for each row
+            execute function record_company_checklist_deletion()
+            """,
+            "drop trigger if exists company_partnered_deletion_trg on company_partnered",
+            """
+            create trigger company_partnered_deletion_trg
+            after delete on company_partnered
+            for each row
+            execute function record_company_partnered_deletion()
+            """,
+        ],
+    ),
+    (
+        12,
+        "student_progress",
+        [
+            # Per-student summary kept current by statement-level triggers, so
+            # dashboards and the records grid read hours and OJT status instead
+            # of recomputing them per request.
+            """
+            create table if not exists student_progress (
+              student_id uuid primary key references students(id) on delete cascade,
+              section text not null,
+              school_year text,
+              total_hours int not null default 0,
+              requirements_done_count smallint not null default 0,
+              requirements_done boolean not null default false,
+              ojt_status text not null default 'not_started'
+                check (ojt_status in ('not_started', 'ongoing', 'completed')),
+              updated_at timestamptz not null default now()
+            )
+            """,
+            "create index if not exists student_progress_year_section_idx on student_progress (school_year, section)",
+            "create index if not exists student_progress_year_status_idx on student_progress (school_year, ojt_status)",
+            """
+            create or replace function refresh_student_progress(p_student_ids uuid[])
+            returns void
+            language plpgsql
+            as $$
+            begin
+              delete from student_progress sp
+              where sp.student_id = any(p_student_ids)
+                and not exists (select 1 from student_requirements sr where sr.student_id = sp.student_id);
+
+              insert into student_progress as sp (
+                student_id,
+                section,
+                school_year,
+                total_hours,
+                requirements_done_count,
+                requirements_done,
+                ojt_status,
+                updated_at
+              )
+              select
+                c.student_id,
+                c.section,
+                c.school_year,
+                c.total_hours,
+                c.done_count,
+                c.done_count = 16,
+                case
+                  when c.total_hours >= 500 then 'completed'
+                  when c.prereqs_done then 'ongoing'
+                  else 'not_started'
+                end,
+                now()
+              from (
+                select
+                  sr.student_id,
+                  sr.section,
+                  sr.school_year,
+                  coalesce(dtr.january_hours, 0) + coalesce(dtr.february_hours, 0)
+                    + coalesce(dtr.march_hours, 0) + coalesce(dtr.april_hours, 0)
+                    + coalesce(dtr.may_hours, 0) + coalesce(dtr.june_hours, 0) as total_hours,
+                  (
+                    sr.practicum_application::int + sr.letter_of_intent::int + sr.endorsement_letter::int
+                    + sr.practicum_parental_consent::int + sr.acceptance_form::int + sr.reply_form::int
+                    + sr.practicum_training_agreement::int + sr.attendance_sheet::int + sr.weekly_journal::int
+                    + sr.transmittal_form::int + sr.evaluation_form::int + sr.outreach_program_design::int
+                    + sr.outreach_post_activity_report::int + sr.ojt_log_sheet::int
+                    + sr.requirements_checklist::int + sr.cca_hymn::int
+                  ) as done_count,
+                  (
+                    sr.practicum_application and sr.letter_of_intent and sr.endorsement_letter
+                    and sr.practicum_parental_consent and sr.acceptance_form and sr.reply_form
+                    and sr.practicum_training_agreement and sr.ojt_log_sheet and sr.requirements_checklist
+                  ) as prereqs_done
+                from student_requirements sr
+                left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
+                where sr.student_id = any(p_student_ids)
+              ) c
+              on conflict (student_id) do update
+              set
+                section = excluded.section,
+                school_year = excluded.school_year,
+                total_hours = excluded.total_hours,
+                requirements_done_count = excluded.requirements_done_count,
+                requirements_done = excluded.requirements_done,
+                ojt_status = excluded.ojt_status,
+                updated_at = excluded.updated_at
+              where (sp.section, sp.school_year, sp.total_hours, sp.requirements_done_count, sp.ojt_status)
+                is distinct from
+                (excluded.section, excluded.school_year, excluded.total_hours,
+                 excluded.requirements_done_count, excluded.ojt_status);
+            end;
+            $$;
+            """,
+            """
+            create or replace function student_progress_changed()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              if tg_op = 'INSERT' then
+                perform refresh_student_progress(array(select distinct n.student_id from new_rows n));
+              elsif tg_op = 'DELETE' then
+                perform refresh_student_progress(array(select distinct o.student_id from old_rows o));
+              else
+                perform refresh_student_progress(array(
+                  select n.student_id from new_rows n
+                  union
+                  select o.student_id from old_rows o
+                ));
+              end if;
+              return null;
+            end;
+            $$;
+            """,
+        ]
+        + [
+            statement
+            for table in ("student_requirements", "attendance_sheet_dtr")
+            for event, referencing in (
+                ("insert", "new table as new_rows"),
+                ("update", "old table as old_rows new table as new_rows"),
+                ("delete", "old table as old_rows"),
+            )
+            for statement in (
+                f"drop trigger if exists {table}_progress_{event}_trg on {table}",
+                f"""
+                create trigger {table}_progress_{event}_trg
+                after {event} on {table}
+                referencing {referencing}
+                for each statement
+                execute function student_progress_changed()
+                """,
+            )
+        ]
+        + [
+            "select refresh_student_progress(array(select student_id from student_requirements where student_id is not null))",
+        ],
+    ),
+    (
+        13,
+        "student_search_trigram_indexes",
+        [
+            "create extension if not exists pg_trgm",
+            # The name expression must stay identical to records.SEARCH_NAME_SQL.
+            """
+            create index if not exists student_requirements_search_name_trgm_idx
+              on student_requirements
+              using gin ((lower(first_name || ' ' || coalesce(second_name, '') || ' ' || last_name)) gin_trgm_ops)
+            """,
+            """
+            create index if not exists student_requirements_student_no_trgm_idx
+              on student_requirements using gin ((lower(student_no)) gin_trgm_ops)
+            """,
+            "create index if not exists students_cca_email_trgm_idx on students using gin (cca_email gin_trgm_ops)",
+        ],
+    ),
+    (
+        14,
+        "storage_deletions",
+        [
+            # Storage objects replaced or removed by the app, deleted in the
+            # background by process_storage_deletions.
+            """
+            create table if not exists storage_deletions (
+              id bigserial primary key,
+              bucket text not null,
+              object_path text not null,
+              status text not null default 'pending' check (status in ('pending', 'deleted', 'failed')),
+              attempts int not null default 0,
+              last_error text,
+              next_attempt_at timestamptz not null default now(),
+              created_at timestamptz not null default now(),
+              deleted_at timestamptz
+            )
+            """,
+            """
+            create index if not exists storage_deletions_pending_idx
+              on storage_deletions (next_attempt_at)
+              where status = 'pending'
+            """,
+        ],
+    ),
+    (
+        15,
+        "section_change_notify",
+        [
+            # section_versions already absorbs every requirements, DTR and
+            # weekly journal change; announce each bump to LISTENers
+            # (logs.live) once the writing transaction commits.
+            """
+            create or replace function notify_section_version_changed()
+            returns trigger
+            language plpgsql
+            as $$
+            begin
+              perform pg_notify(
+                'section_changed',
+                json_build_object('section', new.section, 'version', new.version)::text
+              );
+              return null;
+            end;
+            $$;
+            """,
+            "drop trigger if exists section_versions_notify_trg on section_versions",
+            """
+            create trigger section_versions_notify_trg
+            after insert or update on section_versions
+            for each row
+            execute function notify_section_version_changed()
+            """,
+        ],
+    ),
+    (
+        16,
+        "activation_jobs",
+        [
+            # Bulk student activations queued from manage_records and run by
+            # process_activation_jobs; their emails point back at the job so
+            # delivery progress can be counted.
+            """
+            create table if not exists activation_jobs (
+              id bigserial primary key,
+              school_year text not null,
+              section text,
+              requested_by uuid,
+              status text not null default 'pending' check (status in ('pending', 'running', 'done', 'failed')),
+              total int not null default 0,
+              activated int not null default 0,
+              last_error text,
+              created_at timestamptz not null default now(),
+              started_at timestamptz,
+              updated_at timestamptz not null default now(),
+              finished_at timestamptz
+            )
+            """,
+            """
+            create index if not exists activation_jobs_open_idx
+              on activation_jobs (created_at)
+              where status in ('pending', 'running')
+            """,
+            """
+            alter table email_outbox
+              add column if not exists activation_job_id bigint references activation_jobs (id) on delete set null
+            """,
+            """
+            create index if not exists email_outbox_activation_job_idx
+              on email_outbox (activation_job_id, status)
+              where activation_job_id is not null
+            """,
+        ],
+    ),
+    (
+        17,
+        "email_outbox_claims",
+        [
+            # Workers claim a batch as 'sending' (leased through next_attempt_at)
+            # and send it outside any transaction.
+            "alter table email_outbox drop constraint if exists email_outbox_status_check",
+            """
+            alter table email_outbox
+              add constraint email_outbox_status_check
+              check (status in ('pending', 'sending', 'sent', 'failed'))
+            """,
+            "drop index if exists email_outbox_pending_idx",
+            """
+            create index if not exists email_outbox_pending_idx
+              on email_outbox (next_attempt_at)
+              where status in ('pending', 'sending')
+            """,
+        ],
+    ),
+    (
+        18,
+        "company_checklist_deletions_pruning",
+        [
+            # `manage.py prune_company_checklist_deletions` drops old tombstones and
+            # records the newest revision it dropped; sync tokens older than that
+            # can no longer be answered with a delta and get a full reload.
+            """
+            alter table company_checklist_revision
+              add column if not exists pruned_revision bigint not null default 0
+            """,
+            """
+            create index if not exists company_checklist_deletions_deleted_at_idx
+              on company_checklist_deletions (deleted_at)
+            """,
+        ],
+    ),
+    (
+        19,
+        "storage_deletion_claims",
+        [
+            # process_storage_deletions claims a batch as 'deleting' (leased
+            # through next_attempt_at) and calls storage outside any transaction.
+            "alter table storage_deletions drop constraint if exists storage_deletions_status_check",
+            """
+            alter table storage_deletions
+              add constraint storage_deletions_status_check
+              check (status in ('pending', 'deleting', 'deleted', 'failed'))
+            """,
+            "drop index if exists storage_deletions_pending_idx",
+            """
+            create index if not exists storage_deletions_pending_idx
+              on storage_deletions (next_attempt_at)
+              where status in ('pending', 'deleting')
+            """,
+        ],
+    ),
+]
+
+SCHEMA_VERSION = SCHEMA_STEPS[-1][0]
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent bootstraps serialize.
+_BOOTSTRAP_LOCK_KEY = 7_305_001
+
+_verified_version = None
+
+
+def _ensure_version_table(cursor):
+    cursor.execute(
+        f"""
+        create table if not exists {SCHEMA_VERSION_TABLE} (
+          version int primary key,
+          name text not null,
+          applied_at timestamptz not null default now()
+        )
+        """
+    )
+
+
+def get_applied_version(cursor=None):
+    """Return the highest recorded schema version, or 0 if none is recorded."""
+    if cursor is None:
+        with connection.cursor() as own_cursor:
+            return get_applied_version(own_cursor)
+    cursor.execute("select to_regclass(%s)", [SCHEMA_VERSION_TABLE])
+    if cursor.fetchone()[0] is None:
+        return 0
+    cursor.execute(f"select coalesce(max(version), 0) from {SCHEMA_VERSION_TABLE}")
+    return cursor.fetchone()[0]
+
+
+def pending_steps(applied_version):
+    return [step for step in SCHEMA_STEPS if step[0] > applied_version]
+
+
+def apply_schema(stdout=None):
+    """Apply every pending schema step and return the list of applied versions."""
+    global _verified_version
+    applied = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("select pg_advisory_xact_lock(%s)", [_BOOTSTRAP_LOCK_KEY])
+            _ensure_version_table(cursor)
+            current = get_applied_version(cursor)
+            for version, name, statements in pending_steps(current):
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(
+                    f"insert into {SCHEMA_VERSION_TABLE} (version, name) values (%s, %s)",
+                    [version, name],
+                )
+                applied.append(version)
+                if stdout is not None:
+                    stdout.write(f"Applied schema step {version}: {name}")
+    _verified_version = SCHEMA_VERSION
+    return applied
+
+
+def schema_is_current():
+    """Check (once per process) that the database is at SCHEMA_VERSION."""
+    global _verified_version
+    if _verified_version == SCHEMA_VERSION:
+        return True
+    try:
+        applied = get_applied_version()
+    except Exception:
+        logger.exception("Unable to read %s", SCHEMA_VERSION_TABLE)
+        return False
+    if applied >= SCHEMA_VERSION:
+        _verified_version = SCHEMA_VERSION
+        return True
+    return False
+
+
+def warn_if_schema_outdated():
+    """Startup hook for the WSGI/ASGI entry points; logs instead of applying DDL."""
+    if connection.vendor != "postgresql":
+        return
+    try:
+        if not schema_is_current():
+            logger.error(
+                "OJT schema is older than version %s. Run `python manage.py bootstrap_schema`.",
+                SCHEMA_VERSION,
+            )
+    finally:
+        connection.close()
@@ -0,0 +1,26 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def _cache_key(section, school_year, version):
+    digest = hashlib.sha1(f"{section}\x1f{school_year}".encode("utf-8")).hexdigest()
+    return f"section_detail:{digest}:{version}"
+
+
+def get_section_detail_json(section, school_year, version, build):
+    """Return the JSON-encoded section detail for ``version``, building it on a miss.
+
+    ``version`` comes from section_versions, which triggers bump whenever the
+    section's requirements, DTR hours or weekly journal rows change, so stale
+    entries are never read and simply age out of the cache.
+    """
+    key = _cache_key(section, school_year, version)
+    payload = cache.get(key)
+    if payload is None:
+        payload = json.dumps(build(), cls=DjangoJSONEncoder)
+        cache.set(key, payload, settings.SECTION_DETAIL_CACHE_SECONDS)
+    return payload
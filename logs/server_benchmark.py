@@ -0,0 +1,184 @@
+import http.client
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+from .benchmark import _percentile
+
+# Objects "uploaded" during a run are queued for deletion under this bucket,
+# which no real storage deletion worker drains.
+BENCH_BUCKET = "benchmark"
+
+SERVER_MODES = ("wsgi", "asgi")
+
+
+class _SlowStorageHandler(BaseHTTPRequestHandler):
+    """Accepts storage API requests and answers each after ``server.delay`` seconds."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _drain_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            return
+        while True:
+            size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            self.rfile.read(size)
+            self.rfile.readline()
+
+    def _respond(self):
+        self._drain_body()
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.handled += 1
+        body = b'{"Key":"benchmark"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = _respond
+    do_DELETE = _respond
+
+
+class _SlowStorageServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+@contextmanager
+def slow_storage_server(delay):
+    """Run a local stand-in for the storage API; yields the server (``url``, ``handled``)."""
+    server = _SlowStorageServer(("127.0.0.1", 0), _SlowStorageHandler)
+    server.delay = delay
+    server.lock = threading.Lock()
+    server.handled = 0
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_command(mode, port, workers, threads):
+    if mode == "asgi":
+        return [
+            sys.executable, "-m", "uvicorn", "ojtsystem.asgi:application",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+            "--no-access-log", "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "gunicorn", "ojtsystem.wsgi:application",
+        "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--threads", str(threads),
+        "--log-level", "warning",
+    ]
+
+
+@contextmanager
+def app_server(mode, storage_url, workers=1, threads=1, startup_timeout=30):
+    """Start gunicorn (``wsgi``) or uvicorn (``asgi``) against ``storage_url``; yields its base URL."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "SUPABASE_URL": storage_url,
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark",
+        "SUPABASE_BUCKET": BENCH_BUCKET,
+        "ASYNC_VIEWS_ENABLED": "true" if mode == "asgi" else "false",
+    }
+    process = subprocess.Popen(_server_command(mode, port, workers, threads), cwd=settings.BASE_DIR, env=env)
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"The {mode} server exited with status {process.returncode}.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"The {mode} server did not start within {startup_timeout}s.")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def profile_upload_body(width=1600, height=1200):
+    """Return ``(body, content_type)`` of a multipart upload of a ``width`` x ``height`` JPEG."""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    data = io.BytesIO()
+    image.save(data, format="JPEG", quality=85)
+    upload = SimpleUploadedFile("benchmark.jpg", data.getvalue(), content_type="image/jpeg")
+    return encode_multipart(BOUNDARY, {"profile_image": upload}), MULTIPART_CONTENT
+
+
+def run_upload_load(base_url, path, headers, body, requests, concurrency):
+    """POST ``body`` to ``path`` ``requests`` times from ``concurrency`` threads.
+
+    Returns ``(latencies_ms, statuses, elapsed_seconds)``.
+    """
+    host, port = base_url.split("//", 1)[1].split(":")
+
+    def one(_):
+        conn = http.client.HTTPConnection(host, int(port), timeout=300)
+        started = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return (time.perf_counter() - started) * 1000, response.status
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    return [latency for latency, _ in results], [status for _, status in results], elapsed
+
+
+def summarize(latencies, statuses, elapsed, storage_requests):
+    return {
+        "requests": len(statuses),
+        "redirects": sum(1 for status in statuses if status == 302),
+        "errors": sum(1 for status in statuses if status != 302),
+        "storage_requests": storage_requests,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(statuses) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 50), 2) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95), 2) if latencies else None,
+    }
@@ -0,0 +1,20 @@
+from importlib import import_module
+
+from django.conf import settings
+
+_base = import_module(f"django.contrib.sessions.backends.{settings.SESSION_STORE_BACKEND}")
+
+
+class SessionStore(_base.SessionStore):
+    """Session store that only marks the session dirty when a key really changes.
+
+    Django flags the session as modified on every assignment, so re-setting a
+    key to the value it already holds would still cost a save. The storage
+    itself (db, cached_db or cache) comes from SESSION_STORE_BACKEND.
+    """
+
+    def __setitem__(self, key, value):
+        if key in self._session and self._session[key] == value:
+            return
+        super().__setitem__(key, value)
+
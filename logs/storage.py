@@ -0,0 +1,348 @@
+import asyncio
+import http.client
+import json
+import logging
+import queue
+import urllib.parse
+import weakref
+from functools import lru_cache
+
+import httpx
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 6 * 60 * 60
+# How long a claimed batch stays with the worker that claimed it before
+# another worker may retry it.
+CLAIM_LEASE_SECONDS = 5 * 60
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+# before it was reused; the request is retried once on a fresh connection.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class StorageError(Exception):
+    pass
+
+
+class _BaseStorageClient:
+    def __init__(self, base_url, service_key, bucket, timeout=10):
+        parsed = urllib.parse.urlsplit(base_url.rstrip("/"))
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise ValueError(f"Invalid storage URL: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self.bucket = bucket
+        self._scheme = parsed.scheme
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._prefix = parsed.path.rstrip("/")
+        self._timeout = timeout
+        self._headers = {"Authorization": f"Bearer {service_key}", "apikey": service_key}
+
+    def _object_path(self, object_path):
+        return f"/storage/v1/object/{urllib.parse.quote(self.bucket)}/{urllib.parse.quote(object_path)}"
+
+    def public_url(self, object_path):
+        return f"{self.base_url}/storage/v1/object/public/{self.bucket}/{object_path}"
+
+    def object_path_from_url(self, url):
+        """Return the object path of a public URL in this bucket, or ``""``."""
+        prefix = self.public_url("")
+        url = (url or "").strip()
+        if not url.startswith(prefix):
+            return ""
+        return urllib.parse.unquote(url[len(prefix):])
+
+
+def _upload_headers(content_type, upsert):
+    return {
+        "Content-Type": content_type,
+        "Cache-Control": "max-age=31536000",
+        "x-upsert": "true" if upsert else "false",
+    }
+
+
+class StorageClient(_BaseStorageClient):
+    """Client for the Supabase storage REST API.
+
+    Keeps up to ``pool_size`` keep-alive connections to the storage host and
+    reuses them across requests. Uploads are sent with chunked transfer
+    encoding straight from a file object. ``base_url`` may be plain http, so
+    a local stand-in for the storage API works the same way.
+    """
+
+    def __init__(self, base_url, service_key, bucket, pool_size=4, timeout=10):
+        super().__init__(base_url, service_key, bucket, timeout=timeout)
+        self._pool = queue.LifoQueue(maxsize=max(pool_size, 1))
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        return connection_class(self._host, self._port, timeout=self._timeout)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _request(self, method, path, body_factory=None, headers=None):
+        """Send one request and return ``(status, body_bytes)``.
+
+        ``body_factory`` returns a fresh body each call, so a request that hit a
+        stale pooled connection can be replayed once.
+        """
+        request_headers = {**self._headers, **(headers or {})}
+        for attempt in range(2):
+            conn, reused = self._acquire()
+            try:
+                body = body_factory() if body_factory else None
+                conn.request(method, f"{self._prefix}{path}", body=body, headers=request_headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except _STALE_CONNECTION_ERRORS as exc:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise StorageError(f"{method} {path} failed: {exc}") from exc
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                raise StorageError(f"{method} {path} failed: {exc}") from exc
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status >= 400:
+                raise StorageError(f"{method} {path} returned {response.status}: {payload[:200]!r}")
+            return response.status, payload
+        raise StorageError(f"{method} {path} failed")
+
+    def upload(self, object_path, fileobj, content_type, upsert=True):
+        """Stream ``fileobj`` to ``object_path`` in CHUNK_SIZE pieces."""
+
+        def body():
+            fileobj.seek(0)
+            return iter(lambda: fileobj.read(CHUNK_SIZE), b"")
+
+        self._request(
+            "POST",
+            self._object_path(object_path),
+            body_factory=body,
+            headers=_upload_headers(content_type, upsert),
+        )
+        return self.public_url(object_path)
+
+    def delete(self, object_paths):
+        """Delete several objects of the bucket in one request."""
+        payload = json.dumps({"prefixes": list(object_paths)}).encode("utf-8")
+        self._request(
+            "DELETE",
+            f"/storage/v1/object/{urllib.parse.quote(self.bucket)}",
+            body_factory=lambda: payload,
+            headers={"Content-Type": "application/json"},
+        )
+
+
+class AsyncStorageClient(_BaseStorageClient):
+    """asyncio counterpart of StorageClient for async views, built on httpx.
+
+    Many uploads can be in flight at once on one event loop; up to
+    ``pool_size`` idle connections are kept alive between requests.
+    """
+
+    def __init__(self, base_url, service_key, bucket, pool_size=4, timeout=10):
+        super().__init__(base_url, service_key, bucket, timeout=timeout)
+        self._client = httpx.AsyncClient(
+            headers=self._headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=max(pool_size, 1)),
+            transport=httpx.AsyncHTTPTransport(retries=1),
+        )
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _request(self, method, path, content=None, headers=None):
+        try:
+            response = await self._client.request(method, f"{self.base_url}{path}", content=content, headers=headers)
+        except httpx.HTTPError as exc:
+            raise StorageError(f"{method} {path} failed: {exc}") from exc
+        if response.status_code >= 400:
+            raise StorageError(f"{method} {path} returned {response.status_code}: {response.content[:200]!r}")
+        return response.status_code, response.content
+
+    async def upload(self, object_path, fileobj, content_type, upsert=True):
+        """Stream ``fileobj`` to ``object_path`` in CHUNK_SIZE pieces."""
+
+        async def body():
+            fileobj.seek(0)
+            while chunk := fileobj.read(CHUNK_SIZE):
+                yield chunk
+
+        await self._request(
+            "POST",
+            self._object_path(object_path),
+            content=body(),
+            headers=_upload_headers(content_type, upsert),
+        )
+        return self.public_url(object_path)
+
+
+def _storage_configured():
+    return bool(settings.SUPABASE_URL and settings.SUPABASE_SERVICE_ROLE_KEY and settings.SUPABASE_BUCKET)
+
+
+@lru_cache(maxsize=1)
+def get_storage_client():
+    """Return the process-wide client, or None when Supabase is not configured."""
+    if not _storage_configured():
+        return None
+    return StorageClient(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_SERVICE_ROLE_KEY,
+        settings.SUPABASE_BUCKET,
+        pool_size=settings.STORAGE_POOL_SIZE,
+        timeout=settings.STORAGE_TIMEOUT,
+    )
+
+
+# httpx connections belong to the event loop that opened them.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_storage_client():
+    """Return the client for the running event loop, or None when Supabase is not configured."""
+    if not _storage_configured():
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncStorageClient(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_ROLE_KEY,
+            settings.SUPABASE_BUCKET,
+            pool_size=settings.STORAGE_POOL_SIZE,
+            timeout=settings.STORAGE_TIMEOUT,
+        )
+    return client
+
+
+def enqueue_deletes(bucket, object_paths):
+    """Queue storage objects for deletion by process_storage_deletions."""
+    object_paths = [path for path in object_paths if path]
+    if not object_paths:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            insert into storage_deletions (bucket, object_path)
+            select %s, unnest(%s::text[])
+            """,
+            [bucket, object_paths],
+        )
+
+
+def _backoff_seconds(attempts):
+    return min(BASE_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)), MAX_BACKOFF_SECONDS)
+
+
+def _claim_batch(bucket, batch_size):
+    """Mark up to ``batch_size`` due deletions of ``bucket`` as 'deleting' and return them.
+
+    The claim is one short statement, so no transaction is held open during
+    the storage request. Claimed rows are leased through next_attempt_at and
+    become due again if the worker dies before recording the outcome. As in
+    the email outbox, the attempt is counted when it is claimed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            update storage_deletions
+            set status = 'failed', last_error = 'Claim expired without a recorded result.'
+            where status = 'deleting' and next_attempt_at <= now() and attempts >= %s
+            """,
+            [MAX_ATTEMPTS],
+        )
+        cursor.execute(
+            """
+            update storage_deletions
+            set status = 'deleting',
+                attempts = attempts + 1,
+                next_attempt_at = now() + make_interval(secs => %s)
+            where id in (
+              select id
+              from storage_deletions
+              where status in ('pending', 'deleting') and next_attempt_at <= now()
+                and attempts < %s and bucket = %s
+              order by next_attempt_at, id
+              limit %s
+              for update skip locked
+            )
+            returning id, object_path, attempts
+            """,
+            [CLAIM_LEASE_SECONDS, MAX_ATTEMPTS, bucket, batch_size],
+        )
+        return sorted(cursor.fetchall())
+
+
+def delete_pending(batch_size=100):
+    """Delete one batch of queued objects with a single storage request.
+
+    Returns ``(deleted_count, failed_count)``. The batch is claimed first (see
+    ``_claim_batch``) so several workers can drain the queue.
+    """
+    client = get_storage_client()
+    if client is None:
+        return 0, 0
+
+    rows = _claim_batch(client.bucket, batch_size)
+    if not rows:
+        return 0, 0
+
+    try:
+        client.delete(row[1] for row in rows)
+    except StorageError as exc:
+        logger.exception("Failed to delete %s queued storage objects", len(rows))
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for row_id, _, attempts in rows:
+                    cursor.execute(
+                        """
+                        update storage_deletions
+                        set last_error = %s,
+                            status = case when %s >= %s then 'failed' else 'pending' end,
+                            next_attempt_at = now() + make_interval(secs => %s)
+                        where id = %s
+                        """,
+                        [str(exc)[:1000], attempts, MAX_ATTEMPTS, _backoff_seconds(attempts), row_id],
+                    )
+        return 0, len(rows)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            update storage_deletions
+            set status = 'deleted', deleted_at = now(), last_error = null
+            where id = any(%s)
+            """,
+            [[row[0] for row in rows]],
+        )
+    return len(rows), 0
@@ -0,0 +1,339 @@
+import csv
+import io
+import logging
+import re
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ["student_no", "last_name", "first_name", "program", "section"]
+SCHOOL_YEAR_RE = re.compile(r"^[0-9]{4} - [0-9]{4}$")
+
+_STAGE_COLUMNS = (
+    "row_no",
+    "student_no",
+    "cca_email",
+    "last_name",
+    "first_name",
+    "second_name",
+    "middle_initial",
+    "program",
+    "section",
+    "school_year",
+)
+
+CONFLICT_REASON = "Duplicate student number or email conflict."
+
+
+def parse_student_csv(content):
+    """Parse and validate a students CSV in memory.
+
+    Returns ``(rows, skipped_count, errors)`` where ``rows`` holds one
+    validated tuple per data row, in file order. Rows are matched against
+    existing students (and each other) by ``import_students``.
+    Raises ``ValueError`` with a user-facing message for header problems.
+    """
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames:
+        raise ValueError("CSV is empty or missing headers.")
+
+    # Normalize incoming headers so template files can use either "email" or "cca_email".
+    headers = {h.strip().lower(): h for h in reader.fieldnames if h}
+    missing = [k for k in REQUIRED_COLUMNS if k not in headers]
+    if "cca_email" not in headers and "email" not in headers:
+        missing.append("cca_email")
+    if missing:
+        raise ValueError("CSV missing required columns: " + ", ".join(missing))
+
+    def value(row, key):
+        return (row.get(headers.get(key, ""), "") or "").strip()
+
+    rows = []
+    skipped_count = 0
+    errors = []
+
+    for idx, row in enumerate(reader, start=2):
+        student_no = value(row, "student_no")
+        cca_email = (value(row, "cca_email") or value(row, "email")).lower()
+        last_name = value(row, "last_name")
+        first_name = value(row, "first_name")
+        second_name = value(row, "second_name") or None
+        middle_initial = value(row, "middle_initial") or None
+        program = value(row, "program")
+        section = value(row, "section")
+        school_year = value(row, "school_year") or None
+
+        if not (student_no or cca_email or first_name or last_name or program or section):
+            skipped_count += 1
+            continue
+
+        if not student_no or not cca_email or not first_name or not last_name or not program or not section:
+            errors.append({"row": idx, "reason": "Missing required value(s)."})
+            continue
+
+        if school_year and not SCHOOL_YEAR_RE.match(school_year):
+            errors.append({"row": idx, "reason": "School year must look like 2025 - 2026."})
+            continue
+
+        rows.append(
+            (
+                idx,
+                student_no,
+                cca_email,
+                last_name,
+                first_name,
+                second_name,
+                middle_initial,
+                program,
+                section,
+                school_year,
+            )
+        )
+
+    return rows, skipped_count, errors
+
+
+def _resolve_targets(cursor, rows):
+    """Replay ``rows`` in file order against the students they touch.
+
+    Each row updates the student holding its student_no, else the one holding
+    its email, else creates a student, exactly as saving the rows one by one
+    would, so a row can renumber a student that a later row then no longer
+    matches. Returns ``(targets, created_count, updated_count, conflict_rows)``
+    where ``targets`` maps each affected student (its id, or ``None`` plus the
+    creating row number for new ones) to the last row applied to it.
+    """
+    cursor.execute(
+        """
+        select id, student_no, cca_email
+        from students
+        where student_no = any(%s) or cca_email = any(%s)
+        for update
+        """,
+        [list({row[1] for row in rows}), list({row[2] for row in rows})],
+    )
+    by_no = {}
+    by_email = {}
+    keys = {}
+    for student_id, student_no, cca_email in cursor.fetchall():
+        by_no[student_no] = student_id
+        by_email[cca_email] = student_id
+        keys[student_id] = (student_no, cca_email)
+
+    targets = {}
+    created_count = 0
+    updated_count = 0
+    conflict_rows = []
+    for row in rows:
+        row_no, student_no, cca_email = row[:3]
+        target = by_no.get(student_no) or by_email.get(cca_email)
+        if by_email.get(cca_email, target) != target:
+            # The email belongs to a different student than the one being updated.
+            conflict_rows.append(row_no)
+            continue
+        if target is None:
+            target = (None, row_no)
+            created_count += 1
+        else:
+            old_no, old_email = keys[target]
+            by_no.pop(old_no, None)
+            by_email.pop(old_email, None)
+            updated_count += 1
+        by_no[student_no] = target
+        by_email[cca_email] = target
+        keys[target] = (student_no, cca_email)
+        targets[target] = row
+    return targets, created_count, updated_count, conflict_rows
+
+
+def _stage_rows(cursor, targets):
+    cursor.execute(
+        """
+        create temp table student_import_rows (
+          row_no int primary key,
+          student_no text not null,
+          cca_email text not null,
+          last_name text not null,
+          first_name text not null,
+          second_name text,
+          middle_initial text,
+          program text not null,
+          section text not null,
+          school_year text,
+          target_id uuid,
+          is_new boolean not null default false
+        ) on commit drop
+        """
+    )
+    columns = ", ".join(_STAGE_COLUMNS + ("target_id",))
+    with cursor.copy(f"copy student_import_rows ({columns}) from stdin") as copy:
+        for target, row in targets.items():
+            copy.write_row(row + (None if isinstance(target, tuple) else target,))
+
+
+def _import_set_based(rows):
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Row-level sync triggers on students skip work while this is set;
+            # requirements and DTR rows are reconciled set-based below instead.
+            cursor.execute("set local ojt.bulk_import = 'on'")
+            targets, created_count, updated_count, conflict_rows = _resolve_targets(cursor, rows)
+            _stage_rows(cursor, targets)
+
+            cursor.execute(
+                """
+                update students s
+                set
+                  student_no = t.student_no,
+                  cca_email = t.cca_email,
+                  last_name = t.last_name,
+                  first_name = t.first_name,
+                  second_name = t.second_name,
+                  middle_initial = t.middle_initial,
+                  program = t.program,
+                  section = t.section,
+                  school_year = t.school_year
+                from student_import_rows t
+                where s.id = t.target_id
+                """
+            )
+
+            cursor.execute(
+                """
+                insert into students (
+                  student_no, cca_email, last_name, first_name, second_name, middle_initial,
+                  program, section, school_year,
+                  password, activation_code, recovery_code, active_status, is_password_temp
+                )
+                select
+                  t.student_no, t.cca_email, t.last_name, t.first_name, t.second_name, t.middle_initial,
+                  t.program, t.section, t.school_year,
+                  '', '', null, false, true
+                from student_import_rows t
+                where t.target_id is null
+                order by t.row_no
+                """
+            )
+
+            cursor.execute(
+                """
+                update student_import_rows t
+                set target_id = s.id, is_new = true
+                from students s
+                where t.target_id is null and s.student_no = t.student_no
+                """
+            )
+            cursor.execute(
+                """
+                insert into student_requirements (
+                  student_id, last_name, first_name, second_name, middle_initial,
+                  student_no, section, program, school_year
+                )
+                select
+                  t.target_id, t.last_name, t.first_name, t.second_name, t.middle_initial,
+                  t.student_no, t.section, t.program, t.school_year
+                from student_import_rows t
+                on conflict (student_id) do update
+                set
+                  last_name = excluded.last_name,
+                  first_name = excluded.first_name,
+                  second_name = excluded.second_name,
+                  middle_initial = excluded.middle_initial,
+                  student_no = excluded.student_no,
+                  section = excluded.section,
+                  program = excluded.program,
+                  school_year = excluded.school_year
+                """
+            )
+            cursor.execute(
+                """
+                insert into attendance_sheet_dtr (student_id)
+                select t.target_id from student_import_rows t where t.is_new
+                on conflict (student_id) do nothing
+                """
+            )
+
+    errors = [{"row": row_no, "reason": CONFLICT_REASON} for row_no in conflict_rows]
+    return created_count, updated_count, errors
+
+
+def _import_row_by_row(rows):
+    """Save rows one at a time, each in its own savepoint, reporting per-row errors."""
+    created_count = 0
+    updated_count = 0
+    errors = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for row in rows:
+                row_no, student_no, cca_email = row[:3]
+                try:
+                    with transaction.atomic():
+                        cursor.execute(
+                            """
+                            select id from students
+                            where student_no = %s or cca_email = %s
+                            order by (student_no = %s) desc
+                            limit 1
+                            """,
+                            [student_no, cca_email, student_no],
+                        )
+                        existing = cursor.fetchone()
+                        if existing:
+                            cursor.execute(
+                                """
+                                update students
+                                set
+                                  student_no = %s,
+                                  cca_email = %s,
+                                  last_name = %s,
+                                  first_name = %s,
+                                  second_name = %s,
+                                  middle_initial = %s,
+                                  program = %s,
+                                  section = %s,
+                                  school_year = %s
+                                where id = %s
+                                """,
+                                list(row[1:]) + [existing[0]],
+                            )
+                        else:
+                            cursor.execute(
+                                """
+                                insert into students (
+                                  student_no, cca_email, last_name, first_name, second_name, middle_initial,
+                                  program, section, school_year,
+                                  password, activation_code, recovery_code, active_status, is_password_temp
+                                )
+                                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, '', '', null, false, true)
+                                """,
+                                list(row[1:]),
+                            )
+                except IntegrityError:
+                    errors.append({"row": row_no, "reason": CONFLICT_REASON})
+                except Exception as exc:
+                    errors.append({"row": row_no, "reason": str(exc)})
+                else:
+                    if existing:
+                        updated_count += 1
+                    else:
+                        created_count += 1
+    return created_count, updated_count, errors
+
+
+def import_students(rows):
+    """Upsert validated rows into ``students``.
+
+    The rows are applied set-based in one transaction. If the database rejects
+    that (e.g. two students swapping numbers, which a single UPDATE cannot do),
+    they are saved one by one instead so each failing row is reported.
+    Returns ``(created_count, updated_count, errors)``.
+    """
+    if not rows:
+        return 0, 0, []
+
+    try:
+        return _import_set_based(rows)
+    except DatabaseError:
+        logger.warning("Set-based student import failed; saving rows one by one", exc_info=True)
+    return _import_row_by_row(rows)
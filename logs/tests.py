@@ -1,3 +1,554 @@
-from django.test import TestCase
+import io
+import json
+import threading
+import zipfile
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.etree import ElementTree
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .exports import FLUSH_ROWS, stream_xlsx
+from .mail_queue import MAX_ATTEMPTS, enqueue_email, send_pending
+from .ratelimit import RateLimited, check_rate_limit, client_ip, reset_rate_limit
+from .records import MAX_DTR_HOURS, parse_requirement_value
+from .schema import SCHEMA_STEPS
+from .student_import import _import_row_by_row, _import_set_based
+from .storage import MAX_ATTEMPTS as STORAGE_MAX_ATTEMPTS
+from .storage import (
+    CHUNK_SIZE,
+    StorageClient,
+    StorageError,
+    delete_pending,
+    enqueue_deletes,
+    get_storage_client,
+)
+
+
+def _apply_schema_steps(*names):
+    """Create only the tables a test needs; the full schema expects the Supabase base tables."""
+    steps = {name: statements for _, name, statements in SCHEMA_STEPS}
+    with connection.cursor() as cursor:
+        for name in names:
+            for statement in steps[name]:
+                cursor.execute(statement)
+
+
+@skipUnless(connection.vendor == "postgresql", "email_outbox uses PostgreSQL-only SQL.")
+class EmailOutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _apply_schema_steps("email_outbox", "activation_jobs", "email_outbox_claims")
+
+    def _rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                select recipient, status, attempts, text_body, next_attempt_at > now()
+                from email_outbox
+                order by id
+                """
+            )
+            return cursor.fetchall()
+
+    def test_sends_due_messages_and_clears_bodies(self):
+        enqueue_email("a@example.com", "Subject A", "Code: 123456")
+        enqueue_email("b@example.com", "Subject B", "Code: 654321")
+
+        self.assertEqual(send_pending(batch_size=10), (2, 0))
+
+        self.assertEqual([message.to for message in mail.outbox], [["a@example.com"], ["b@example.com"]])
+        self.assertEqual(mail.outbox[0].body, "Code: 123456")
+        self.assertEqual(
+            [row[:4] for row in self._rows()],
+            [("a@example.com", "sent", 1, ""), ("b@example.com", "sent", 1, "")],
+        )
+        self.assertEqual(send_pending(batch_size=10), (0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_send_is_released_with_backoff(self):
+        enqueue_email("a@example.com", "Subject", "Body")
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("relay unavailable"),
+        ):
+            self.assertEqual(send_pending(), (0, 1))
+
+        self.assertEqual(self._rows(), [("a@example.com", "pending", 1, "Body", True)])
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_claimed_message_waits_for_its_lease(self):
+        message_id = enqueue_email("a@example.com", "Subject", "Body")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "update email_outbox set status = 'sending', next_attempt_at = now() + interval '1 minute' where id = %s",
+                [message_id],
+            )
+        self.assertEqual(send_pending(), (0, 0))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "update email_outbox set next_attempt_at = now() - interval '1 second' where id = %s",
+                [message_id],
+            )
+        self.assertEqual(send_pending(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(self._rows()[0][:3], ("a@example.com", "sent", 1))
+
+    def test_expired_claim_on_last_attempt_fails(self):
+        message_id = enqueue_email("a@example.com", "Subject", "Body")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                update email_outbox
+                set status = 'sending', attempts = %s, next_attempt_at = now() - interval '1 second'
+                where id = %s
+                """,
+                [MAX_ATTEMPTS, message_id],
+            )
+
+        self.assertEqual(send_pending(), (0, 0))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(self._rows(), [("a@example.com", "failed", MAX_ATTEMPTS, "", False)])
+
+
+class ParseRequirementValueTests(SimpleTestCase):
+    def test_requirement_flags_accept_only_booleans_and_their_names(self):
+        for value, expected in ((True, True), ("true", True), (False, False), ("false", False)):
+            with self.subTest(value=value):
+                self.assertEqual(parse_requirement_value("letter_of_intent", value), (expected, None))
+        for value in (1, 0, "1", "True", None):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    parse_requirement_value("letter_of_intent", value), (None, "Invalid update request.")
+                )
+
+    def test_dtr_hours_must_be_whole_and_fit_the_column(self):
+        for value, expected in (("12", 12), (12, 12), (8.0, 8), (MAX_DTR_HOURS, MAX_DTR_HOURS)):
+            with self.subTest(value=value):
+                self.assertEqual(parse_requirement_value("dtr_january_hours", value), (expected, None))
+        for value in (1.5, "1.5", float("inf"), float("nan"), MAX_DTR_HOURS + 1, True, "abc", None):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    parse_requirement_value("dtr_january_hours", value), (None, "Hours must be a valid number.")
+                )
+        self.assertEqual(parse_requirement_value("dtr_january_hours", "-1"), (None, "Hours cannot be negative."))
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"},
+        "ratelimit": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests-ratelimit"},
+    },
+    RATE_LIMITS={"login_email": (4, 100), "login_ip": (100, 100), "other": (4, 100)},
+    RATE_LIMIT_TRUSTED_PROXIES=0,
+)
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        caches["ratelimit"].clear()
+        patcher = mock.patch("logs.ratelimit.time")
+        self.clock = patcher.start().time
+        self.addCleanup(patcher.stop)
+
+    def _attempt(self, at, *checks):
+        self.clock.return_value = at
+        check_rate_limit(*(checks or [("login_email", "a@example.com")]))
+
+    def test_previous_window_is_weighted_by_the_time_left_in_it(self):
+        for _ in range(4):
+            self._attempt(1000)
+        with self.assertRaises(RateLimited) as raised:
+            self._attempt(1050)
+        self.assertEqual(raised.exception.retry_after, 50)
+
+        # Halfway through the next window the previous four count as two.
+        self._attempt(1150)
+        self._attempt(1150)
+        with self.assertRaises(RateLimited):
+            self._attempt(1150)
+        self._attempt(1300)
+
+    def test_rejected_attempts_are_not_counted(self):
+        for _ in range(4):
+            self._attempt(1000)
+        for _ in range(5):
+            with self.assertRaises(RateLimited):
+                self._attempt(1000)
+        self._attempt(1150)
+
+        # A scope that refuses the attempt keeps the others from counting it.
+        for _ in range(4):
+            self._attempt(2000, ("other", "a@example.com"))
+        with self.assertRaises(RateLimited):
+            self._attempt(2000, ("login_email", "b@example.com"), ("other", "a@example.com"))
+        for _ in range(4):
+            self._attempt(2000, ("login_email", "b@example.com"))
+
+    def test_reset_forgets_both_windows(self):
+        for _ in range(2):
+            self._attempt(1000)
+        for _ in range(2):
+            self._attempt(1100)
+        reset_rate_limit("login_email", "a@example.com")
+        for _ in range(4):
+            self._attempt(1100)
+        with self.assertRaises(RateLimited):
+            self._attempt(1100)
+
+    def test_client_ip_trusts_only_the_configured_proxy_hops(self):
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 203.0.113.7, 10.0.0.2"
+        )
+        for proxies, expected in ((0, "10.0.0.1"), (1, "10.0.0.2"), (2, "203.0.113.7"), (4, "10.0.0.1")):
+            with self.subTest(proxies=proxies), self.settings(RATE_LIMIT_TRUSTED_PROXIES=proxies):
+                self.assertEqual(client_ip(request), expected)
+
+    def test_limited_login_is_refused_before_any_query(self):
+        for _ in range(4):
+            self._attempt(1000)
+        # SimpleTestCase fails the test on any database query.
+        response = self.client.post("/", {"cca_email": "A@example.com", "password": "secret"})
+        self.assertEqual(response.status_code, 429)
+        self.assertContains(response, "Too many login attempts", status_code=429)
+
+
+class StreamXlsxTests(SimpleTestCase):
+    def test_streamed_workbook_opens_and_holds_every_row(self):
+        row_count = FLUSH_ROWS * 2 + 7
+        produced = []
+
+        def rows():
+            for index in range(row_count):
+                produced.append(index)
+                yield [f"S{index}", f"Name\x07\x1b & <{index}>", index % 2 == 0, index, None]
+
+        chunks = stream_xlsx("Requirements", ["Student No.", "Name", "Done", "Hours", "Notes"], rows())
+        data = [next(chunks)]
+        # The first chunk goes out while the rows are still being produced.
+        self.assertLess(len(produced), row_count)
+        data.extend(chunks)
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(data))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(
+                sorted(archive.namelist()),
+                [
+                    "[Content_Types].xml",
+                    "_rels/.rels",
+                    "xl/_rels/workbook.xml.rels",
+                    "xl/workbook.xml",
+                    "xl/worksheets/sheet1.xml",
+                ],
+            )
+            sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+
+        ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        sheet_rows = sheet.findall("s:sheetData/s:row", ns)
+        self.assertEqual(len(sheet_rows), row_count + 1)
+        self.assertEqual(sheet_rows[-1].get("r"), str(row_count + 1))
+
+        cells = {cell.get("r"): cell for cell in sheet_rows[2].findall("s:c", ns)}
+        self.assertEqual(sorted(cells), ["A3", "B3", "C3", "D3"])
+        self.assertEqual(cells["B3"].findtext("s:is/s:t", namespaces=ns), "Name & <1>")
+        self.assertEqual((cells["C3"].get("t"), cells["C3"].findtext("s:v", namespaces=ns)), ("b", "0"))
+        self.assertEqual(cells["D3"].findtext("s:v", namespaces=ns), "1")
+        self.assertEqual(sheet_rows[1].find("s:c[@r='C2']/s:v", ns).text, "1")
+
+
+class _StorageStandInHandler(BaseHTTPRequestHandler):
+    """Records each request; answers with the next status in ``server.statuses`` (default 200)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = b""
+        while True:
+            size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                self.rfile.readline()
+                return body
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def _respond(self):
+        body = self._read_body()
+        server = self.server
+        with server.lock:
+            server.requests.append(
+                {
+                    "method": self.command,
+                    "path": self.path,
+                    "headers": self.headers,
+                    "body": body,
+                    "client": self.client_address,
+                }
+            )
+            status = server.statuses.pop(0) if server.statuses else 200
+        payload = b'{"Key":"ok"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        # Drop the connection without announcing it, like a server whose
+        # keep-alive timeout expired while the client still pools it.
+        self.close_connection = server.drop_connections
+
+    do_POST = _respond
+    do_DELETE = _respond
+
+
+@contextmanager
+def storage_stand_in(statuses=(), drop_connections=False):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StorageStandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.statuses = list(statuses)
+    server.drop_connections = drop_connections
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class StorageClientTests(SimpleTestCase):
+    def _client(self, server):
+        client = StorageClient(server.url, "service-key", "profiles", pool_size=2, timeout=5)
+        self.addCleanup(client.close)
+        return client
+
+    def test_upload_streams_chunked_body(self):
+        data = bytes(range(256)) * (CHUNK_SIZE // 256 * 2 + 3)
+        with storage_stand_in() as server:
+            url = self._client(server).upload("staff/a.webp", io.BytesIO(data), "image/webp")
+
+        self.assertEqual(url, f"{server.url}/storage/v1/object/public/profiles/staff/a.webp")
+        [request] = server.requests
+        self.assertEqual(request["method"], "POST")
+        self.assertEqual(request["path"], "/storage/v1/object/profiles/staff/a.webp")
+        self.assertEqual(request["headers"]["Transfer-Encoding"], "chunked")
+        self.assertEqual(request["headers"]["Authorization"], "Bearer service-key")
+        self.assertEqual(request["body"], data)
+
+    def test_request_on_stale_pooled_connection_is_replayed(self):
+        with storage_stand_in(drop_connections=True) as server:
+            client = self._client(server)
+            client.upload("a.webp", io.BytesIO(b"first"), "image/webp")
+            client.upload("b.webp", io.BytesIO(b"second"), "image/webp")
+
+        self.assertEqual([request["body"] for request in server.requests], [b"first", b"second"])
+        self.assertNotEqual(server.requests[0]["client"], server.requests[1]["client"])
+
+    def test_error_statuses_raise_storage_error(self):
+        for status in (404, 503):
+            with self.subTest(status=status), storage_stand_in(statuses=[status]) as server:
+                with self.assertRaisesMessage(StorageError, f"returned {status}"):
+                    self._client(server).delete(["a.webp"])
+
+
+@skipUnless(connection.vendor == "postgresql", "storage_deletions uses PostgreSQL-only SQL.")
+class StorageDeletionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _apply_schema_steps("storage_deletions", "storage_deletion_claims")
+
+    def _run(self, server, batch_size=100):
+        get_storage_client.cache_clear()
+        self.addCleanup(get_storage_client.cache_clear)
+        with override_settings(
+            SUPABASE_URL=server.url, SUPABASE_SERVICE_ROLE_KEY="service-key", SUPABASE_BUCKET="profiles"
+        ):
+            try:
+                return delete_pending(batch_size=batch_size)
+            finally:
+                get_storage_client().close()
+
+    def _rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "select object_path, status, attempts, next_attempt_at > now() from storage_deletions order by id"
+            )
+            return cursor.fetchall()
+
+    def test_batch_is_deleted_with_one_request(self):
+        enqueue_deletes("profiles", ["a.webp", "b.webp", "c.webp"])
+        enqueue_deletes("other-bucket", ["x.webp"])
+
+        with storage_stand_in() as server:
+            self.assertEqual(self._run(server, batch_size=2), (2, 0))
+
+        [request] = server.requests
+        self.assertEqual(request["method"], "DELETE")
+        self.assertEqual(request["path"], "/storage/v1/object/profiles")
+        self.assertEqual(json.loads(request["body"]), {"prefixes": ["a.webp", "b.webp"]})
+        self.assertEqual(
+            [row[:3] for row in self._rows()],
+            [
+                ("a.webp", "deleted", 1),
+                ("b.webp", "deleted", 1),
+                ("c.webp", "pending", 0),
+                ("x.webp", "pending", 0),
+            ],
+        )
+
+    def test_failed_batch_backs_off(self):
+        enqueue_deletes("profiles", ["a.webp"])
+
+        with storage_stand_in(statuses=[500]) as server:
+            self.assertEqual(self._run(server), (0, 1))
+            self.assertEqual(self._rows(), [("a.webp", "pending", 1, True)])
+            self.assertEqual(self._run(server), (0, 0))
+
+        self.assertEqual(len(server.requests), 1)
+
+    def test_expired_claim_on_last_attempt_fails(self):
+        enqueue_deletes("profiles", ["a.webp"])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                update storage_deletions
+                set status = 'deleting', attempts = %s, next_attempt_at = now() - interval '1 second'
+                """,
+                [STORAGE_MAX_ATTEMPTS],
+            )
+
+        with storage_stand_in() as server:
+            self.assertEqual(self._run(server), (0, 0))
+
+        self.assertEqual(server.requests, [])
+        self.assertEqual(self._rows(), [("a.webp", "failed", STORAGE_MAX_ATTEMPTS, False)])
+
+
+@skipUnless(connection.vendor == "postgresql", "The student import uses PostgreSQL-only SQL.")
+class StudentImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Minimal stand-ins for the Supabase base tables and their sync triggers.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                create table students (
+                  id uuid primary key default gen_random_uuid(),
+                  student_no text unique not null,
+                  cca_email text unique not null,
+                  last_name text not null,
+                  first_name text not null,
+                  second_name text,
+                  middle_initial text,
+                  school_year text,
+                  program text not null,
+                  section text not null,
+                  password text not null,
+                  activation_code text not null,
+                  recovery_code text,
+                  active_status boolean not null default false,
+                  is_password_temp boolean not null default true
+                )
+                """
+            )
+            cursor.execute(
+                """
+                create table student_requirements (
+                  id uuid primary key default gen_random_uuid(),
+                  student_id uuid unique references students(id) on delete cascade,
+                  last_name text not null,
+                  first_name text not null,
+                  second_name text,
+                  middle_initial text,
+                  student_no text not null,
+                  section text not null,
+                  program text not null,
+                  school_year text
+                )
+                """
+            )
+        _apply_schema_steps("student_requirements_columns_and_dtr", "students_sync_triggers_bulk_import_guard")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                create trigger students_sync_requirements_trg
+                after insert or update on students
+                for each row execute function sync_student_requirements_row()
+                """
+            )
+            cursor.execute(
+                """
+                create trigger students_sync_dtr_trg
+                after insert on students
+                for each row execute function sync_attendance_sheet_dtr_row()
+                """
+            )
+            cursor.execute(
+                """
+                insert into students (student_no, cca_email, last_name, first_name, program, section, password, activation_code)
+                values ('S1', 'a@example.com', 'Alpha', 'Ann', 'BSIT', '4A', '', ''),
+                       ('S2', 'b@example.com', 'Bravo', 'Ben', 'BSIT', '4A', '', '')
+                """
+            )
+
+    def _state(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                select s.student_no, s.cca_email, s.last_name, s.first_name, s.section,
+                       r.student_no, r.last_name, r.section, d.id is not null
+                from students s
+                left join student_requirements r on r.student_id = s.id
+                left join attendance_sheet_dtr d on d.student_id = s.id
+                order by s.student_no
+                """
+            )
+            return cursor.fetchall()
+
+    def _run(self, import_rows, rows):
+        with transaction.atomic():
+            result = import_rows(rows)
+            state = self._state()
+            transaction.set_rollback(True)
+        return result, state
+
+    def test_set_based_import_matches_saving_rows_one_by_one(self):
+        def row(row_no, student_no, cca_email, last_name):
+            return (row_no, student_no, cca_email, last_name, "First", None, None, "BSIT", "4B", "2025 - 2026")
+
+        rows = [
+            # S1 is renumbered by email, then its old number creates a new student.
+            row(2, "S9", "a@example.com", "Alpha"),
+            row(3, "S1", "c@example.com", "Charlie"),
+            # S2 exists, but a@example.com now belongs to the student renumbered to S9.
+            row(4, "S2", "a@example.com", "Bravo"),
+            row(5, "S4", "d@example.com", "Delta"),
+            row(6, "S4", "d@example.com", "Delta-Dawn"),
+        ]
+
+        row_by_row = self._run(_import_row_by_row, rows)
+        set_based = self._run(_import_set_based, rows)
+
+        self.assertEqual(set_based, row_by_row)
+        (created, updated, errors), state = set_based
+        self.assertEqual((created, updated), (2, 2))
+        self.assertEqual([error["row"] for error in errors], [4])
+        self.assertEqual(
+            state,
+            [
+                ("S1", "c@example.com", "Charlie", "First", "4B", "S1", "Charlie", "4B", True),
+                ("S2", "b@example.com", "Bravo", "Ben", "4A", "S2", "Bravo", "4A", True),
+                ("S4", "d@example.com", "Delta-Dawn", "First", "4B", "S4", "Delta-Dawn", "4B", True),
+                ("S9", "a@example.com", "Alpha", "First", "4B", "S9", "Alpha", "4B", True),
+            ],
+        )
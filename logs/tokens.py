@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import salted_hmac
+
+# Older deployments kept one random token per row in these session keys.
+_LEGACY_SESSION_KEYS = ("ui_token_map", "manage_accounts_edit_tokens")
+
+
+def _salt(namespace):
+    return f"logs.ui_token:{namespace}"
+
+
+def _drop_legacy_token_maps(request):
+    for key in _LEGACY_SESSION_KEYS:
+        if key in request.session:
+            del request.session[key]
+
+
+def mint_ui_token(request, namespace, payload):
+    """Return an HMAC-signed, expiring token for ``payload`` scoped to ``namespace``.
+
+    The token is bound to the signed-in account, so it cannot be replayed from
+    another session, and nothing is written to the session store.
+    """
+    _drop_legacy_token_maps(request)
+    return signing.dumps(
+        {"a": request.session.get("account_id"), "p": payload},
+        salt=_salt(namespace),
+        compress=False,
+    )
+
+
+def resolve_ui_token(request, namespace, token):
+    token = (token or "").strip()
+    if not token:
+        return None
+    try:
+        data = signing.loads(token, salt=_salt(namespace), max_age=settings.UI_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if not isinstance(data, dict) or data.get("a") != request.session.get("account_id"):
+        return None
+    return data.get("p")
+
+
+def stable_ref(namespace, value):
+    """Return a short, deterministic handle for ``value``.
+
+    Unlike UI tokens it carries nothing that resolves back to a row; clients use
+    it to match rows across responses (for example when merging deltas).
+    """
+    return salted_hmac(_salt(namespace), str(value)).hexdigest()[:20]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
@@ -10,15 +11,31 @@ urlpatterns = [
     path('student/', views.student_home, name='student_home'),
     path('staff/', views.staff_home, name='staff_home'),
     path('staff/manage-records/', views.manage_records, name='manage_records'),
+    path('staff/manage-records/data/', views.manage_records_data, name='manage_records_data'),
+    path('staff/students/search/', views.student_search, name='student_search'),
     path('staff/company-checklist/', views.company_checklist, name='company_checklist'),
     path('staff/company-checklist/data/', views.company_checklist_data, name='company_checklist_data'),
+    path('staff/manage-records/export/<str:kind>/', views.export_records, name='export_records'),
     path('staff/manage-records/sync/', views.sync_student_requirements_view, name='sync_student_requirements'),
     path('staff/manage-records/update/', views.update_student_requirement, name='update_student_requirement'),
+    path(
+        'staff/manage-records/update-batch/',
+        views.update_student_requirements_batch,
+        name='update_student_requirements_batch',
+    ),
     path('staff/section-instructors/', views.section_instructors_view, name='section_instructors'),
+    path(
+        'staff/section-instructors/rows/',
+        views.section_assignments_data,
+        name='section_assignments_data',
+    ),
+    path('staff/activation-jobs/', views.activation_jobs_view, name='activation_jobs'),
+    path('staff/activation-jobs/<int:job_id>/', views.activation_job_status, name='activation_job_status'),
     path('staff/schedules/', views.schedules_view, name='schedules'),
     path('staff/weekly-journal/weeks/', views.weekly_journal_weeks, name='weekly_journal_weeks'),
     path('staff/weekly-journal/check/', views.update_weekly_journal_check, name='weekly_journal_check'),
     path('staff/manage-accounts/', views.manage_accounts, name='manage_accounts'),
+    path('staff/manage-accounts/data/', views.manage_accounts_data, name='manage_accounts_data'),
     path(
         'staff/manage-accounts/students-template.csv',
         views.download_students_csv_template,
@@ -30,8 +47,15 @@ urlpatterns = [
         views.instructor_section_details_by_key,
         name='instructor_section_details_by_key',
     ),
+    path('staff/handled-sections/events/', views.instructor_section_events, name='instructor_section_events'),
     path('staff/profile/', views.staff_profile, name='staff_profile'),
-    path('staff/profile/upload/', views.upload_staff_profile_image, name='upload_staff_profile_image'),
+    path(
+        'staff/profile/upload/',
+        views.upload_staff_profile_image_async if settings.ASYNC_VIEWS_ENABLED else views.upload_staff_profile_image,
+        name='upload_staff_profile_image',
+    ),
     path('staff/profile/remove/', views.remove_staff_profile_image, name='remove_staff_profile_image'),
+    path('staff/db-pool-stats/', views.db_pool_stats_view, name='db_pool_stats'),
+    path('staff/rate-limit-stats/', views.rate_limit_stats_view, name='rate_limit_stats'),
     path('logout/', views.logout_user, name='logout'),
 ]
@@ -1,80 +1,81 @@
+import asyncio
+import hashlib
 import secrets
+import time
 import datetime
 import csv
-import io
 import logging
 import json
-from email.mime.image import MIMEImage
-from pathlib import Path
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.contrib.auth.hashers import check_password, make_password
-from django.core.mail import EmailMultiAlternatives
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIRequest
 from django.template.loader import render_to_string
 from django.shortcuts import redirect, render
-from django.http import JsonResponse, HttpResponse
-from django.db import IntegrityError
-import os
+from django.http import HttpResponseNotModified, JsonResponse, HttpResponse, StreamingHttpResponse
+from django.db import IntegrityError, transaction
 import uuid
-import urllib.request
-import urllib.error
 from django.db import connection
 from django.utils import timezone
 from django.views.decorators.cache import never_cache
 
+from .accounts import (
+    LISTING_FIELDS,
+    LISTING_SORTS,
+    authenticate,
+    find_accounts,
+    first_account,
+    list_accounts,
+    student_school_years,
+    student_sections,
+    update_account,
+)
+from .bulk_activation import count_candidates, create_job, job_progress
+from .db_pool import pool_stats
+from .exports import CONTENT_TYPES, EXPORT_FORMATS, EXPORT_KINDS, aiter_export, export_filename, stream_export
+from .flash import flash, pop_flash
+from .images import prepare_profile_image, profile_thumbnail_url, thumbnail_path
+from .live import section_event_stream
+from .mail_queue import enqueue_email
+from .ratelimit import (
+    RateLimited,
+    check_rate_limit,
+    client_ip,
+    cooldown_remaining,
+    rate_limit_stats,
+    reset_rate_limit,
+    start_cooldown,
+)
 from .models import PracticumCoordinator, PracticumInstructor, Student
+from .records import (
+    DEFAULT_PAGE_SIZE,
+    MAX_BATCH_CHANGES,
+    SORT_KEYS,
+    apply_requirement_changes,
+    fetch_requirements_page,
+    full_name,
+    SEARCH_MIN_LENGTH,
+    parse_requirement_value,
+    search_students,
+    search_students_page,
+    serialize_requirement_row,
+)
+from .section_cache import get_section_detail_json
+from .storage import StorageError, enqueue_deletes, get_async_storage_client, get_storage_client
+from .student_import import import_students, parse_student_csv
+from .tokens import mint_ui_token, resolve_ui_token, stable_ref
 
 logger = logging.getLogger(__name__)
 
 
-def _session_token_bucket(request, namespace):
-    store = request.session.get("ui_token_map")
-    if not isinstance(store, dict):
-        store = {}
-    bucket = store.get(namespace)
-    if not isinstance(bucket, dict):
-        bucket = {}
-    return store, bucket
-
-
-def _reset_session_tokens(request, namespace):
-    store, _ = _session_token_bucket(request, namespace)
-    store[namespace] = {}
-    request.session["ui_token_map"] = store
-    request.session.modified = True
-
-
-def _mint_session_token(request, namespace, payload):
-    store, bucket = _session_token_bucket(request, namespace)
-    token = secrets.token_urlsafe(16)
-    bucket[token] = payload
-    store[namespace] = bucket
-    request.session["ui_token_map"] = store
-    request.session.modified = True
-    return token
-
-
-def _resolve_session_token(request, namespace, token):
-    _, bucket = _session_token_bucket(request, namespace)
-    return bucket.get((token or "").strip())
-
-def _attach_logo(message):
-    logo_path = Path(settings.BASE_DIR) / "ICSLIS LOGO.png"
-    if not logo_path.exists():
-        return
-    img = MIMEImage(logo_path.read_bytes())
-    img.add_header("Content-ID", "<icslis-logo>")
-    img.add_header("Content-Disposition", "inline", filename="icslis-logo.png")
-    message.attach(img)
-
 @never_cache
 def front_page(request):
     context = {}
-    flash = request.session.pop("flash_message", None)
-    flash_type = request.session.pop("flash_message_type", None)
-    if flash:
-        context["message"] = flash
-        context["message_type"] = flash_type or "error"
+    message, message_type = pop_flash(request)
+    if message:
+        context["message"] = message
+        context["message_type"] = message_type or "error"
     if request.method == "POST":
         email = request.POST.get("cca_email") or request.POST.get("username")
         password = request.POST.get("password", "")
@@ -84,43 +85,26 @@ def front_page(request):
             return render(request, "auth/login.html", context)
 
         email = email.lower()
-        role_candidates = []
-        student = Student.objects.filter(cca_email=email).first()
-        if student:
-            role_candidates.append(("student", student))
-        coordinator = PracticumCoordinator.objects.filter(cca_email=email).first()
-        if coordinator:
-            role_candidates.append(("coordinator", coordinator))
-        instructor = PracticumInstructor.objects.filter(cca_email=email).first()
-        if instructor:
-            role_candidates.append(("instructor", instructor))
-
-        if not role_candidates:
-            context["message"] = "Invalid login credentials."
+        try:
+            check_rate_limit(("login_ip", client_ip(request)), ("login_email", email))
+        except RateLimited as exc:
+            context["message"] = f"Too many login attempts. Please try again in {_minutes(exc.retry_minutes)}."
             context["message_type"] = "error"
-            return render(request, "auth/login.html", context)
+            return render(request, "auth/login.html", context, status=429)
 
-        matching_candidates = [
-            (role, acct)
-            for role, acct in role_candidates
-            if acct.password and check_password(password, acct.password)
-        ]
-        if not matching_candidates:
+        status, account = authenticate(email, password)
+        if status == "invalid":
             context["message"] = "Invalid login credentials."
             context["message_type"] = "error"
             return render(request, "auth/login.html", context)
+        reset_rate_limit("login_email", email)
 
-        active_matches = [(role, acct) for role, acct in matching_candidates if acct.active_status]
-        if not active_matches:
+        if status == "inactive":
             context["message"] = "Account is not activated yet."
             context["message_type"] = "error"
             return render(request, "auth/login.html", context)
 
-        # Prefer non-temporary-password account when multiple role rows share one email.
-        role_priority = {"coordinator": 0, "instructor": 1, "student": 2}
-        active_matches.sort(key=lambda item: (item[1].is_password_temp, role_priority.get(item[0], 99)))
-        account_type, account = active_matches[0]
-
+        account_type = account.role
         request.session["account_id"] = str(account.id)
         request.session["account_type"] = account_type
         if account.is_password_temp:
@@ -133,6 +117,31 @@ def front_page(request):
     return render(request, "auth/login.html", context)
 
 
+def _minutes(count):
+    return f"{count} minute{'s' if count != 1 else ''}"
+
+
+def _code_stage_throttle(request, cooldown_scope, email, stage):
+    """Return ``(message, cooldown_seconds)`` when a code request or check is refused, else None.
+
+    Runs before the account lookup, so refused requests cost no queries.
+    """
+    if stage in {"send", "resend"}:
+        remaining = cooldown_remaining(cooldown_scope, email)
+        if remaining:
+            return "Please wait before resending the code.", remaining
+        checks = [("code_request_ip", client_ip(request))]
+    elif stage == "reset":
+        return None
+    else:
+        checks = [("code_verify_email", email)]
+    try:
+        check_rate_limit(*checks)
+    except RateLimited as exc:
+        return f"Too many attempts. Please try again in {_minutes(exc.retry_minutes)}.", 0
+    return None
+
+
 def forgot_password(request):
     context = {}
     if request.method == "POST":
@@ -144,49 +153,34 @@ def forgot_password(request):
             context["message_type"] = "error"
             return render(request, "logs/forgot_password.html", context)
 
-        account = Student.objects.filter(cca_email=email).first()
-        account_type = "student"
-        if not account:
-            account = PracticumCoordinator.objects.filter(cca_email=email).first()
-            account_type = "coordinator"
-        if not account:
-            account = PracticumInstructor.objects.filter(cca_email=email).first()
-            account_type = "instructor"
+        throttled = _code_stage_throttle(request, "recovery", email, stage)
+        if throttled:
+            context["message"], context["cooldown_seconds"] = throttled
+            context["message_type"] = "error"
+            context["show_code"] = True
+            context["email"] = email
+            return render(request, "logs/forgot_password.html", context, status=429)
+
+        account = first_account(find_accounts(email))
         if not account:
             context["message"] = "Email not found. Please contact the admin."
             context["message_type"] = "error"
             return render(request, "logs/forgot_password.html", context)
 
         if stage in {"send", "resend"}:
-            last_key = f"recovery_last_sent:{email}"
-            last_sent = request.session.get(last_key)
-            if last_sent:
-                elapsed = (timezone.now() - timezone.datetime.fromisoformat(last_sent)).total_seconds()
-                if elapsed < 60:
-                    context["message"] = "Please wait before resending the code."
-                    context["message_type"] = "error"
-                    context["show_code"] = True
-                    context["email"] = email
-                    context["cooldown_seconds"] = int(60 - elapsed)
-                    return render(request, "logs/forgot_password.html", context)
-
             code = f"{secrets.randbelow(10**6):06d}"
-            account.recovery_code = code
-            account.save(update_fields=["recovery_code"])
+            update_account(account, recovery_code=code)
 
-            subject = "ICSLIS OJT System Password Reset Code"
-            text_body = f"Your password reset code is: {code}"
             try:
-                html_body = render_to_string(
+                enqueue_email(
+                    email,
+                    "ICSLIS OJT System Password Reset Code",
+                    f"Your password reset code is: {code}",
                     "emails/recovery_code.html",
                     {"recovery_code": code, "email": email},
                 )
-                msg = EmailMultiAlternatives(subject, text_body, None, [email])
-                msg.attach_alternative(html_body, "text/html")
-                _attach_logo(msg)
-                msg.send()
             except Exception:
-                logger.exception("Failed to send password reset code email to %s", email)
+                logger.exception("Failed to queue password reset code email to %s", email)
                 context["message"] = "Unable to send reset code right now. Please try again later."
                 context["message_type"] = "error"
                 context["show_code"] = True
@@ -197,8 +191,8 @@ def forgot_password(request):
             context["message_type"] = "success"
             context["show_code"] = True
             context["email"] = email
-            context["cooldown_seconds"] = 60
-            request.session[last_key] = timezone.now().isoformat()
+            context["cooldown_seconds"] = settings.CODE_RESEND_COOLDOWN_SECONDS
+            start_cooldown("recovery", email, settings.CODE_RESEND_COOLDOWN_SECONDS)
             return render(request, "logs/forgot_password.html", context)
 
         if stage == "verify":
@@ -246,13 +240,14 @@ def forgot_password(request):
                 context["email"] = email
                 return render(request, "logs/forgot_password.html", context)
 
-            account.password = make_password(new_password)
-            account.is_password_temp = False
-            account.recovery_code = None
-            account.save(update_fields=["password", "is_password_temp", "recovery_code"])
+            update_account(
+                account,
+                password=make_password(new_password),
+                is_password_temp=False,
+                recovery_code=None,
+            )
             request.session.pop(f"recovery_verified:{email}", None)
-            request.session["flash_message"] = "Password reset successful. You can now sign in."
-            request.session["flash_message_type"] = "success"
+            flash(request, "Password reset successful. You can now sign in.", "success")
             return redirect("front_page")
 
     return render(request, "logs/forgot_password.html", context)
@@ -261,24 +256,6 @@ def forgot_password(request):
 def activate_account(request):
     context = {}
 
-    def _get_account_for_activation(target_email: str):
-        account = Student.objects.filter(cca_email=target_email).first()
-        if account:
-            return account
-        account = PracticumCoordinator.objects.filter(cca_email=target_email).first()
-        if account:
-            return account
-        return PracticumInstructor.objects.filter(cca_email=target_email).first()
-
-    def _get_account_for_code(target_email: str, activation_code: str):
-        account = Student.objects.filter(cca_email=target_email, activation_code=activation_code).first()
-        if account:
-            return account
-        account = PracticumCoordinator.objects.filter(cca_email=target_email, activation_code=activation_code).first()
-        if account:
-            return account
-        return PracticumInstructor.objects.filter(cca_email=target_email, activation_code=activation_code).first()
-
     if request.method == "POST":
         email = request.POST.get("cca_email", "").strip().lower()
         stage = request.POST.get("stage", "send")
@@ -288,48 +265,38 @@ def activate_account(request):
             context["message_type"] = "error"
             return render(request, "auth/activation.html", context)
 
-        if stage in {"send", "resend"}:
-            last_key = f"activation_last_sent:{email}"
-            last_sent = request.session.get(last_key)
-            if last_sent:
-                elapsed = (timezone.now() - timezone.datetime.fromisoformat(last_sent)).total_seconds()
-                if elapsed < 60:
-                    context["message"] = "Please wait before resending the code."
-                    context["message_type"] = "error"
-                    context["show_code"] = True
-                    context["email"] = email
-                    context["cooldown_seconds"] = int(60 - elapsed)
-                    return render(request, "auth/activation.html", context)
+        throttled = _code_stage_throttle(request, "activation", email, stage)
+        if throttled:
+            context["message"], context["cooldown_seconds"] = throttled
+            context["message_type"] = "error"
+            context["show_code"] = True
+            context["email"] = email
+            return render(request, "auth/activation.html", context, status=429)
 
+        if stage in {"send", "resend"}:
             code = f"{secrets.randbelow(10**6):06d}"
-            account = _get_account_for_activation(email)
+            account = first_account(find_accounts(email))
             if not account:
                 context["message"] = "Email not found. Please contact the admin."
                 context["message_type"] = "error"
             else:
-                account.activation_code = code
-                account.active_status = False
-                account.is_password_temp = True
-                account.save(update_fields=["activation_code", "active_status", "is_password_temp"])
+                update_account(account, activation_code=code, active_status=False, is_password_temp=True)
                 try:
-                    subject = "ICSLIS OJT System Activation Code"
-                    text_body = f"Your activation code is: {code}"
-                    html_body = render_to_string(
+                    enqueue_email(
+                        email,
+                        "ICSLIS OJT System Activation Code",
+                        f"Your activation code is: {code}",
                         "emails/activation_code.html",
                         {"activation_code": code, "email": email},
                     )
-                    msg = EmailMultiAlternatives(subject, text_body, None, [email])
-                    msg.attach_alternative(html_body, "text/html")
-                    _attach_logo(msg)
-                    msg.send()
                     context["message"] = "Activation code sent. Please check your email."
                     context["message_type"] = "success"
                     context["show_code"] = True
                     context["email"] = email
-                    context["cooldown_seconds"] = 60
-                    request.session[last_key] = timezone.now().isoformat()
+                    context["cooldown_seconds"] = settings.CODE_RESEND_COOLDOWN_SECONDS
+                    start_cooldown("activation", email, settings.CODE_RESEND_COOLDOWN_SECONDS)
                 except Exception:
-                    logger.exception("Failed to send activation code email to %s", email)
+                    logger.exception("Failed to queue activation code email to %s", email)
                     context["message"] = "Unable to send activation code right now. Please try again later."
                     context["message_type"] = "error"
             return render(request, "auth/activation.html", context)
@@ -342,38 +309,37 @@ def activate_account(request):
             context["email"] = email
             return render(request, "auth/activation.html", context)
 
-        account = _get_account_for_code(email, code)
+        account = first_account(find_accounts(email), activation_code=code)
         if account:
             temp_password = secrets.token_urlsafe(6)
             try:
-                subject = "ICSLIS OJT System Temporary Password"
-                text_body = (
-                    "Your account is now active.\n"
-                    f"Temporary password: {temp_password}\n"
-                    "Please log in and change your password immediately."
-                )
-                html_body = render_to_string(
-                    "emails/temp_password.html",
-                    {"temp_password": temp_password, "email": email},
-                )
-                msg = EmailMultiAlternatives(subject, text_body, None, [email])
-                msg.attach_alternative(html_body, "text/html")
-                _attach_logo(msg)
-                msg.send()
+                with transaction.atomic():
+                    enqueue_email(
+                        email,
+                        "ICSLIS OJT System Temporary Password",
+                        (
+                            "Your account is now active.\n"
+                            f"Temporary password: {temp_password}\n"
+                            "Please log in and change your password immediately."
+                        ),
+                        "emails/temp_password.html",
+                        {"temp_password": temp_password, "email": email},
+                    )
+                    update_account(
+                        account,
+                        active_status=True,
+                        password=make_password(temp_password),
+                        is_password_temp=True,
+                    )
             except Exception:
-                logger.exception("Failed to send temporary password email to %s", email)
+                logger.exception("Failed to queue temporary password email to %s", email)
                 context["message"] = "Account activation email failed. Please try again later."
                 context["message_type"] = "error"
                 context["show_code"] = True
                 context["email"] = email
                 return render(request, "auth/activation.html", context)
 
-            account.active_status = True
-            account.password = make_password(temp_password)
-            account.is_password_temp = True
-            account.save(update_fields=["active_status", "password", "is_password_temp"])
-            request.session["flash_message"] = "Account activated. Temporary password sent to your email."
-            request.session["flash_message_type"] = "success"
+            flash(request, "Account activated. Temporary password sent to your email.", "success")
             return redirect("front_page")
         else:
             context["message"] = "Invalid activation code."
@@ -428,8 +394,7 @@ def change_temp_password(request):
         account.save(update_fields=["password", "is_password_temp"])
         request.session.pop("account_id", None)
         request.session.pop("account_type", None)
-        request.session["flash_message"] = "Password updated. You can now sign in."
-        request.session["flash_message_type"] = "success"
+        flash(request, "Password updated. You can now sign in.", "success")
         return redirect("front_page")
 
     return render(request, "auth/change_temp_password.html", context)
@@ -439,8 +404,7 @@ def change_temp_password(request):
 def student_home(request):
     account_id = request.session.get("account_id")
     if not account_id:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     account = Student.objects.filter(id=account_id).first()
@@ -461,8 +425,7 @@ def staff_home(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
@@ -475,7 +438,6 @@ def staff_home(request):
     context = {"account": account, "role": account_type}
 
     if account_type == "instructor":
-        _ensure_section_instructor_tables()
         with connection.cursor() as cursor:
             cursor.execute(
                 """
@@ -504,42 +466,13 @@ def staff_home(request):
                   sr.last_name,
                   sr.section,
                   sr.school_year,
-                  coalesce(
-                    dtr.january_hours, 0
-                  ) + coalesce(
-                    dtr.february_hours, 0
-                  ) + coalesce(
-                    dtr.march_hours, 0
-                  ) + coalesce(
-                    dtr.april_hours, 0
-                  ) + coalesce(
-                    dtr.may_hours, 0
-                  ) + coalesce(
-                    dtr.june_hours, 0
-                  ) as total_hours,
-                  (
-                    sr.practicum_application
-                    and sr.letter_of_intent
-                    and sr.endorsement_letter
-                    and sr.practicum_parental_consent
-                    and sr.acceptance_form
-                    and sr.reply_form
-                    and sr.practicum_training_agreement
-                    and sr.attendance_sheet
-                    and sr.weekly_journal
-                    and sr.transmittal_form
-                    and sr.evaluation_form
-                    and sr.outreach_program_design
-                    and sr.outreach_post_activity_report
-                    and sr.ojt_log_sheet
-                    and sr.requirements_checklist
-                    and sr.cca_hymn
-                  ) as requirements_done
+                  coalesce(sp.total_hours, 0) as total_hours,
+                  coalesce(sp.requirements_done, false) as requirements_done
                 from section_instructors si
                 join section_list sl on sl.id = si.section_id
                 join student_requirements sr
                   on sr.section = sl.section and sr.school_year = sl.school_year
-                left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
+                left join student_progress sp on sp.student_id = sr.student_id
                 where si.instructor_id = %s
                 order by sr.last_name, sr.first_name
                 """,
@@ -632,9 +565,11 @@ def _build_instructor_section_detail(cursor, section, school_year):
           coalesce(dtr.march_hours, 0) as march_hours,
           coalesce(dtr.april_hours, 0) as april_hours,
           coalesce(dtr.may_hours, 0) as may_hours,
-          coalesce(dtr.june_hours, 0) as june_hours
+          coalesce(dtr.june_hours, 0) as june_hours,
+          coalesce(sp.total_hours, 0) as total_hours
         from student_requirements sr
         left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
+        left join student_progress sp on sp.student_id = sr.student_id
         where sr.section = %s and sr.school_year = %s
         order by sr.last_name, sr.first_name
         """,
@@ -665,7 +600,7 @@ def _build_instructor_section_detail(cursor, section, school_year):
         april_hours = int(student_row[26] or 0)
         may_hours = int(student_row[27] or 0)
         june_hours = int(student_row[28] or 0)
-        total_hours = january_hours + february_hours + march_hours + april_hours + may_hours + june_hours
+        total_hours = int(student_row[29] or 0)
 
         students.append(
             {
@@ -810,8 +745,7 @@ def instructor_sections(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"instructor", "coordinator"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     model = PracticumInstructor if account_type == "instructor" else PracticumCoordinator
@@ -821,8 +755,6 @@ def instructor_sections(request):
         request.session.pop("account_type", None)
         return redirect("front_page")
 
-    _ensure_section_instructor_tables()
-    _reset_session_tokens(request, "instructor_sections")
     with connection.cursor() as cursor:
         if account_type == "coordinator":
             cursor.execute(
@@ -851,7 +783,7 @@ def instructor_sections(request):
             section_id = str(row[0])
             assigned_sections.append(
                 {
-                    "section_key": _mint_session_token(request, "instructor_sections", section_id),
+                    "section_key": mint_ui_token(request, "instructor_sections", section_id),
                     "section": row[1],
                     "school_year": row[2],
                 }
@@ -886,35 +818,32 @@ def instructor_section_details(request, section_id):
         request.session.pop("account_type", None)
         return JsonResponse({"ok": False, "error": "Unauthorized"}, status=401)
 
-    _ensure_section_instructor_tables()
+    owner_column = "coordinator_id" if account_type == "coordinator" else "instructor_id"
     with connection.cursor() as cursor:
-        if account_type == "coordinator":
-            cursor.execute(
-                """
-                select sl.section, sl.school_year
-                from section_instructors si
-                join section_list sl on sl.id = si.section_id
-                where si.coordinator_id = %s and sl.id = %s
-                """,
-                [account_id, str(section_id)],
-            )
-        else:
-            cursor.execute(
-                """
-                select sl.section, sl.school_year
-                from section_instructors si
-                join section_list sl on sl.id = si.section_id
-                where si.instructor_id = %s and sl.id = %s
-                """,
-                [account_id, str(section_id)],
-            )
+        cursor.execute(
+            f"""
+            select sl.section, sl.school_year, coalesce(sv.version, 0)
+            from section_instructors si
+            join section_list sl on sl.id = si.section_id
+            left join section_versions sv on sv.section = sl.section
+            where si.{owner_column} = %s and sl.id = %s
+            """,
+            [account_id, str(section_id)],
+        )
         row = cursor.fetchone()
         if not row:
             return JsonResponse({"ok": False, "error": "Section not found"}, status=404)
 
-        details = _build_instructor_section_detail(cursor, row[0], row[1])
+        details_json = get_section_detail_json(
+            row[0],
+            row[1],
+            row[2],
+            lambda: _build_instructor_section_detail(cursor, row[0], row[1]),
+        )
 
-    return JsonResponse({"ok": True, "data": details})
+    return HttpResponse(
+        f'{{"ok": true, "version": {int(row[2])}, "data": {details_json}}}', content_type="application/json"
+    )
 
 
 @never_cache
@@ -925,19 +854,122 @@ def instructor_section_details_by_key(request):
         return JsonResponse({"ok": False, "error": "Unauthorized"}, status=401)
 
     section_key = (request.GET.get("section_key") or "").strip()
-    section_id = _resolve_session_token(request, "instructor_sections", section_key)
+    section_id = resolve_ui_token(request, "instructor_sections", section_key)
     if not section_id:
         return JsonResponse({"ok": False, "error": "Section session expired. Please refresh."}, status=400)
     return instructor_section_details(request, section_id)
 
 
+def _resolve_live_section(request, section_key):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"instructor", "coordinator"}:
+        return None
+    section_id = resolve_ui_token(request, "instructor_sections", section_key)
+    if not section_id:
+        return None
+    owner_column = "coordinator_id" if account_type == "coordinator" else "instructor_id"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            select sl.section
+            from section_instructors si
+            join section_list sl on sl.id = si.section_id
+            where si.{owner_column} = %s and sl.id = %s
+            """,
+            [account_id, str(section_id)],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _section_version(section):
+    with connection.cursor() as cursor:
+        cursor.execute("select version from section_versions where section = %s", [section])
+        row = cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+@never_cache
+async def instructor_section_events(request):
+    # Streams are only held open under ASGI; a 204 tells EventSource clients
+    # on WSGI workers (or with live updates off) to fall back to polling.
+    if not settings.LIVE_UPDATES_ENABLED or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    section_key = (request.GET.get("section_key") or "").strip()
+    section = await sync_to_async(_resolve_live_section)(request, section_key)
+    if not section:
+        return HttpResponse(status=204)
+
+    async def read_version():
+        return await sync_to_async(_section_version)(section)
+
+    response = StreamingHttpResponse(
+        section_event_stream(section, read_version),
+        content_type="text/event-stream",
+    )
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _serialize_section_assignment(request, row):
+    return {
+        "ref": stable_ref("section_assignments", row[0]),
+        "section_key": mint_ui_token(request, "manage_records_sections", str(row[0])),
+        "section": row[1],
+        "school_year": row[2],
+        "instructor_id": row[3],
+        "instructor_name": full_name(row[4], row[6], row[7], row[5]),
+        "coordinator_id": row[8],
+        "coordinator_name": full_name(row[9], row[11], row[12], row[10]),
+    }
+
+
+def _fetch_section_assignments(request, cursor, section_id=None, school_year=""):
+    where_clauses = []
+    params = []
+    if section_id:
+        where_clauses.append("sl.id = %s")
+        params.append(section_id)
+    if school_year:
+        where_clauses.append("sl.school_year = %s")
+        params.append(school_year)
+    where_sql = f"where {' and '.join(where_clauses)}" if where_clauses else ""
+    cursor.execute(
+        f"""
+        select
+          sl.id,
+          sl.section,
+          sl.school_year,
+          pi.id as instructor_id,
+          pi.first_name,
+          pi.last_name,
+          pi.second_name,
+          pi.middle_initial,
+          pc.id as coordinator_id,
+          pc.first_name as coord_first_name,
+          pc.last_name as coord_last_name,
+          pc.second_name as coord_second_name,
+          pc.middle_initial as coord_middle_initial
+        from section_list sl
+        left join section_instructors si on si.section_id = sl.id
+        left join practicum_instructors pi on pi.id = si.instructor_id
+        left join practicum_coordinators pc on pc.id = si.coordinator_id
+        {where_sql}
+        order by sl.school_year desc, sl.section asc
+        """,
+        params,
+    )
+    return [_serialize_section_assignment(request, row) for row in cursor.fetchall()]
+
+
 @never_cache
 def manage_records(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
@@ -947,8 +979,7 @@ def manage_records(request):
         request.session.pop("account_type", None)
         return redirect("front_page")
 
-    message = request.session.pop("flash_message", None)
-    message_type = request.session.pop("flash_message_type", None)
+    message, message_type = pop_flash(request)
     search = request.GET.get("q", "").strip()
     section_filter = request.GET.get("section", "").strip()
     if not section_filter:
@@ -956,134 +987,8 @@ def manage_records(request):
     school_year = request.GET.get("school_year", "").strip()
     ojt_status = request.GET.get("ojt_status", "").strip().lower()
 
-    where_clauses = []
-    params = []
-
-    where_sql = "where 1 = 0"
-    if school_year:
-        where_clauses.append("school_year = %s")
-        params.append(school_year)
-        if search:
-            where_clauses.append(
-                "(lower(last_name) like lower(%s) or lower(first_name) like lower(%s) or lower(student_no) like lower(%s))"
-            )
-            like = f"%{search}%"
-            params.extend([like, like, like])
-        if section_filter:
-            where_clauses.append("section = %s")
-            params.append(section_filter)
-        where_sql = "where " + " and ".join(where_clauses)
-
-    _ensure_section_instructor_tables()
-
-    _reset_session_tokens(request, "manage_records_students")
-    _reset_session_tokens(request, "manage_records_sections")
-    _reset_session_tokens(request, "manage_records_staff")
-    _reset_session_tokens(request, "weekly_journal_attendance")
-
+    # Requirement rows are loaded page by page from manage_records_data.
     with connection.cursor() as cursor:
-        # Keep schema backward-compatible for DBs that have not run the latest SQL yet.
-        cursor.execute("alter table student_requirements add column if not exists start_of_ojt date")
-        cursor.execute(
-            "alter table student_requirements add column if not exists attendance_sheet boolean not null default false"
-        )
-        cursor.execute(
-            """
-            create table if not exists attendance_sheet_dtr (
-              id uuid primary key default gen_random_uuid(),
-              student_id uuid not null unique references students(id) on delete cascade,
-              january_hours int not null default 0 check (january_hours >= 0),
-              february_hours int not null default 0 check (february_hours >= 0),
-              march_hours int not null default 0 check (march_hours >= 0),
-              april_hours int not null default 0 check (april_hours >= 0),
-              may_hours int not null default 0 check (may_hours >= 0),
-              june_hours int not null default 0 check (june_hours >= 0),
-              created_at timestamptz not null default now(),
-              updated_at timestamptz not null default now()
-            )
-            """
-        )
-        cursor.execute(
-            f"""
-            select
-              sr.student_id,
-              sr.last_name,
-              sr.first_name,
-              sr.middle_initial,
-              sr.start_of_ojt,
-              coalesce(dtr.january_hours, 0) as dtr_january_hours,
-              coalesce(dtr.february_hours, 0) as dtr_february_hours,
-              coalesce(dtr.march_hours, 0) as dtr_march_hours,
-              coalesce(dtr.april_hours, 0) as dtr_april_hours,
-              coalesce(dtr.may_hours, 0) as dtr_may_hours,
-              coalesce(dtr.june_hours, 0) as dtr_june_hours,
-              sr.student_no,
-              sr.section,
-              sr.program,
-              sr.school_year,
-              sr.practicum_application,
-              sr.letter_of_intent,
-              sr.endorsement_letter,
-              sr.practicum_parental_consent,
-              sr.acceptance_form,
-              sr.reply_form,
-              sr.practicum_training_agreement,
-              sr.attendance_sheet,
-              sr.weekly_journal,
-              sr.transmittal_form,
-              sr.evaluation_form,
-              sr.outreach_program_design,
-              sr.outreach_post_activity_report,
-              sr.ojt_log_sheet,
-              sr.requirements_checklist,
-              sr.cca_hymn
-            from student_requirements sr
-            left join attendance_sheet_dtr dtr on dtr.student_id = sr.student_id
-            {where_sql}
-            order by sr.last_name, sr.first_name
-            """,
-            params,
-        )
-        columns = [col[0] for col in cursor.description]
-        requirements = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-        if ojt_status in {"not_started", "ongoing", "completed"}:
-            def resolve_ojt_status(req):
-                total_hours = sum(
-                    int(req.get(key) or 0)
-                    for key in (
-                        "dtr_january_hours",
-                        "dtr_february_hours",
-                        "dtr_march_hours",
-                        "dtr_april_hours",
-                        "dtr_may_hours",
-                        "dtr_june_hours",
-                    )
-                )
-                if total_hours >= 500:
-                    return "completed"
-                prereq_fields = (
-                    "practicum_application",
-                    "letter_of_intent",
-                    "endorsement_letter",
-                    "practicum_parental_consent",
-                    "acceptance_form",
-                    "reply_form",
-                    "practicum_training_agreement",
-                    "ojt_log_sheet",
-                    "requirements_checklist",
-                )
-                if all(bool(req.get(field)) for field in prereq_fields):
-                    return "ongoing"
-                return "not_started"
-
-            requirements = [req for req in requirements if resolve_ojt_status(req) == ojt_status]
-
-        for req in requirements:
-            req["student_key"] = _mint_session_token(
-                request, "manage_records_students", str(req["student_id"])
-            )
-
         cursor.execute(
             """
             insert into section_list (section, school_year)
@@ -1094,61 +999,7 @@ def manage_records(request):
             on conflict (section, school_year) do nothing
             """
         )
-        cursor.execute(
-            """
-            select
-              sl.id,
-              sl.section,
-              sl.school_year,
-              pi.id as instructor_id,
-              pi.first_name,
-              pi.last_name,
-              pi.second_name,
-              pi.middle_initial,
-              pc.id as coordinator_id,
-              pc.first_name as coord_first_name,
-              pc.last_name as coord_last_name,
-              pc.second_name as coord_second_name,
-              pc.middle_initial as coord_middle_initial
-            from section_list sl
-            left join section_instructors si on si.section_id = sl.id
-            left join practicum_instructors pi on pi.id = si.instructor_id
-            left join practicum_coordinators pc on pc.id = si.coordinator_id
-            order by sl.school_year desc, sl.section asc
-            """
-        )
-        assignment_rows = cursor.fetchall()
-        section_assignments = []
-        for row in assignment_rows:
-            # Instructor name
-            i_first, i_last, i_second, i_mi = row[4], row[5], row[6], row[7]
-            i_name_parts = []
-            if i_first: i_name_parts.append(i_first)
-            if i_second: i_name_parts.append(i_second)
-            if i_mi: i_name_parts.append(f"{i_mi}.")
-            if i_last: i_name_parts.append(i_last)
-            
-            # Coordinator name
-            c_first, c_last, c_second, c_mi = row[9], row[10], row[11], row[12]
-            c_name_parts = []
-            if c_first: c_name_parts.append(c_first)
-            if c_second: c_name_parts.append(c_second)
-            if c_mi: c_name_parts.append(f"{c_mi}.")
-            if c_last: c_name_parts.append(c_last)
-
-            section_assignments.append(
-                {
-                    "section_key": _mint_session_token(
-                        request, "manage_records_sections", str(row[0])
-                    ),
-                    "section": row[1],
-                    "school_year": row[2],
-                    "instructor_id": row[3],
-                    "instructor_name": " ".join(i_name_parts).strip(),
-                    "coordinator_id": row[8],
-                    "coordinator_name": " ".join(c_name_parts).strip(),
-                }
-            )
+        section_assignments = _fetch_section_assignments(request, cursor)
 
         cursor.execute(
             """
@@ -1159,7 +1010,7 @@ def manage_records(request):
         )
         sections = [
             {
-                "key": _mint_session_token(request, "manage_records_sections", str(row[0])),
+                "key": mint_ui_token(request, "manage_records_sections", str(row[0])),
                 "section": row[1],
                 "school_year": row[2],
             }
@@ -1172,7 +1023,7 @@ def manage_records(request):
         .order_by("last_name", "first_name")
     )
     for inst in instructors:
-        inst.staff_key = _mint_session_token(
+        inst.staff_key = mint_ui_token(
             request, "manage_records_staff", {"role": "inst", "id": str(inst.id)}
         )
     coordinators = list(
@@ -1181,7 +1032,7 @@ def manage_records(request):
         .order_by("last_name", "first_name")
     )
     for coord in coordinators:
-        coord.staff_key = _mint_session_token(
+        coord.staff_key = mint_ui_token(
             request, "manage_records_staff", {"role": "coord", "id": str(coord.id)}
         )
     response = render(
@@ -1192,7 +1043,6 @@ def manage_records(request):
             "role": account_type,
             "message": message,
             "message_type": message_type,
-            "requirements": requirements,
             "filters": {
                 "q": search,
                 "section": section_filter,
@@ -1211,6 +1061,122 @@ def manage_records(request):
     return response
 
 
+@never_cache
+def manage_records_data(request):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    school_year = (request.GET.get("school_year") or "").strip()
+    if not school_year:
+        return JsonResponse({"ok": True, "rows": [], "next_cursor": None})
+
+    sort = (request.GET.get("sort") or "name").strip()
+    if sort not in SORT_KEYS:
+        sort = "name"
+    descending = (request.GET.get("dir") or "").strip().lower() == "desc"
+    try:
+        page_size = int(request.GET.get("page_size") or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+
+    after = None
+    cursor_token = (request.GET.get("cursor") or "").strip()
+    if cursor_token:
+        cursor_data = resolve_ui_token(request, "manage_records_cursor", cursor_token)
+        if not isinstance(cursor_data, dict) or cursor_data.get("sort") != sort or cursor_data.get("desc") != descending:
+            return JsonResponse({"ok": False, "message": "Page expired. Please reload the records."}, status=400)
+        after = cursor_data.get("after")
+
+    rows, last_key, has_more = fetch_requirements_page(
+        school_year,
+        search=(request.GET.get("q") or "").strip(),
+        section=(request.GET.get("section") or "").strip(),
+        ojt_status=(request.GET.get("ojt_status") or "").strip().lower(),
+        sort=sort,
+        descending=descending,
+        page_size=page_size,
+        after=after,
+    )
+
+    payload_rows = []
+    for row in rows:
+        item = serialize_requirement_row(row)
+        item["student_key"] = mint_ui_token(request, "manage_records_students", str(row["student_id"]))
+        payload_rows.append(item)
+
+    next_cursor = None
+    if has_more:
+        next_cursor = mint_ui_token(
+            request, "manage_records_cursor", {"sort": sort, "desc": descending, "after": last_key}
+        )
+    return JsonResponse({"ok": True, "rows": payload_rows, "next_cursor": next_cursor})
+
+
+@never_cache
+def student_search(request):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    try:
+        limit = int(request.GET.get("limit") or 0)
+    except ValueError:
+        limit = 0
+    rows = search_students(
+        request.GET.get("q") or "",
+        school_year=(request.GET.get("school_year") or "").strip(),
+        limit=limit or None,
+    )
+
+    for_accounts = request.GET.get("for") == "accounts"
+    results = []
+    for row in rows:
+        item = serialize_requirement_row(row)
+        item["email"] = row["cca_email"]
+        item["student_key"] = mint_ui_token(request, "manage_records_students", str(row["student_id"]))
+        if for_accounts:
+            item["edit_key"] = mint_ui_token(
+                request, "manage_accounts_edit", {"type": "student", "id": str(row["student_id"])}
+            )
+        results.append(item)
+    return JsonResponse({"ok": True, "results": results})
+
+
+@never_cache
+def section_assignments_data(request):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    with connection.cursor() as cursor:
+        rows = _fetch_section_assignments(
+            request, cursor, school_year=(request.GET.get("school_year") or "").strip()
+        )
+    rows_html = render_to_string(
+        "staff/partials/section_assignment_rows.html",
+        {"section_assignments": rows},
+        request=request,
+    )
+    return JsonResponse({"ok": True, "rows_html": rows_html})
+
+
+def _section_assignment_response(request, cursor, section_id, message):
+    rows = _fetch_section_assignments(request, cursor, section_id=section_id)
+    payload = {"ok": True, "message": message}
+    if rows:
+        payload["ref"] = rows[0]["ref"]
+        payload["row_html"] = render_to_string(
+            "staff/partials/section_assignment_row.html",
+            {"row": rows[0]},
+            request=request,
+        )
+    return JsonResponse(payload)
+
+
 @never_cache
 def section_instructors_view(request):
     is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
@@ -1224,15 +1190,14 @@ def section_instructors_view(request):
     if not account_id or account_type not in {"coordinator", "instructor"}:
         if is_ajax:
             return JsonResponse({"ok": False, "message": "Please log in to continue."}, status=401)
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     section_key = (request.POST.get("section_key") or "").strip()
     staff_key = (request.POST.get("staff_key") or "").strip()
 
-    section_id = _resolve_session_token(request, "manage_records_sections", section_key)
-    staff_data = _resolve_session_token(request, "manage_records_staff", staff_key) if staff_key else None
+    section_id = resolve_ui_token(request, "manage_records_sections", section_key)
+    staff_data = resolve_ui_token(request, "manage_records_staff", staff_key) if staff_key else None
 
     instructor_id = None
     coordinator_id = None
@@ -1245,12 +1210,9 @@ def section_instructors_view(request):
     if not section_id:
         if is_ajax:
             return JsonResponse({"ok": False, "message": "Please select a section."}, status=400)
-        request.session["flash_message"] = "Please select a section."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please select a section.", "error")
         return redirect("manage_records")
 
-    _ensure_section_instructor_tables()
-
     with connection.cursor() as cursor:
         if instructor_id or coordinator_id:
             cursor.execute(
@@ -1269,52 +1231,84 @@ def section_instructors_view(request):
                 ],
             )
             if is_ajax:
-                return JsonResponse({"ok": True, "message": "Instructor assigned to section."})
-            request.session["flash_message"] = "Instructor assigned to section."
-            request.session["flash_message_type"] = "success"
+                return _section_assignment_response(request, cursor, section_id, "Instructor assigned to section.")
+            flash(request, "Instructor assigned to section.", "success")
         else:
             cursor.execute(
                 "delete from section_instructors where section_id = %s",
                 [section_id],
             )
             if is_ajax:
-                return JsonResponse({"ok": True, "message": "Assignment removed."})
-            request.session["flash_message"] = "Assignment removed."
-            request.session["flash_message_type"] = "success"
+                return _section_assignment_response(request, cursor, section_id, "Assignment removed.")
+            flash(request, "Assignment removed.", "success")
 
     return redirect("manage_records")
 
 
-def _ensure_section_instructor_tables():
+def _serialize_activation_job(job):
+    return {
+        "id": job["id"],
+        "school_year": job["school_year"],
+        "section": job["section"] or "",
+        "status": job["status"],
+        "total": job["total"],
+        "activated": job["activated"],
+        "emails_sent": job["emails_sent"],
+        "emails_failed": job["emails_failed"],
+        "emails_pending": job["emails_pending"],
+        "error": job["last_error"] or "",
+    }
+
+
+@never_cache
+def activation_jobs_view(request):
+    if request.method != "POST":
+        return JsonResponse({"ok": False, "message": "Invalid request method."}, status=405)
+
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type != "coordinator":
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    school_year = (request.POST.get("school_year") or "").strip()
+    section_key = (request.POST.get("section_key") or "").strip()
+    section = None
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            create table if not exists section_list (
-              id uuid primary key default gen_random_uuid(),
-              section text not null,
-              school_year text not null,
-              created_at timestamptz not null default now(),
-              unique (section, school_year)
-            )
-            """
-        )
-        cursor.execute(
-            """
-            create table if not exists section_instructors (
-              id uuid primary key default gen_random_uuid(),
-              section_id uuid not null references section_list(id) on delete cascade,
-              instructor_id uuid references practicum_instructors(id) on delete cascade,
-              coordinator_id uuid references practicum_coordinators(id) on delete cascade,
-              assigned_at timestamptz not null default now(),
-              unique (section_id)
-            )
-            """
-        )
-        cursor.execute(
-            "alter table section_instructors add column if not exists coordinator_id uuid references practicum_coordinators(id) on delete cascade"
-        )
-        # Also make instructor_id nullable in case only coordinator is assigned
-        cursor.execute("alter table section_instructors alter column instructor_id drop not null")
+        if section_key:
+            section_id = resolve_ui_token(request, "manage_records_sections", section_key)
+            if not section_id:
+                return JsonResponse({"ok": False, "message": "Section expired. Please reload the page."}, status=400)
+            cursor.execute("select section, school_year from section_list where id = %s", [section_id])
+            row = cursor.fetchone()
+            if not row:
+                return JsonResponse({"ok": False, "message": "Section not found."}, status=404)
+            section, school_year = row
+        elif school_year:
+            cursor.execute("select 1 from section_list where school_year = %s limit 1", [school_year])
+            if not cursor.fetchone():
+                return JsonResponse({"ok": False, "message": "School year not found."}, status=404)
+        else:
+            return JsonResponse({"ok": False, "message": "Please select a school year."}, status=400)
+
+    if not count_candidates(school_year, section):
+        return JsonResponse({"ok": False, "message": "All students in this selection are already active."}, status=400)
+
+    job, created = create_job(school_year, section, requested_by=account_id)
+    message = "Bulk activation queued." if created else "A bulk activation for this selection is already running."
+    return JsonResponse({"ok": True, "message": message, "job": _serialize_activation_job(job)})
+
+
+@never_cache
+def activation_job_status(request, job_id):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type != "coordinator":
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    job = job_progress(job_id)
+    if job is None:
+        return JsonResponse({"ok": False, "message": "Activation job not found."}, status=404)
+    return JsonResponse({"ok": True, "job": _serialize_activation_job(job)})
 
 
 @never_cache
@@ -1322,8 +1316,7 @@ def company_checklist(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
@@ -1333,8 +1326,6 @@ def company_checklist(request):
         request.session.pop("account_type", None)
         return redirect("front_page")
 
-    _ensure_company_checklist_table()
-    _reset_session_tokens(request, "company_checklist_rows")
 
     response = render(
         request,
@@ -1347,100 +1338,6 @@ def company_checklist(request):
     return response
 
 
-def _ensure_company_checklist_table():
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            create table if not exists company_checklist (
-              id uuid primary key default gen_random_uuid(),
-              company_name text not null default '',
-              city_resolution_checked boolean not null default false,
-              city_resolution_passed_at timestamptz,
-              city_resolution_status text
-                check (city_resolution_status in ('pending', 'approved') or city_resolution_status is null),
-              city_resolution_returned_at timestamptz,
-              company_signing_checked boolean not null default false,
-              company_signing_passed_at timestamptz,
-              office_president_checked boolean not null default false,
-              office_president_passed_at timestamptz,
-              processed_notarized_checked boolean not null default false,
-              processed_notarized_passed_at timestamptz,
-              created_at timestamptz not null default now(),
-              updated_at timestamptz not null default now()
-            )
-            """
-        )
-        cursor.execute(
-            """
-            create index if not exists company_checklist_created_at_idx
-              on company_checklist (created_at)
-            """
-        )
-        cursor.execute(
-            """
-            create table if not exists company_partnered (
-              id uuid primary key default gen_random_uuid(),
-              checklist_row_id uuid not null unique references company_checklist(id) on delete cascade,
-              company_name text not null default '',
-              moa_start_date date not null,
-              moa_expiration_date date,
-              created_at timestamptz not null default now(),
-              updated_at timestamptz not null default now()
-            )
-            """
-        )
-        cursor.execute(
-            """
-            create index if not exists company_partnered_moa_start_date_idx
-              on company_partnered (moa_start_date)
-            """
-        )
-        cursor.execute(
-            """
-            create or replace function set_company_checklist_updated_at()
-            returns trigger
-            language plpgsql
-            as $$
-            begin
-              new.updated_at := now();
-              return new;
-            end;
-            $$;
-            """
-        )
-        cursor.execute(
-            """
-            create or replace function set_company_partnered_updated_at()
-            returns trigger
-            language plpgsql
-            as $$
-            begin
-              new.updated_at := now();
-              return new;
-            end;
-            $$;
-            """
-        )
-        cursor.execute("drop trigger if exists company_checklist_updated_at_trg on company_checklist")
-        cursor.execute(
-            """
-            create trigger company_checklist_updated_at_trg
-            before update on company_checklist
-            for each row
-            execute function set_company_checklist_updated_at()
-            """
-        )
-        cursor.execute("drop trigger if exists company_partnered_updated_at_trg on company_partnered")
-        cursor.execute(
-            """
-            create trigger company_partnered_updated_at_trg
-            before update on company_partnered
-            for each row
-            execute function set_company_partnered_updated_at()
-            """
-        )
-
-
 def _serialize_company_partnered_row(request, row):
     now = timezone.localdate()
     start_date = row[3]
@@ -1461,7 +1358,8 @@ def _serialize_company_partnered_row(request, row):
             notice = f"Memorandum of Agreement expiration is nearing for {row[2] or 'this company'}."
 
     return {
-        "row_key": _mint_session_token(request, "company_checklist_rows", str(row[1])),
+        "ref": stable_ref("company_checklist_rows", row[1]),
+        "row_key": mint_ui_token(request, "company_checklist_rows", str(row[1])),
         "company_name": row[2] or "",
         "moa_start_date": start_date.isoformat() if start_date else "",
         "moa_expiration_date": expiration_date.isoformat() if expiration_date else "",
@@ -1471,7 +1369,7 @@ def _serialize_company_partnered_row(request, row):
     }
 
 
-def _fetch_company_partnered_rows(request, cursor):
+def _fetch_company_partnered_rows(request, cursor, since=-1):
     cursor.execute(
         """
         select
@@ -1481,15 +1379,50 @@ def _fetch_company_partnered_rows(request, cursor):
           moa_start_date,
           moa_expiration_date
         from company_partnered
+        where revision > %s
         order by moa_start_date asc, company_name asc
-        """
+        """,
+        [since],
     )
     return [_serialize_company_partnered_row(request, row) for row in cursor.fetchall()]
 
 
+def _company_checklist_revision(cursor):
+    cursor.execute("select revision from company_checklist_revision")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _company_checklist_sync_token(request, revision):
+    # Row keys are bound to the account and expire, and partnered status depends
+    # on today's date, so a client's copy is only reusable within the same
+    # account, day and half token lifetime.
+    epoch = int(time.time() // max(settings.UI_TOKEN_MAX_AGE // 2, 1))
+    scope = f"{request.session.get('account_id')}:{timezone.localdate().isoformat()}:{epoch}"
+    return f"{revision}.{hashlib.sha1(scope.encode()).hexdigest()[:12]}"
+
+
+def _parse_company_checklist_since(request, sync_token, revision, pruned_revision):
+    """Return the revision a client's sync token refers to, or ``None`` if it needs a full reload.
+
+    Deletions up to ``pruned_revision`` have been pruned, so older tokens
+    cannot be brought up to date with a delta.
+    """
+    since_raw = (sync_token or "").partition(".")[0]
+    if not since_raw.isdigit():
+        return None
+    since = int(since_raw)
+    if since > revision or since < pruned_revision:
+        return None
+    if sync_token != _company_checklist_sync_token(request, since):
+        return None
+    return since
+
+
 def _serialize_company_checklist_row(request, row):
     return {
-        "row_key": _mint_session_token(request, "company_checklist_rows", str(row[0])),
+        "ref": stable_ref("company_checklist_rows", row[0]),
+        "row_key": mint_ui_token(request, "company_checklist_rows", str(row[0])),
         "companyName": row[1] or "",
         "cityResolution": {
             "checked": bool(row[2]),
@@ -1547,11 +1480,19 @@ def company_checklist_data(request):
     if not account_id or account_type not in {"coordinator", "instructor"}:
         return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
 
-    _ensure_company_checklist_table()
-
     if request.method == "GET":
-        _reset_session_tokens(request, "company_checklist_rows")
         with connection.cursor() as cursor:
+            cursor.execute("select revision, pruned_revision from company_checklist_revision")
+            revision, pruned_revision = cursor.fetchone() or (0, 0)
+            sync_token = _company_checklist_sync_token(request, revision)
+            etag = f'"{sync_token}"'
+            if_none_match = request.headers.get("If-None-Match", "")
+            if etag in [tag.strip() for tag in if_none_match.split(",")]:
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+            since = _parse_company_checklist_since(request, request.GET.get("since"), revision, pruned_revision)
             cursor.execute(
                 """
                 select
@@ -1568,18 +1509,40 @@ def company_checklist_data(request):
                   processed_notarized_checked,
                   processed_notarized_passed_at
                 from company_checklist
+                where revision > %s
                 order by created_at asc
-                """
+                """,
+                [-1 if since is None else since],
             )
             rows = cursor.fetchall()
-            partnered_rows = _fetch_company_partnered_rows(request, cursor)
-        return JsonResponse(
+            partnered_rows = _fetch_company_partnered_rows(request, cursor, -1 if since is None else since)
+            deleted = {"checklist": [], "partnered": []}
+            if since is not None:
+                cursor.execute(
+                    """
+                    select kind, checklist_row_id
+                    from company_checklist_deletions
+                    where revision > %s
+                    order by revision
+                    """,
+                    [since],
+                )
+                for kind, row_id in cursor.fetchall():
+                    deleted[kind].append(stable_ref("company_checklist_rows", row_id))
+        response = JsonResponse(
             {
                 "ok": True,
+                "delta": since is not None,
+                "sync_token": sync_token,
+                "revision": revision,
                 "rows": [_serialize_company_checklist_row(request, row) for row in rows],
                 "partnered": partnered_rows,
+                "deleted_rows": deleted["checklist"],
+                "deleted_partnered": deleted["partnered"],
             }
         )
+        response["ETag"] = etag
+        return response
 
     if request.method != "POST":
         return JsonResponse({"ok": False, "message": "Invalid request."}, status=400)
@@ -1612,21 +1575,24 @@ def company_checklist_data(request):
                 """
             )
             row = cursor.fetchone()
-        return JsonResponse({"ok": True, "row": _serialize_company_checklist_row(request, row)})
+            revision = _company_checklist_revision(cursor)
+        return JsonResponse({"ok": True, "row": _serialize_company_checklist_row(request, row), "revision": revision})
 
     if action == "delete":
         row_key = payload.get("row_key")
-        row_id = _resolve_session_token(request, "company_checklist_rows", row_key)
+        row_id = resolve_ui_token(request, "company_checklist_rows", row_key)
         if not row_id:
             return JsonResponse({"ok": False, "message": "Missing or invalid row key."}, status=400)
         with connection.cursor() as cursor:
             cursor.execute("delete from company_checklist where id = %s", [row_id])
-            partnered_rows = _fetch_company_partnered_rows(request, cursor)
-        return JsonResponse({"ok": True, "partnered": partnered_rows})
+            revision = _company_checklist_revision(cursor)
+        return JsonResponse(
+            {"ok": True, "deleted": stable_ref("company_checklist_rows", row_id), "revision": revision}
+        )
 
     if action == "update_partnered_expiration":
         row_key = payload.get("row_key")
-        row_id = _resolve_session_token(request, "company_checklist_rows", row_key)
+        row_id = resolve_ui_token(request, "company_checklist_rows", row_key)
         if not row_id:
             return JsonResponse({"ok": False, "message": "Missing or invalid row key."}, status=400)
 
@@ -1654,7 +1620,7 @@ def company_checklist_data(request):
                 [expiration_date, row_id],
             )
             updated = cursor.fetchone()
-            partnered_rows = _fetch_company_partnered_rows(request, cursor)
+            revision = _company_checklist_revision(cursor)
 
         if not updated:
             return JsonResponse({"ok": False, "message": "Company is not yet in active partnered list."}, status=404)
@@ -1662,13 +1628,13 @@ def company_checklist_data(request):
             {
                 "ok": True,
                 "partnered_row": _serialize_company_partnered_row(request, updated),
-                "partnered": partnered_rows,
+                "revision": revision,
             }
         )
 
     if action == "update":
         row_key = payload.get("row_key")
-        row_id = _resolve_session_token(request, "company_checklist_rows", row_key)
+        row_id = resolve_ui_token(request, "company_checklist_rows", row_key)
         row = payload.get("row") or {}
         if not row_id:
             return JsonResponse({"ok": False, "message": "Missing or invalid row key."}, status=400)
@@ -1743,6 +1709,7 @@ def company_checklist_data(request):
                 ],
             )
             updated = cursor.fetchone()
+            partnered_row = None
             if updated:
                 if notarized_checked and notarized_passed_at:
                     moa_start_date = notarized_passed_at.date() if isinstance(notarized_passed_at, datetime.datetime) else notarized_passed_at
@@ -1754,25 +1721,81 @@ def company_checklist_data(request):
                         do update set
                           company_name = excluded.company_name,
                           moa_start_date = excluded.moa_start_date
+                        returning
+                          id,
+                          checklist_row_id,
+                          company_name,
+                          moa_start_date,
+                          moa_expiration_date
                         """,
                         [row_id, (row.get("companyName") or "").strip(), moa_start_date],
                     )
+                    partnered_row = _serialize_company_partnered_row(request, cursor.fetchone())
                 else:
                     cursor.execute("delete from company_partnered where checklist_row_id = %s", [row_id])
-                partnered_rows = _fetch_company_partnered_rows(request, cursor)
+            revision = _company_checklist_revision(cursor)
         if not updated:
             return JsonResponse({"ok": False, "message": "Checklist row not found."}, status=404)
         return JsonResponse(
             {
                 "ok": True,
                 "row": _serialize_company_checklist_row(request, updated),
-                "partnered": partnered_rows,
+                "partnered_row": partnered_row,
+                "revision": revision,
             }
         )
 
     return JsonResponse({"ok": False, "message": "Unknown action."}, status=400)
 
 
+@never_cache
+def db_pool_stats_view(request):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type != "coordinator":
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    stats = pool_stats()
+    if stats is None:
+        return JsonResponse({"ok": True, "pooled": False})
+    return JsonResponse({"ok": True, "pooled": True, "stats": stats})
+
+
+@never_cache
+def rate_limit_stats_view(request):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type != "coordinator":
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    return JsonResponse({"ok": True, "scopes": rate_limit_stats()})
+
+
+@never_cache
+def export_records(request, kind):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        flash(request, "Please log in to continue.", "error")
+        return redirect("front_page")
+
+    school_year = (request.GET.get("school_year") or "").strip()
+    section = (request.GET.get("section") or "").strip()
+    file_format = (request.GET.get("format") or "csv").strip().lower()
+    if kind not in EXPORT_KINDS or file_format not in EXPORT_FORMATS or not school_year:
+        flash(request, "Select a school year to export.", "error")
+        return redirect("manage_records")
+
+    chunks = stream_export(kind, file_format, school_year, section)
+    if isinstance(request, ASGIRequest):
+        chunks = aiter_export(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[file_format])
+    response["Content-Disposition"] = (
+        f'attachment; filename="{export_filename(kind, school_year, section, file_format)}"'
+    )
+    return response
+
+
 @never_cache
 def sync_student_requirements_view(request):
     if request.method != "POST":
@@ -1781,8 +1804,7 @@ def sync_student_requirements_view(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     with connection.cursor() as cursor:
@@ -1793,8 +1815,7 @@ def sync_student_requirements_view(request):
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         return JsonResponse({"ok": True, "message": "Student details have been synced."})
 
-    request.session["flash_message"] = "Student details have been synced."
-    request.session["flash_message_type"] = "success"
+    flash(request, "Student details have been synced.", "success")
     return redirect("manage_records")
 
 
@@ -1841,7 +1862,9 @@ def schedules_view(request):
                     """,
                     [section, int(submission_day)],
                 )
-                cursor.execute("select sync_weekly_journal_for_section(%s, %s);", [timezone.now().year, section])
+                cursor.execute(
+                    "select sync_weekly_journal_for_section_if_stale(%s, %s);", [timezone.now().year, section]
+                )
             return JsonResponse({"ok": True})
         if action == "delete":
             if not section:
@@ -1863,14 +1886,16 @@ def weekly_journal_weeks(request):
 
     section = (request.GET.get("section") or "").strip()
     student_key = (request.GET.get("student_key") or "").strip()
-    student_id = _resolve_session_token(request, "manage_records_students", student_key)
+    student_id = resolve_ui_token(request, "manage_records_students", student_key)
     month = request.GET.get("month")
     year = request.GET.get("year")
     if not section or not student_id or not month or not year:
         return JsonResponse({"ok": False, "message": "Missing parameters."}, status=400)
 
     with connection.cursor() as cursor:
-        cursor.execute("select sync_weekly_journal_for_section(%s, %s);", [int(year), section])
+        # Only reconciles when the section's schedule or membership changed since
+        # the last sync; otherwise this is a watermark lookup.
+        cursor.execute("select sync_weekly_journal_for_section_if_stale(%s, %s);", [int(year), section])
         cursor.execute(
             """
             select id, week_no, due_date, submitted_at, status, submission_day, status_note
@@ -1886,7 +1911,7 @@ def weekly_journal_weeks(request):
     for r in rows:
         weeks.append(
             {
-                "key": _mint_session_token(request, "weekly_journal_attendance", str(r[0])),
+                "key": mint_ui_token(request, "weekly_journal_attendance", str(r[0])),
             "week_no": r[1],
             "due_date": r[2].isoformat() if r[2] else None,
             "submitted_at": r[3].isoformat() if r[3] else None,
@@ -1909,7 +1934,7 @@ def update_weekly_journal_check(request):
         return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
 
     attendance_key = request.POST.get("attendance_key")
-    attendance_id = _resolve_session_token(request, "weekly_journal_attendance", attendance_key)
+    attendance_id = resolve_ui_token(request, "weekly_journal_attendance", attendance_key)
     checked = request.POST.get("checked")
     if not attendance_id or checked is None:
         return JsonResponse({"ok": False, "message": "Missing parameters."}, status=400)
@@ -1980,146 +2005,102 @@ def update_student_requirement(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
-    student_key = request.POST.get("student_key")
-    student_id = _resolve_session_token(request, "manage_records_students", student_key)
-    field = request.POST.get("field")
-    value = request.POST.get("value")
-
-    allowed_fields = {
-        "practicum_application",
-        "letter_of_intent",
-        "endorsement_letter",
-        "practicum_parental_consent",
-        "acceptance_form",
-        "reply_form",
-        "practicum_training_agreement",
-        "attendance_sheet",
-        "weekly_journal",
-        "transmittal_form",
-        "evaluation_form",
-        "outreach_program_design",
-        "outreach_post_activity_report",
-        "ojt_log_sheet",
-        "requirements_checklist",
-        "cca_hymn",
-    }
-    date_fields = {"start_of_ojt"}
-    hour_fields = {
-        "dtr_january_hours",
-        "dtr_february_hours",
-        "dtr_march_hours",
-        "dtr_april_hours",
-        "dtr_may_hours",
-        "dtr_june_hours",
-    }
+    is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
 
-    if not student_id or (field not in allowed_fields and field not in date_fields and field not in hour_fields):
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return JsonResponse({"ok": False, "message": "Invalid update request."}, status=400)
-        request.session["flash_message"] = "Invalid update request."
-        request.session["flash_message_type"] = "error"
+    def reject(message, status=400):
+        if is_ajax:
+            return JsonResponse({"ok": False, "message": message}, status=status)
+        flash(request, message, "error")
         return redirect("manage_records")
 
-    if field in allowed_fields and value not in {"true", "false"}:
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return JsonResponse({"ok": False, "message": "Invalid update request."}, status=400)
-        request.session["flash_message"] = "Invalid update request."
-        request.session["flash_message_type"] = "error"
-        return redirect("manage_records")
+    student_id = resolve_ui_token(request, "manage_records_students", request.POST.get("student_key"))
+    field = request.POST.get("field")
+    if not student_id:
+        return reject("Invalid update request.")
+    # Same validation and write path as the grid's batch endpoint.
+    value, error = parse_requirement_value(field, request.POST.get("value"))
+    if error:
+        return reject(error)
+    if (str(student_id), field) not in apply_requirement_changes([(str(student_id), field, value)]):
+        return reject("Student record not found.", status=404)
+
+    if is_ajax:
+        return JsonResponse(
+            {
+                "ok": True,
+                "field": field,
+                "value": value.isoformat() if isinstance(value, datetime.date) else ("" if value is None else value),
+            }
+        )
 
-    if field == "attendance_sheet":
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "alter table student_requirements add column if not exists attendance_sheet boolean not null default false"
-            )
+    flash(request, "Student requirement updated.", "success")
+    return redirect("manage_records")
 
-    if field in date_fields:
-        parsed_date = None
-        if value:
-            try:
-                parsed_date = datetime.datetime.strptime(value, "%Y-%m-%d").date()
-            except ValueError:
-                if request.headers.get("x-requested-with") == "XMLHttpRequest":
-                    return JsonResponse({"ok": False, "message": "Invalid date format."}, status=400)
-                request.session["flash_message"] = "Invalid date format."
-                request.session["flash_message_type"] = "error"
-                return redirect("manage_records")
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "update student_requirements set start_of_ojt = %s where student_id = %s",
-                [parsed_date, student_id],
-            )
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return JsonResponse(
-                {
-                    "ok": True,
-                    "field": field,
-                    "value": parsed_date.isoformat() if parsed_date else "",
-                }
-            )
-        request.session["flash_message"] = "Student requirement updated."
-        request.session["flash_message_type"] = "success"
-        return redirect("manage_records")
 
-    if field in hour_fields:
-        try:
-            parsed_hours = int(value)
-        except (TypeError, ValueError):
-            if request.headers.get("x-requested-with") == "XMLHttpRequest":
-                return JsonResponse({"ok": False, "message": "Hours must be a valid number."}, status=400)
-            request.session["flash_message"] = "Hours must be a valid number."
-            request.session["flash_message_type"] = "error"
-            return redirect("manage_records")
-        if parsed_hours < 0:
-            if request.headers.get("x-requested-with") == "XMLHttpRequest":
-                return JsonResponse({"ok": False, "message": "Hours cannot be negative."}, status=400)
-            request.session["flash_message"] = "Hours cannot be negative."
-            request.session["flash_message_type"] = "error"
-            return redirect("manage_records")
-        with connection.cursor() as cursor:
-            month_field_map = {
-                "dtr_january_hours": "january_hours",
-                "dtr_february_hours": "february_hours",
-                "dtr_march_hours": "march_hours",
-                "dtr_april_hours": "april_hours",
-                "dtr_may_hours": "may_hours",
-                "dtr_june_hours": "june_hours",
-            }
-            target_field = month_field_map[field]
-            cursor.execute(
-                """
-                insert into attendance_sheet_dtr (student_id)
-                values (%s)
-                on conflict (student_id) do nothing
-                """,
-                [student_id],
-            )
-            cursor.execute(
-                f"update attendance_sheet_dtr set {target_field} = %s where student_id = %s",
-                [parsed_hours, student_id],
-            )
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return JsonResponse({"ok": True, "field": field, "value": parsed_hours})
-        request.session["flash_message"] = "Student requirement updated."
-        request.session["flash_message_type"] = "success"
-        return redirect("manage_records")
+@never_cache
+def update_student_requirements_batch(request):
+    if request.method != "POST":
+        return JsonResponse({"ok": False, "message": "Invalid request."}, status=400)
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            f"update student_requirements set {field} = %s where student_id = %s",
-            [value == "true", student_id],
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    try:
+        payload = json.loads(request.body.decode("utf-8") or "{}")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({"ok": False, "message": "Invalid JSON body."}, status=400)
+
+    changes = payload.get("changes") if isinstance(payload, dict) else None
+    if not isinstance(changes, list) or not changes:
+        return JsonResponse({"ok": False, "message": "No changes submitted."}, status=400)
+    if len(changes) > MAX_BATCH_CHANGES:
+        return JsonResponse(
+            {"ok": False, "message": f"Too many changes in one request (max {MAX_BATCH_CHANGES})."},
+            status=400,
         )
 
-    if request.headers.get("x-requested-with") == "XMLHttpRequest":
-        return JsonResponse({"ok": True, "field": field, "value": value == "true"})
+    results = []
+    valid = []
+    for index, change in enumerate(changes):
+        if not isinstance(change, dict):
+            results.append({"index": index, "ok": False, "message": "Invalid update request."})
+            continue
+        field = change.get("field")
+        student_key = change.get("student_key")
+        if not isinstance(field, str) or not isinstance(student_key, str):
+            results.append({"index": index, "ok": False, "message": "Invalid update request."})
+            continue
+        student_id = resolve_ui_token(request, "manage_records_students", student_key)
+        if not student_id:
+            results.append({"index": index, "ok": False, "field": field, "message": "Invalid update request."})
+            continue
+        value, error = parse_requirement_value(field, change.get("value"))
+        if error:
+            results.append({"index": index, "ok": False, "field": field, "message": error})
+            continue
+        valid.append((index, str(student_id), field, value))
+        results.append(None)
+
+    applied = apply_requirement_changes([(student_id, field, value) for _, student_id, field, value in valid])
+
+    for index, student_id, field, value in valid:
+        if (student_id, field) not in applied:
+            results[index] = {"index": index, "ok": False, "field": field, "message": "Student record not found."}
+            continue
+        results[index] = {
+            "index": index,
+            "ok": True,
+            "field": field,
+            "value": value.isoformat() if isinstance(value, datetime.date) else ("" if value is None else value),
+        }
 
-    request.session["flash_message"] = "Student requirement updated."
-    request.session["flash_message_type"] = "success"
-    return redirect("manage_records")
+    failed = sum(1 for result in results if not result["ok"])
+    return JsonResponse({"ok": failed == 0, "applied": len(results) - failed, "failed": failed, "results": results})
 
 
 @never_cache
@@ -2127,8 +2108,7 @@ def staff_profile(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
@@ -2138,12 +2118,17 @@ def staff_profile(request):
         request.session.pop("account_type", None)
         return redirect("front_page")
 
-    message = request.session.pop("flash_message", None)
-    message_type = request.session.pop("flash_message_type", None)
+    message, message_type = pop_flash(request)
     response = render(
         request,
         "staff/staff_profile.html",
-        {"account": account, "role": account_type, "message": message, "message_type": message_type},
+        {
+            "account": account,
+            "role": account_type,
+            "profile_thumb_url": profile_thumbnail_url(account.profile_path),
+            "message": message,
+            "message_type": message_type,
+        },
     )
     response["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
     response["Pragma"] = "no-cache"
@@ -2156,8 +2141,7 @@ def manage_accounts(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
@@ -2167,20 +2151,12 @@ def manage_accounts(request):
         request.session.pop("account_type", None)
         return redirect("front_page")
 
-    token_map = request.session.get("manage_accounts_edit_tokens")
-    if not isinstance(token_map, dict):
-        token_map = {}
-
     def mint_edit_key(record_type, record_id):
-        key = secrets.token_urlsafe(16)
-        token_map[key] = {"type": record_type, "id": str(record_id)}
-        request.session["manage_accounts_edit_tokens"] = token_map
-        request.session.modified = True
-        return key
+        return mint_ui_token(request, "manage_accounts_edit", {"type": record_type, "id": str(record_id)})
 
     def resolve_edit_key(record_type, edit_key):
-        row = token_map.get((edit_key or "").strip())
-        if not row:
+        row = resolve_ui_token(request, "manage_accounts_edit", edit_key)
+        if not isinstance(row, dict):
             return None
         if row.get("type") != record_type:
             return None
@@ -2221,117 +2197,33 @@ def manage_accounts(request):
         if action == "import_student_csv":
             upload = request.FILES.get("student_csv")
             if not upload:
-                request.session["flash_message"] = "Please choose a CSV file first."
-                request.session["flash_message_type"] = "error"
+                flash(request, "Please choose a CSV file first.", "error")
                 return redirect("manage_accounts")
 
             if not upload.name.lower().endswith(".csv"):
-                request.session["flash_message"] = "Invalid file type. Upload a .csv file."
-                request.session["flash_message_type"] = "error"
+                flash(request, "Invalid file type. Upload a .csv file.", "error")
                 return redirect("manage_accounts")
 
             try:
                 content = upload.read().decode("utf-8-sig")
             except UnicodeDecodeError:
-                request.session["flash_message"] = "CSV must be UTF-8 encoded."
-                request.session["flash_message_type"] = "error"
+                flash(request, "CSV must be UTF-8 encoded.", "error")
                 return redirect("manage_accounts")
 
-            reader = csv.DictReader(io.StringIO(content))
-            if not reader.fieldnames:
-                request.session["flash_message"] = "CSV is empty or missing headers."
-                request.session["flash_message_type"] = "error"
+            try:
+                rows, skipped_count, errors = parse_student_csv(content)
+            except ValueError as exc:
+                flash(request, str(exc), "error")
                 return redirect("manage_accounts")
 
-            # Normalize incoming headers so template files can use either "email" or "cca_email".
-            headers = {h.strip().lower(): h for h in reader.fieldnames if h}
-            required = ["student_no", "last_name", "first_name", "program", "section"]
-            missing = [k for k in required if k not in headers]
-            if "cca_email" not in headers and "email" not in headers:
-                missing.append("cca_email")
-            if missing:
-                request.session["flash_message"] = (
-                    "CSV missing required columns: " + ", ".join(missing)
-                )
-                request.session["flash_message_type"] = "error"
+            try:
+                created_count, updated_count, import_errors = import_students(rows)
+            except Exception:
+                logger.exception("Student CSV import failed")
+                flash(request, "Student CSV import failed. No rows were saved.", "error")
                 return redirect("manage_accounts")
-
-            created_count = 0
-            updated_count = 0
-            skipped_count = 0
-            errors = []
-
-            for idx, row in enumerate(reader, start=2):
-                student_no = (row.get(headers.get("student_no", ""), "") or "").strip()
-                cca_email = (
-                    (row.get(headers.get("cca_email", ""), "") or "")
-                    or (row.get(headers.get("email", ""), "") or "")
-                ).strip().lower()
-                last_name = (row.get(headers.get("last_name", ""), "") or "").strip()
-                first_name = (row.get(headers.get("first_name", ""), "") or "").strip()
-                second_name = (row.get(headers.get("second_name", ""), "") or "").strip() or None
-                middle_initial = (row.get(headers.get("middle_initial", ""), "") or "").strip() or None
-                program = (row.get(headers.get("program", ""), "") or "").strip()
-                section = (row.get(headers.get("section", ""), "") or "").strip()
-                school_year = (row.get(headers.get("school_year", ""), "") or "").strip() or None
-
-                if not (student_no or cca_email or first_name or last_name or program or section):
-                    skipped_count += 1
-                    continue
-
-                if not student_no or not cca_email or not first_name or not last_name or not program or not section:
-                    errors.append({"row": idx, "reason": "Missing required value(s)."})
-                    continue
-
-                try:
-                    existing = Student.objects.filter(student_no=student_no).first()
-                    if not existing:
-                        existing = Student.objects.filter(cca_email=cca_email).first()
-
-                    if existing:
-                        existing.student_no = student_no
-                        existing.cca_email = cca_email
-                        existing.last_name = last_name
-                        existing.first_name = first_name
-                        existing.second_name = second_name
-                        existing.middle_initial = middle_initial
-                        existing.program = program
-                        existing.section = section
-                        existing.school_year = school_year
-                        existing.save(update_fields=[
-                            "student_no",
-                            "cca_email",
-                            "last_name",
-                            "first_name",
-                            "second_name",
-                            "middle_initial",
-                            "program",
-                            "section",
-                            "school_year",
-                        ])
-                        updated_count += 1
-                    else:
-                        Student.objects.create(
-                            student_no=student_no,
-                            cca_email=cca_email,
-                            last_name=last_name,
-                            first_name=first_name,
-                            second_name=second_name,
-                            middle_initial=middle_initial,
-                            school_year=school_year,
-                            program=program,
-                            section=section,
-                            password="",
-                            activation_code="",
-                            recovery_code=None,
-                            active_status=False,
-                            is_password_temp=True,
-                        )
-                        created_count += 1
-                except IntegrityError:
-                    errors.append({"row": idx, "reason": "Duplicate student number or email conflict."})
-                except Exception as exc:
-                    errors.append({"row": idx, "reason": str(exc)})
+            errors.extend(import_errors)
+            errors.sort(key=lambda err: err["row"])
 
             request.session["import_student_summary"] = {
                 "created": created_count,
@@ -2340,11 +2232,12 @@ def manage_accounts(request):
                 "errors": errors[:50],
                 "error_count": len(errors),
             }
-            request.session["flash_message"] = (
+            flash(
+                request,
                 f"Student CSV import done. Created: {created_count}, "
-                f"Updated: {updated_count}, Skipped: {skipped_count}, Errors: {len(errors)}."
+                f"Updated: {updated_count}, Skipped: {skipped_count}, Errors: {len(errors)}.",
+                "success" if len(errors) == 0 else "error",
             )
-            request.session["flash_message_type"] = "success" if len(errors) == 0 else "error"
             return redirect("manage_accounts")
 
         if action == "add_student":
@@ -2371,8 +2264,7 @@ def manage_accounts(request):
                         {"ok": False, "message": "Student account already exists (student number or email)."},
                         status=400,
                     )
-                request.session["flash_message"] = "Student account already exists (student number or email)."
-                request.session["flash_message_type"] = "error"
+                flash(request, "Student account already exists (student number or email).", "error")
                 return redirect("manage_accounts")
             if request.headers.get("x-requested-with") == "XMLHttpRequest":
                 return JsonResponse(
@@ -2395,8 +2287,7 @@ def manage_accounts(request):
                         },
                     }
                 )
-            request.session["flash_message"] = "Student account added."
-            request.session["flash_message_type"] = "success"
+            flash(request, "Student account added.", "success")
             return redirect("manage_accounts")
 
         if action == "add_instructor":
@@ -2419,8 +2310,7 @@ def manage_accounts(request):
                         {"ok": False, "message": "Instructor account already exists (email)."},
                         status=400,
                     )
-                request.session["flash_message"] = "Instructor account already exists (email)."
-                request.session["flash_message_type"] = "error"
+                flash(request, "Instructor account already exists (email).", "error")
                 return redirect("manage_accounts")
             if request.headers.get("x-requested-with") == "XMLHttpRequest":
                 return JsonResponse(
@@ -2439,8 +2329,7 @@ def manage_accounts(request):
                         },
                     }
                 )
-            request.session["flash_message"] = "Instructor account added."
-            request.session["flash_message_type"] = "success"
+            flash(request, "Instructor account added.", "success")
             return redirect("manage_accounts")
 
         if action == "update_student":
@@ -2452,8 +2341,7 @@ def manage_accounts(request):
                         {"ok": False, "message": "Edit session expired. Please refresh and try again."},
                         status=400,
                     )
-                request.session["flash_message"] = "Edit session expired. Please refresh and try again."
-                request.session["flash_message_type"] = "error"
+                flash(request, "Edit session expired. Please refresh and try again.", "error")
                 return redirect("manage_accounts")
             Student.objects.filter(id=student_id).update(
                 student_no=request.POST.get("student_no", "").strip(),
@@ -2488,8 +2376,7 @@ def manage_accounts(request):
                         },
                     }
                 )
-            request.session["flash_message"] = "Student account updated."
-            request.session["flash_message_type"] = "success"
+            flash(request, "Student account updated.", "success")
             return redirect("manage_accounts")
 
         if action == "update_instructor":
@@ -2501,8 +2388,7 @@ def manage_accounts(request):
                         {"ok": False, "message": "Edit session expired. Please refresh and try again."},
                         status=400,
                     )
-                request.session["flash_message"] = "Edit session expired. Please refresh and try again."
-                request.session["flash_message_type"] = "error"
+                flash(request, "Edit session expired. Please refresh and try again.", "error")
                 return redirect("manage_accounts")
             PracticumInstructor.objects.filter(id=instructor_id).update(
                 cca_email=request.POST.get("cca_email", "").strip(),
@@ -2529,19 +2415,10 @@ def manage_accounts(request):
                         },
                     }
                 )
-            request.session["flash_message"] = "Instructor account updated."
-            request.session["flash_message_type"] = "success"
+            flash(request, "Instructor account updated.", "success")
             return redirect("manage_accounts")
 
-    message = request.session.pop("flash_message", None)
-    message_type = request.session.pop("flash_message_type", None)
-    students = list(Student.objects.all().order_by("last_name", "first_name"))
-    instructors = list(PracticumInstructor.objects.all().order_by("last_name", "first_name"))
-    token_map = {}
-    for student in students:
-        student.edit_key = mint_edit_key("student", student.id)
-    for instructor in instructors:
-        instructor.edit_key = mint_edit_key("instructor", instructor.id)
+    message, message_type = pop_flash(request)
     import_student_summary = request.session.pop("import_student_summary", None)
 
     response = render(
@@ -2552,8 +2429,7 @@ def manage_accounts(request):
             "role": account_type,
             "message": message,
             "message_type": message_type,
-            "students": students,
-            "instructors": instructors,
+            "school_years": student_school_years(),
             "import_student_summary": import_student_summary,
         },
     )
@@ -2563,6 +2439,58 @@ def manage_accounts(request):
     return response
 
 
+@never_cache
+def manage_accounts_data(request):
+    account_id = request.session.get("account_id")
+    account_type = request.session.get("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        return JsonResponse({"ok": False, "message": "Unauthorized."}, status=401)
+
+    list_type = (request.GET.get("type") or "student").strip()
+    if list_type not in LISTING_FIELDS:
+        return JsonResponse({"ok": False, "message": "Invalid account type."}, status=400)
+
+    school_year = (request.GET.get("school_year") or "").strip()
+    section = (request.GET.get("section") or "").strip()
+    search = (request.GET.get("q") or "").strip()
+    sort = (request.GET.get("sort") or "name").strip()
+    if sort not in LISTING_SORTS[list_type]:
+        sort = "name"
+    try:
+        page = int(request.GET.get("page") or 1)
+    except ValueError:
+        page = 1
+
+    if list_type == "student" and not school_year:
+        return JsonResponse({"ok": True, "rows": [], "has_more": False, "sections": []})
+
+    if list_type == "student" and len(search) >= SEARCH_MIN_LENGTH:
+        # Ranked trigram matches instead of a paged substring scan.
+        matches, has_more = search_students_page(search, school_year=school_year, section=section, page=page)
+        rows = [
+            {field: match["student_id"] if field == "id" else match[field] for field in LISTING_FIELDS["student"]}
+            for match in matches
+        ]
+    else:
+        rows, has_more = list_accounts(
+            list_type,
+            school_year=school_year,
+            section=section,
+            search=search,
+            sort=sort,
+            descending=(request.GET.get("dir") or "").strip().lower() == "desc",
+            page=page,
+        )
+
+    for row in rows:
+        row["edit_key"] = mint_ui_token(request, "manage_accounts_edit", {"type": list_type, "id": str(row.pop("id"))})
+
+    payload = {"ok": True, "rows": rows, "has_more": has_more, "page": page}
+    if list_type == "student" and request.GET.get("include_sections") == "1":
+        payload["sections"] = student_sections(school_year)
+    return JsonResponse(payload)
+
+
 def download_students_csv_template(request):
     rows = [
         [
@@ -2603,60 +2531,107 @@ def upload_staff_profile_image(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
     image = request.FILES.get("profile_image")
     if not image:
-        request.session["flash_message"] = "Please choose an image to upload."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please choose an image to upload.", "error")
         return redirect("staff_profile")
 
-    supabase_url = (os.getenv("SUPABASE_URL") or "").strip()
-    service_role_key = (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or "").strip()
-    bucket = (os.getenv("SUPABASE_BUCKET") or "OJTSystemProfile").strip()
-
-    if not supabase_url or not service_role_key or not bucket:
-        request.session["flash_message"] = "Supabase configuration is missing."
-        request.session["flash_message_type"] = "error"
+    client = get_storage_client()
+    if client is None:
+        flash(request, "Supabase configuration is missing.", "error")
         return redirect("staff_profile")
 
-    ext = os.path.splitext(image.name)[1].lower()
-    safe_ext = ext if ext in {".jpg", ".jpeg", ".png", ".webp"} else ".png"
-    object_path = f"staff/{account_type}/{account_id}/{uuid.uuid4().hex}{safe_ext}"
-    upload_url = f"{supabase_url}/storage/v1/object/{bucket}/{object_path}"
+    try:
+        image_file, thumb_file = prepare_profile_image(image)
+    except ValueError as exc:
+        flash(request, str(exc), "error")
+        return redirect("staff_profile")
 
+    object_path = f"staff/{account_type}/{account_id}/{uuid.uuid4().hex}.webp"
     try:
-        data = image.read()
-        req = urllib.request.Request(
-            upload_url,
-            data=data,
-            method="POST",
-            headers={
-                "Authorization": f"Bearer {service_role_key}",
-                "apikey": service_role_key,
-                "Content-Type": image.content_type or "application/octet-stream",
-                "x-upsert": "true",
-            },
-        )
-        urllib.request.urlopen(req, timeout=20)
-    except urllib.error.HTTPError:
-        request.session["flash_message"] = "Upload failed. Please try again."
-        request.session["flash_message_type"] = "error"
+        with image_file, thumb_file:
+            public_url = client.upload(object_path, image_file, "image/webp")
+            client.upload(thumbnail_path(object_path), thumb_file, "image/webp")
+    except StorageError:
+        logger.exception("Profile image upload failed for %s %s", account_type, account_id)
+        enqueue_deletes(client.bucket, [object_path])
+        flash(request, "Upload failed. Please try again.", "error")
         return redirect("staff_profile")
-    except urllib.error.URLError:
-        request.session["flash_message"] = "Network error during upload."
-        request.session["flash_message_type"] = "error"
+
+    model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
+    previous_url = model.objects.filter(id=account_id).values_list("profile_path", flat=True).first()
+    model.objects.filter(id=account_id).update(profile_path=public_url)
+
+    previous_path = client.object_path_from_url(previous_url)
+    if previous_path:
+        enqueue_deletes(client.bucket, [previous_path, thumbnail_path(previous_path)])
+
+    flash(request, "Profile photo updated.", "success")
+    return redirect("staff_profile")
+
+
+@never_cache
+async def upload_staff_profile_image_async(request):
+    """upload_staff_profile_image for ASGI workers (ASYNC_VIEWS_ENABLED).
+
+    The image and its thumbnail are uploaded concurrently, and the event loop
+    serves other requests while storage responds.
+    """
+    if request.method != "POST":
+        return redirect("staff_profile")
+
+    account_id = await request.session.aget("account_id")
+    account_type = await request.session.aget("account_type")
+    if not account_id or account_type not in {"coordinator", "instructor"}:
+        flash(request, "Please log in to continue.", "error")
+        return redirect("front_page")
+
+    image = request.FILES.get("profile_image")
+    if not image:
+        flash(request, "Please choose an image to upload.", "error")
         return redirect("staff_profile")
 
-    public_url = f"{supabase_url}/storage/v1/object/public/{bucket}/{object_path}"
+    client = get_async_storage_client()
+    if client is None:
+        flash(request, "Supabase configuration is missing.", "error")
+        return redirect("staff_profile")
+
+    try:
+        image_file, thumb_file = await sync_to_async(prepare_profile_image, thread_sensitive=False)(image)
+    except ValueError as exc:
+        flash(request, str(exc), "error")
+        return redirect("staff_profile")
+
+    object_path = f"staff/{account_type}/{account_id}/{uuid.uuid4().hex}.webp"
+    with image_file, thumb_file:
+        results = await asyncio.gather(
+            client.upload(object_path, image_file, "image/webp"),
+            client.upload(thumbnail_path(object_path), thumb_file, "image/webp"),
+            return_exceptions=True,
+        )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    for error in errors:
+        if not isinstance(error, StorageError):
+            raise error
+    if errors:
+        logger.error("Profile image upload failed for %s %s", account_type, account_id, exc_info=errors[0])
+        await sync_to_async(enqueue_deletes)(client.bucket, [object_path, thumbnail_path(object_path)])
+        flash(request, "Upload failed. Please try again.", "error")
+        return redirect("staff_profile")
+    public_url = results[0]
 
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
-    model.objects.filter(id=account_id).update(profile_path=public_url)
+    previous_url = await model.objects.filter(id=account_id).values_list("profile_path", flat=True).afirst()
+    await model.objects.filter(id=account_id).aupdate(profile_path=public_url)
+
+    previous_path = client.object_path_from_url(previous_url)
+    if previous_path:
+        await sync_to_async(enqueue_deletes)(client.bucket, [previous_path, thumbnail_path(previous_path)])
 
-    request.session["flash_message"] = "Profile photo updated."
-    request.session["flash_message_type"] = "success"
+    flash(request, "Profile photo updated.", "success")
     return redirect("staff_profile")
 
 
@@ -2668,51 +2643,29 @@ def remove_staff_profile_image(request):
     account_id = request.session.get("account_id")
     account_type = request.session.get("account_type")
     if not account_id or account_type not in {"coordinator", "instructor"}:
-        request.session["flash_message"] = "Please log in to continue."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Please log in to continue.", "error")
         return redirect("front_page")
 
-    supabase_url = (os.getenv("SUPABASE_URL") or "").strip()
-    service_role_key = (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or "").strip()
-    bucket = (os.getenv("SUPABASE_BUCKET") or "OJTSystemProfile").strip()
-
     model = PracticumCoordinator if account_type == "coordinator" else PracticumInstructor
     account = model.objects.filter(id=account_id).first()
     if not account:
-        request.session["flash_message"] = "Account not found."
-        request.session["flash_message_type"] = "error"
+        flash(request, "Account not found.", "error")
         return redirect("staff_profile")
 
-    profile_url = (account.profile_path or "").strip()
-    object_path = ""
-    if supabase_url and bucket and profile_url.startswith(f"{supabase_url}/storage/v1/object/public/{bucket}/"):
-        object_path = profile_url.split(f"/{bucket}/", 1)[-1]
+    model.objects.filter(id=account_id).update(profile_path=None)
 
-    if object_path and service_role_key:
-        delete_url = f"{supabase_url}/storage/v1/object/{bucket}/{object_path}"
-        try:
-            req = urllib.request.Request(
-                delete_url,
-                method="DELETE",
-                headers={
-                    "Authorization": f"Bearer {service_role_key}",
-                    "apikey": service_role_key,
-                },
-            )
-            urllib.request.urlopen(req, timeout=20)
-        except (urllib.error.HTTPError, urllib.error.URLError):
-            # Even if delete fails, proceed to clear DB path
-            pass
+    # The stored object is deleted by process_storage_deletions.
+    client = get_storage_client()
+    object_path = client.object_path_from_url(account.profile_path) if client else ""
+    if object_path:
+        enqueue_deletes(client.bucket, [object_path, thumbnail_path(object_path)])
 
-    model.objects.filter(id=account_id).update(profile_path=None)
-    request.session["flash_message"] = "Profile photo removed."
-    request.session["flash_message_type"] = "success"
+    flash(request, "Profile photo removed.", "success")
     return redirect("staff_profile")
 
 
 def logout_user(request):
     request.session.pop("account_id", None)
     request.session.pop("account_type", None)
-    request.session["flash_message"] = "You have been logged out."
-    request.session["flash_message_type"] = "success"
+    flash(request, "You have been logged out.", "success")
     return redirect("front_page")
@@ -3,6 +3,18 @@ ASGI config for ojtsystem project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn, directly or as gunicorn workers, and set
+ASYNC_VIEWS_ENABLED=true so I/O-bound endpoints use their async views:
+
+    uvicorn ojtsystem.asgi:application --host 0.0.0.0 --port 8000 --workers 2
+    gunicorn ojtsystem.asgi:application -k uvicorn_worker.UvicornWorker --workers 2
+
+One worker then keeps many slow storage uploads in flight, and section event
+streams (LIVE_UPDATES_ENABLED) stay open without holding a thread each. CSV and
+XLSX exports are handed to the server chunk by chunk (logs.exports.aiter_export),
+so they stream in constant memory here as they do under WSGI.
+``manage.py benchmark_server_modes`` compares this mode with the WSGI one.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -14,3 +26,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ojtsystem.settings')
 
 application = get_asgi_application()
+
+from logs.schema import warn_if_schema_outdated  # noqa: E402
+
+warn_if_schema_outdated()
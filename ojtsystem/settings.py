@@ -14,6 +14,7 @@ import os
 from pathlib import Path
 from urllib.parse import urlparse
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -24,11 +25,17 @@ load_dotenv(BASE_DIR / ".env")
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-+2kyoi!+m16**hbs^lniba0$0&nrxqsgbpzul&x9k)8^_&erl5'
-
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DJANGO_DEBUG", "true").lower() == "true"
+
+# SECURITY WARNING: keep the secret key used in production secret! It signs
+# sessions, flash cookies and the UI row tokens (logs.tokens), so anyone who
+# knows it can forge edits. Only DEBUG runs may fall back to a throwaway key.
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "").strip()
+if not SECRET_KEY:
+    if not DEBUG:
+        raise ImproperlyConfigured("Set DJANGO_SECRET_KEY (or DJANGO_DEBUG=true for local development).")
+    SECRET_KEY = "django-insecure-local-development-only"
 
 ALLOWED_HOSTS = ["*"]
 
@@ -49,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'logs.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,6 +93,20 @@ WSGI_APPLICATION = 'ojtsystem.wsgi.application'
 DATABASE_URL = os.environ.get("DATABASE_URL", "").strip()
 if DATABASE_URL:
     parsed = urlparse(DATABASE_URL)
+    db_options = {'sslmode': os.environ.get("DB_SSLMODE", "require")}
+    # DB_POOL=true keeps a psycopg_pool connection pool per worker process;
+    # otherwise connections are reused for DB_CONN_MAX_AGE seconds. Either way
+    # requests stop paying a TLS handshake to the database each time.
+    DB_POOL = os.environ.get("DB_POOL", "false").lower() == "true"
+    if DB_POOL:
+        db_options['pool'] = {
+            'min_size': int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            'max_size': int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            'timeout': float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            'max_idle': float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            'max_lifetime': float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+            'name': 'ojtsystem',
+        }
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -93,7 +115,11 @@ if DATABASE_URL:
             'PASSWORD': parsed.password,
             'HOST': parsed.hostname,
             'PORT': parsed.port or 5432,
-            'OPTIONS': {'sslmode': 'require'},
+            'OPTIONS': db_options,
+            # The pool manages connection lifetime itself and Django rejects
+            # persistent connections alongside it.
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': os.environ.get("DB_CONN_HEALTH_CHECKS", "true").lower() == "true",
         }
     }
 else:
@@ -104,6 +130,52 @@ else:
         }
     }
 
+# Cache (per-process local memory by default; point CACHE_BACKEND/CACHE_LOCATION
+# at a shared backend such as Redis when running several workers)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.environ.get("CACHE_LOCATION", "ojtsystem"),
+    }
+}
+SECTION_DETAIL_CACHE_SECONDS = int(os.environ.get("SECTION_DETAIL_CACHE_SECONDS", "600"))
+
+# Login and verification-code throttling (logs.ratelimit). Counters live in the
+# "ratelimit" cache; with several workers point it at a backend they share
+# (RATE_LIMIT_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# with a directory as RATE_LIMIT_CACHE_LOCATION, or Redis) so limits hold across
+# processes. Limits are (attempts, window seconds) over a sliding window.
+RATE_LIMIT_CACHE_BACKEND = os.environ.get("RATE_LIMIT_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+CACHES['ratelimit'] = {
+    'BACKEND': RATE_LIMIT_CACHE_BACKEND,
+    'LOCATION': os.environ.get("RATE_LIMIT_CACHE_LOCATION", "ojtsystem-ratelimit"),
+}
+if RATE_LIMIT_CACHE_BACKEND.endswith(("LocMemCache", "FileBasedCache")):
+    CACHES['ratelimit']['OPTIONS'] = {'MAX_ENTRIES': 20000}
+RATE_LIMITS = {
+    "login_email": (int(os.environ.get("LOGIN_RATE_LIMIT_EMAIL", "5")), 300),
+    "login_ip": (int(os.environ.get("LOGIN_RATE_LIMIT_IP", "30")), 300),
+    "code_request_ip": (int(os.environ.get("CODE_REQUEST_RATE_LIMIT_IP", "10")), 3600),
+    "code_verify_email": (int(os.environ.get("CODE_VERIFY_RATE_LIMIT_EMAIL", "10")), 900),
+}
+CODE_RESEND_COOLDOWN_SECONDS = int(os.environ.get("CODE_RESEND_COOLDOWN_SECONDS", "60"))
+# Reverse proxies in front of the app whose X-Forwarded-For entries are trusted.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+
+# Sessions only save when a key actually changes (logs.sessions). The store is
+# "db", "cached_db" (reads served from the cache) or "cache"; the cache-backed
+# stores need a cache shared by all workers, so the per-process default cache
+# keeps plain db storage unless SESSION_STORE_BACKEND says otherwise.
+SESSION_ENGINE = "logs.sessions"
+SESSION_STORE_BACKEND = os.environ.get(
+    "SESSION_STORE_BACKEND",
+    "db" if CACHES["default"]["BACKEND"].endswith("LocMemCache") else "cached_db",
+)
+SESSION_CACHE_ALIAS = "default"
+
+# One-time flash messages travel in a signed cookie instead of the session.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
 # Email (Gmail SMTP by default)
 EMAIL_HOST = os.environ.get("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "587"))
@@ -112,6 +184,59 @@ EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
 
+# Processes that hash temporary passwords for bulk activations
+# (`manage.py process_activation_jobs`); 0 uses one per CPU core.
+BULK_ACTIVATION_WORKERS = int(os.environ.get("BULK_ACTIVATION_WORKERS", "0"))
+
+# Push section changes to open section modals over server-sent events (needs the
+# ASGI entry point; WSGI workers answer 204 and the page falls back to polling).
+LIVE_UPDATES_ENABLED = os.environ.get("LIVE_UPDATES_ENABLED", "true").lower() == "true"
+
+# Route I/O-bound endpoints (profile uploads) to their async views. Enable when
+# serving ojtsystem.asgi with uvicorn; under WSGI the sync views are faster.
+ASYNC_VIEWS_ENABLED = os.environ.get("ASYNC_VIEWS_ENABLED", "false").lower() == "true"
+
+# Supabase storage for profile images. Uploads are downscaled to
+# PROFILE_IMAGE_MAX_PX (plus a PROFILE_THUMB_PX thumbnail) and re-encoded as WebP;
+# replaced objects are deleted by `manage.py process_storage_deletions`.
+SUPABASE_URL = os.environ.get("SUPABASE_URL", "").strip().rstrip("/")
+SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "").strip()
+SUPABASE_BUCKET = os.environ.get("SUPABASE_BUCKET", "OJTSystemProfile").strip()
+STORAGE_POOL_SIZE = int(os.environ.get("STORAGE_POOL_SIZE", "4"))
+STORAGE_TIMEOUT = float(os.environ.get("STORAGE_TIMEOUT", "10"))
+PROFILE_IMAGE_MAX_BYTES = int(os.environ.get("PROFILE_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+PROFILE_IMAGE_MAX_PX = int(os.environ.get("PROFILE_IMAGE_MAX_PX", "512"))
+PROFILE_THUMB_PX = int(os.environ.get("PROFILE_THUMB_PX", "256"))
+
+# Per-request query/timing metrics (Server-Timing header plus a JSON log line on
+# the "logs.instrumentation" logger); slower requests also log their top statements.
+REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_TOP_N = int(os.environ.get("SLOW_REQUEST_TOP_N", "5"))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'logs.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get("REQUEST_METRICS_LOG_LEVEL", "WARNING"),
+            'propagate': False,
+        },
+    },
+}
+
+# Company checklist delete tombstones older than this are removed by
+# `manage.py prune_company_checklist_deletions`; clients that last synced before
+# the newest pruned one get a full reload instead of a delta.
+COMPANY_CHECKLIST_DELETION_RETENTION_DAYS = int(os.environ.get("COMPANY_CHECKLIST_DELETION_RETENTION_DAYS", "7"))
+
+# Signed UI row tokens (student_key, section_key, row_key, ...) expire after this many seconds.
+UI_TOKEN_MAX_AGE = int(os.environ.get("UI_TOKEN_MAX_AGE", str(12 * 60 * 60)))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ojtsystem.settings')
 
 application = get_wsgi_application()
+
+from logs.schema import warn_if_schema_outdated  # noqa: E402
+
+warn_if_schema_outdated()
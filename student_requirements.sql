@@ -101,6 +101,11 @@ returns trigger
 language plpgsql
 as $$
 begin
+  -- Bulk CSV imports reconcile student_requirements set-based themselves.
+  if current_setting('ojt.bulk_import', true) = 'on' then
+    return new;
+  end if;
+
   insert into student_requirements (
     student_id,
     last_name,
@@ -170,6 +175,7 @@ create table if not exists weekly_journal (
 create index if not exists weekly_journal_student_idx on weekly_journal (student_id);
 create index if not exists weekly_journal_section_idx on weekly_journal (section);
 create index if not exists weekly_journal_due_idx on weekly_journal (due_date);
+create index if not exists weekly_journal_section_year_idx on weekly_journal (section, year);
 
 alter table weekly_journal
   add column if not exists status_override boolean not null default false;
@@ -198,6 +204,40 @@ create table if not exists weekly_journal_logs (
   logged_at timestamptz not null default now()
 );
 
+create table if not exists journal_calendar (
+  year int not null,
+  month smallint not null check (month between 1 and 12),
+  submission_day smallint not null check (submission_day between 1 and 5),
+  week_no smallint not null check (week_no between 1 and 5),
+  due_date date not null,
+  primary key (year, month, submission_day, week_no)
+);
+
+create or replace function ensure_journal_calendar(p_year int)
+returns void
+language plpgsql
+as $$
+begin
+  if exists (select 1 from journal_calendar where year = p_year) then
+    return;
+  end if;
+
+  insert into journal_calendar (year, month, submission_day, week_no, due_date)
+  select
+    p_year,
+    extract(month from d)::smallint,
+    extract(isodow from d)::smallint,
+    row_number() over (
+      partition by extract(month from d), extract(isodow from d)
+      order by d
+    )::smallint,
+    d::date
+  from generate_series(make_date(p_year, 1, 1), make_date(p_year, 12, 31), interval '1 day') as d
+  where extract(isodow from d) between 1 and 5
+  on conflict do nothing;
+end;
+$$;
+
 create or replace function get_due_date_for_week(
   p_year int,
   p_month int,
@@ -210,15 +250,22 @@ as $$
 declare
   result date;
 begin
-  select d into result
-  from (
-    select (date_trunc('month', make_date(p_year, p_month, 1)) + (n || ' days')::interval)::date as d
-    from generate_series(0, 40) as n
-  ) days
-  where extract(isodow from d) = p_submission_day
-    and extract(month from d) = p_month
-  order by d
-  offset (p_week_no - 1) limit 1;
+  select due_date into result
+  from journal_calendar
+  where year = p_year
+    and month = p_month
+    and submission_day = p_submission_day
+    and week_no = p_week_no;
+
+  if not found and not exists (select 1 from journal_calendar where year = p_year) then
+    perform ensure_journal_calendar(p_year);
+    select due_date into result
+    from journal_calendar
+    where year = p_year
+      and month = p_month
+      and submission_day = p_submission_day
+      and week_no = p_week_no;
+  end if;
 
   return result;
 end;
@@ -262,6 +309,8 @@ returns void
 language plpgsql
 as $$
 begin
+  perform ensure_journal_calendar(p_year);
+
   insert into weekly_journal (
     student_id,
     section,
@@ -275,15 +324,16 @@ begin
     s.id,
     s.section,
     p_year,
-    m.month,
-    w.week_no,
+    jc.month,
+    jc.week_no,
     sch.submission_day,
-    get_due_date_for_week(p_year, m.month, sch.submission_day, w.week_no)
+    jc.due_date
   from students s
   join submission_schedules sch on sch.section = s.section
-  cross join (select generate_series(1, 6) as month) m
-  cross join (select generate_series(1, 5) as week_no) w
-  where get_due_date_for_week(p_year, m.month, sch.submission_day, w.week_no) is not null
+  join journal_calendar jc
+    on jc.year = p_year
+   and jc.submission_day = sch.submission_day
+   and jc.month between 1 and 6
   on conflict do nothing;
 end;
 $$;
@@ -303,23 +353,30 @@ begin
     return;
   end if;
 
-  with calc as (
-    select
-      w.id,
-      get_due_date_for_week(w.year, w.month, v_day, w.week_no) as new_due
-    from weekly_journal w
-    where w.section = p_section and w.year = p_year
-  )
+  perform ensure_journal_calendar(p_year);
+
   update weekly_journal w
   set submission_day = v_day,
-      due_date = calc.new_due
-  from calc
-  where w.id = calc.id and calc.new_due is not null;
+      due_date = jc.due_date
+  from journal_calendar jc
+  where w.section = p_section
+    and w.year = p_year
+    and jc.year = w.year
+    and jc.month = w.month
+    and jc.submission_day = v_day
+    and jc.week_no = w.week_no
+    and (w.submission_day <> v_day or w.due_date <> jc.due_date);
 
   delete from weekly_journal w
   where w.section = p_section
     and w.year = p_year
-    and get_due_date_for_week(w.year, w.month, v_day, w.week_no) is null;
+    and not exists (
+      select 1 from journal_calendar jc
+      where jc.year = w.year
+        and jc.month = w.month
+        and jc.submission_day = v_day
+        and jc.week_no = w.week_no
+    );
 
   insert into weekly_journal (
     student_id,
@@ -334,15 +391,16 @@ begin
     s.id,
     s.section,
     p_year,
-    m.month,
-    w.week_no,
+    jc.month,
+    jc.week_no,
     v_day,
-    get_due_date_for_week(p_year, m.month, v_day, w.week_no)
+    jc.due_date
   from students s
-  cross join (select generate_series(1, 6) as month) m
-  cross join (select generate_series(1, 5) as week_no) w
+  join journal_calendar jc
+    on jc.year = p_year
+   and jc.submission_day = v_day
+   and jc.month between 1 and 6
   where s.section = p_section
-    and get_due_date_for_week(p_year, m.month, v_day, w.week_no) is not null
   on conflict do nothing;
 end;
 $$;
@@ -417,6 +475,10 @@ returns trigger
 language plpgsql
 as $$
 begin
+  if current_setting('ojt.bulk_import', true) = 'on' then
+    return new;
+  end if;
+
   insert into attendance_sheet_dtr (student_id)
   values (new.id)
   on conflict (student_id) do nothing;